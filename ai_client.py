@@ -0,0 +1,141 @@
+"""Pooled, cached and retrying client for the Hugging Face Inference API.
+
+One ``InferenceClient`` is meant to be shared by every session: it keeps one
+``requests.Session`` per thread, since sessions are not thread-safe, each
+with a connection pool (so repeated questions reuse the TLS connection). It
+applies connect/read timeouts, retries 503 "model loading" and transient
+errors with exponential backoff that honours the ``estimated_time`` hint, and
+caches answers by prompt in a TTL-bounded LRU cache. ``api_url`` can point at a local stand-in server for testing.
+"""
+import json
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from caching import LRUCache, make_key
+
+DEFAULT_API_URL = "https://api-inference.huggingface.co/models/google/gemma-7b-it"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ModelError(Exception):
+    """The model answered with an error payload or an unusable response"""
+
+    def __init__(self, message, status_code=None, estimated_time=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.estimated_time = estimated_time
+
+
+class InferenceClient:
+    """Thread-safe text-generation client; share one instance across sessions"""
+
+    def __init__(self, token, api_url=DEFAULT_API_URL, timeout=(5, 60), max_retries=4, backoff=1.0,
+                 max_wait=30.0, cache_ttl=3600, cache_size=256, pool_size=10):
+        self.api_url = api_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_wait = max_wait
+        self.cache_ttl = cache_ttl
+        self.cache = LRUCache(max_entries=cache_size)
+        self.token = token
+        self.pool_size = pool_size
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        """The calling thread's ``requests.Session``, created on first use"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers["Authorization"] = f"Bearer {self.token}"
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        return session
+
+    def _wait_time(self, attempt, estimated_time=None):
+        wait = self.backoff * 2 ** attempt
+        if estimated_time:
+            wait = max(wait, float(estimated_time))
+        return min(wait, self.max_wait)
+
+    def _post(self, payload, stream=False):
+        """POST with retries; returns the successful response"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(self.api_url, json=payload, timeout=self.timeout, stream=stream)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._wait_time(attempt))
+                continue
+            if response.status_code == 200:
+                return response
+            estimated_time = None
+            try:
+                error = response.json()
+                message = error.get("error", response.text) if isinstance(error, dict) else response.text
+                estimated_time = error.get("estimated_time") if isinstance(error, dict) else None
+            except ValueError:
+                message = response.text
+            response.close()
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                raise ModelError(message, response.status_code, estimated_time)
+            time.sleep(self._wait_time(attempt, estimated_time))
+
+    def _cache_key(self, prompt, parameters):
+        return make_key(self.api_url, prompt, sorted((parameters or {}).items()))
+
+    def _cached(self, key):
+        entry = self.cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.cache_ttl:
+            return entry[1]
+        return None
+
+    def generate(self, prompt, parameters=None):
+        """Answer a prompt, from cache when the same prompt was asked within the TTL"""
+        key = self._cache_key(prompt, parameters)
+        answer = self._cached(key)
+        if answer is not None:
+            return answer
+        response = self._post({"inputs": prompt, "parameters": parameters or {}})
+        output = response.json()
+        if isinstance(output, list) and output and "generated_text" in output[0]:
+            answer = output[0]["generated_text"].replace(prompt, "").strip()
+        elif isinstance(output, dict) and "error" in output:
+            raise ModelError(output["error"], response.status_code, output.get("estimated_time"))
+        else:
+            raise ModelError(f"Unexpected response from the model: {output}", response.status_code)
+        self.cache.set(key, (time.monotonic(), answer))
+        return answer
+
+    def stream(self, prompt, parameters=None):
+        """Yield answer tokens as the model produces them (server-sent events).
+
+        Cached answers are yielded in one piece; a completed stream is cached
+        like a regular answer.
+        """
+        key = self._cache_key(prompt, parameters)
+        answer = self._cached(key)
+        if answer is not None:
+            yield answer
+            return
+        response = self._post({"inputs": prompt, "parameters": parameters or {}, "stream": True}, stream=True)
+        tokens = []
+        with response:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                event = json.loads(line[len("data:"):])
+                if "error" in event:
+                    raise ModelError(event["error"])
+                token = event.get("token", {})
+                if token.get("special"):
+                    continue
+                tokens.append(token.get("text", ""))
+                yield tokens[-1]
+        self.cache.set(key, (time.monotonic(), "".join(tokens).strip()))
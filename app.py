@@ -1,18 +1,9 @@
 import streamlit as st
-import numpy as np
-import matplotlib.pyplot as plt
-import pandas as pd
-import folium
-from streamlit_folium import folium_static
-from datetime import datetime
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from datetime import datetime, timedelta
+import os
 import re
-# --- ADDED IMPORTS ---
-import requests
-import plotly.graph_objects as go
-import streamlit.components.v1 as components
+
+import perf
 
 # Page configuration
 st.set_page_config(
@@ -22,8 +13,15 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Per-session timing spans (see perf.py); a no-op unless the performance panel is on
+def perf_session():
+    """This session's span aggregate and whether it opted in to timing"""
+    return st.session_state.setdefault("perf_stats", {}), st.session_state.get("perf_panel", False)
+
+perf.begin_run(*perf_session())
+
 # Modern, professional color scheme with proper contrast
-st.markdown("""
+APP_CSS = """
 <style>
     /* Main background */
     .stApp {
@@ -229,7 +227,9 @@ st.markdown("""
         margin: 1rem 0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+with perf.span("css"):
+    st.markdown(APP_CSS, unsafe_allow_html=True)
 
 # Email configuration
 def get_email_config():
@@ -239,26 +239,43 @@ def get_email_config():
         'smtp_port': st.secrets.get('SMTP_PORT', 587),
         'sender_email': st.secrets.get('SENDER_EMAIL', ''),
         'sender_password': st.secrets.get('SENDER_PASSWORD', ''),
-        'receiver_email': st.secrets.get('RECEIVER_EMAIL', '')
+        'receiver_email': st.secrets.get('RECEIVER_EMAIL', ''),
+        # Plain, unauthenticated delivery (e.g. a local debugging SMTP server) when false
+        'starttls': st.secrets.get('SMTP_STARTTLS', True),
+        'outbox_path': st.secrets.get('OUTBOX_PATH', os.path.join('data', 'feedback_outbox.sqlite3'))
     }
 
+def is_email_configured(config):
+    """Sender and receiver are set, plus a password when the server requires login"""
+    return bool(config['sender_email'] and config['receiver_email'] and
+                (config['sender_password'] or not config['starttls']))
+
 # Email validation
 def is_valid_email(email):
     """Validate email format"""
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
     return re.match(pattern, email) is not None
 
-# Send email function
+# One outbox worker per process; it owns the SMTP connection
+@st.cache_resource
+def _feedback_outbox(config):
+    import outbox
+
+    os.makedirs(os.path.dirname(os.path.abspath(config['outbox_path'])), exist_ok=True)
+    return outbox.Outbox(config['outbox_path'], config)
+
+def get_feedback_outbox(config):
+    """The process's feedback outbox, with its background worker (re)started if it is not running"""
+    return _feedback_outbox(config).start()
+
+# Queue feedback email
 def send_feedback_email(name, email, feedback_type, message, config):
-    """Send feedback email"""
-    if not all([config['sender_email'], config['sender_password'], config['receiver_email']]):
+    """Queue feedback for background delivery; returns as soon as it is stored"""
+    if not is_email_configured(config):
         st.error("Email configuration is missing in secrets. Please contact the administrator.")
         return False
     try:
-        msg = MIMEMultipart()
-        msg['From'] = config['sender_email']
-        msg['To'] = config['receiver_email']
-        msg['Subject'] = f"🌬️ Wind Dashboard Feedback - {feedback_type}"
+        subject = f"🌬️ Wind Dashboard Feedback - {feedback_type}"
         body = f"""
         New Feedback from Wind Energy Dashboard:
         Name: {name}
@@ -268,71 +285,102 @@ def send_feedback_email(name, email, feedback_type, message, config):
         Message:
         {message}
         """
-        msg.attach(MIMEText(body, 'plain'))
-        with smtplib.SMTP(config['smtp_server'], config['smtp_port']) as server:
-            server.starttls()
-            server.login(config['sender_email'], config['sender_password'])
-            server.send_message(msg)
+        get_feedback_outbox(config).enqueue(subject, body)
         return True
     except Exception as e:
-        st.error(f"Error sending email: {str(e)}. Check your credentials and server settings.")
+        st.error(f"Error queuing email: {str(e)}. Check the outbox path in your settings.")
         return False
 
+# One pooled inference client per process, shared by every session
+@st.cache_resource
+def get_inference_client(token, api_url):
+    """Shared AI Assistant client (connection pool + response cache)"""
+    import ai_client
+
+    return ai_client.InferenceClient(token, api_url=api_url)
+
+# Monte Carlo results are cached so reruns with unchanged assumptions are instant
+@st.cache_data(max_entries=32, show_spinner=False)
+def run_monte_carlo(distributions, capacity_mw, turbine_cost, years, n_samples, workers):
+    """Run (or reuse) a Monte Carlo simulation for the current scenario"""
+    import monte_carlo
+
+    return monte_carlo.simulate(distributions, capacity_mw, turbine_cost, years,
+                                n_samples=n_samples, seed=42, workers=workers)
+
+# Synthetic lifetime hourly series are cached per wind/turbine inputs (25 years is ~219k readings)
+@st.cache_data(max_entries=8, show_spinner=False)
+def hourly_generation(mean_speed, capacity_mw, years, shape, turbine, elevation):
+    """Hourly generation (MWh) over the project lifetime from Weibull winds"""
+    import energy
+
+    return energy.lifetime_hourly_generation(mean_speed, capacity_mw, years, shape, turbine, elevation)
+
+# Wind map layers are rendered to tiles once per site dataset, then served from static/ by Streamlit
+@st.cache_resource(show_spinner="Rendering wind map layers...")
+def wind_map_tiles():
+    """Tile set metadata for the map, or None when static file serving is off"""
+    if not st.get_option("server.enableStaticServing"):
+        return None
+    import site_store
+    import tiles
+
+    return tiles.ensure_tiles(site_store.load_sites())
+
+# The wind-resource raster is memory-mapped once per process; sampling a point reads only the cells around it
+@st.cache_resource
+def wind_raster():
+    """Gridded wind resource named by WIND_RASTER_PATH, or None when it is not set"""
+    import raster
+
+    return raster.load_raster()
+
+# Direction histograms are decoded once per measured dataset and file version
+@st.cache_data(max_entries=16, show_spinner=False)
+def load_direction_histogram(name, modified):
+    """Dense speed/direction histogram of a measured dataset, or None when it has no direction data"""
+    import ingest
+    import wind_rose
+
+    data = ingest.load_summary(name).get("direction_histogram")
+    return None if data is None else wind_rose.from_sparse(data)
+
+# District Analytics aggregates are computed once per version of the districts file
+@st.cache_data(max_entries=4, show_spinner=False)
+def district_analytics_summary(modified):
+    """Pre-aggregated district summaries for the District Analytics page"""
+    import district_analytics
+    import site_store
+
+    return district_analytics.summarize(site_store.district_baselines())
+
 # --- UPDATED NAVIGATION ---
 page = st.sidebar.selectbox(
     "Navigate",
-    ["Wind Dashboard", "Tableau Dashboard", "Data Sources & Information", "AI Assistant", "Feedback & Support"]
+    ["Wind Dashboard", "Portfolio Optimizer", "District Analytics", "Data Sources & Information", "AI Assistant", "Feedback & Support"],
+    key="page"
 )
 
-# District data with verified sources
-district_data = {
-    "Bhopal": {
-        "wind_speed": 4.2, 
-        "potential": "Low", 
-        "turbulence": 12.5, 
-        "elevation": 523,
-        "lat": 23.2599, 
-        "lon": 77.4126,
-        "source": "National Institute of Wind Energy (NIWE), Wind Resource Map of India",
-        "source_url": "https://niwe.res.in/department_wra_about.php",
-        "wind_potential": 8.2  # in MW per sq.km
-    },
-    "Indore": {
-        "wind_speed": 5.7, 
-        "potential": "Medium", 
-        "turbulence": 11.2, 
-        "elevation": 553,
-        "lat": 22.7196, 
-        "lon": 75.8577,
-        "source": "MNRE, Wind Power Potential Assessment in Madhya Pradesh",
-        "source_url": "https://mnre.gov.in/wind-energy-potential",
-        "wind_potential": 14.5  # in MW per sq.km
-    },
-    "Jabalpur": {
-        "wind_speed": 4.8, 
-        "potential": "Low-Medium", 
-        "turbulence": 13.0, 
-        "elevation": 412,
-        "lat": 23.1815, 
-        "lon": 79.9864,
-        "source": "India Meteorological Department (IMD), Climate of Madhya Pradesh",
-        "source_url": "https://mausam.imd.gov.in/",
-        "wind_potential": 9.8  # in MW per sq.km
-    },
-    "Ujjain": {
-        "wind_speed": 5.2, 
-        "potential": "Medium", 
-        "turbulence": 11.8, 
-        "elevation": 478,
-        "lat": 23.1793, 
-        "lon": 75.7849,
-        "source": "National Institute of Wind Energy (NIWE), Wind Resource Assessment",
-        "source_url": "https://niwe.res.in/department_wra_about.php",
-        "wind_potential": 12.3  # in MW per sq.km
-    }
-}
-
 if page == "Wind Dashboard":
+    # Heavy dependencies (matplotlib, folium, scipy, pandas) are imported by the pages that use them,
+    # so the other pages start without paying for them; see `python benchmark.py --only startup`
+    import numpy as np
+    import plotly.graph_objects as go
+
+    import charts
+    import energy
+    import finance
+    import ingest
+    import maps
+    import scenario_state
+    import sensitivity
+    import site_store
+    import wind_model
+
+    # District data with verified sources, loaded once per process from data/districts.csv
+    site_data = site_store.load_sites()
+    district_data = site_data.district_records()
+
     # Header
     st.markdown('<h1 class="main-header">🌬️ Wind Energy Analytics Dashboard - Madhya Pradesh</h1>', unsafe_allow_html=True)
 
@@ -342,32 +390,875 @@ if page == "Wind Dashboard":
     Adjust parameters in the sidebar to simulate different project scenarios and evaluate financial viability.
     """)
 
-    # Sidebar for user inputs
-    with st.sidebar:
+    # --- DESIGN: The page is split into fragments that rerun on their own. Widgets outside every fragment
+    # (district, baseline source) rerun the whole page. A wind or financial input reruns the scenario fragment
+    # (inputs, model, calculations), which passes its results to the charts and KPI fragments; the map and
+    # district metrics are untouched. A chart control reruns only its own tab, whose figures are memoized on
+    # their inputs ---
+    @st.fragment
+    def district_map(selected_district):
+        """Folium map of the districts with the selected one highlighted"""
+        perf.attach(*perf_session())
+        with perf.span("map"):
+            # Map HTML is rendered once per district and reused across reruns
+            tileset = wind_map_tiles()
+            st.markdown('<div class="map-container">', unsafe_allow_html=True)
+            st.iframe(maps.district_map_html(selected_district, district_data, tileset,
+                                             show_coordinates=wind_raster() is not None),
+                      width=maps.MAP_WIDTH, height=maps.MAP_HEIGHT + 10)
+            st.markdown('</div>', unsafe_allow_html=True)
+            st.caption("District overlay by wind potential: " + " · ".join(
+                f'<span style="color:{color}">●</span> {label}' for _, color, label in maps.POTENTIAL_CLASSES),
+                unsafe_allow_html=True)
+            if tileset is not None:
+                st.caption("Shaded layers interpolate wind potential (yellow → red) and wind speed (yellow → blue) "
+                           "between sites; switch them in the map's layer control.")
+            if wind_raster() is not None:
+                st.caption("Click the map for a point's coordinates, then enter them with the "
+                           f"'{scenario_state.RASTER_BASELINE}' baseline source to use that point's wind resource.")
+
+    @st.fragment
+    def district_metrics(selected_district):
+        """Baseline metrics and data source of the selected district"""
+        perf.attach(*perf_session())
+        with perf.span("district_metrics"):
+            # District metrics
+            col1a, col2a, col3a = st.columns(3)
+            with col1a:
+                st.metric("Average Wind Speed", f"{district_data[selected_district]['wind_speed']} m/s")
+            with col2a:
+                st.metric("Wind Potential", district_data[selected_district]["potential"])
+            with col3a:
+                st.metric("Theoretical Potential", f"{district_data[selected_district]['wind_potential']} MW/sq.km")
+        
+            st.markdown(f"**Data Source:** [{district_data[selected_district]['source']}]({district_data[selected_district]['source_url']})")
+
+    @st.fragment
+    def cash_flow_chart(avg_wind_speed, turbulence, capacity_mw, tariff_rate, turbine_cost, om_cost, years,
+                        years_range, cumulative_cash_flow):
+        """Cash flow chart with optional Monte Carlo bands; the uncertainty controls rerun only this tab"""
+        perf.attach(*perf_session())
+        with perf.span("chart.cash_flow_plotly"):
+            show_uncertainty = st.checkbox("Show Monte Carlo uncertainty bands (P10–P90)", key="mc_enabled")
+            if show_uncertainty:
+                import monte_carlo
+
+                with st.expander("Uncertainty Assumptions", expanded=True):
+                    st.caption("Wind speed, turbulence and O&M cost are sampled from normal distributions around the "
+                               "current inputs; tariff from a triangular distribution.")
+                    col_mc1, col_mc2 = st.columns(2)
+                    with col_mc1:
+                        wind_speed_std = st.number_input("Wind Speed Std. Dev. (m/s)", 0.0, 3.0,
+                                                         round(0.1 * avg_wind_speed, 2), step=0.05)
+                        turbulence_std = st.number_input("Turbulence Std. Dev. (%)", 0.0, 5.0, 1.5, step=0.1)
+                        om_cost_std = st.number_input("O&M Cost Std. Dev. (₹ lakhs/MW/year)", 0.0, 10.0, 3.0, step=0.5)
+                    with col_mc2:
+                        tariff_low, tariff_high = st.slider("Tariff Range (₹/kWh)", *wind_model.INPUT_RANGES["tariff_rate"],
+                                                            (max(tariff_rate - 0.7, 3.0), min(tariff_rate + 0.6, 8.0)),
+                                                            step=0.1)
+                        n_samples = st.select_slider("Number of Samples", [100_000, 1_000_000, 10_000_000],
+                                                     value=1_000_000, format_func=lambda n: f"{n:,}")
+                        mc_workers = st.number_input("Worker Processes", 1, os.cpu_count() or 1, 1)
+                distributions = {
+                    "wind_speed": {"dist": "normal", "mean": avg_wind_speed, "std": wind_speed_std},
+                    "turbulence": {"dist": "normal", "mean": turbulence, "std": turbulence_std},
+                    "tariff_rate": {"dist": "triangular", "low": min(tariff_low, tariff_rate),
+                                    "mode": tariff_rate, "high": max(tariff_high, tariff_rate)},
+                    "om_cost": {"dist": "normal", "mean": om_cost, "std": om_cost_std},
+                }
+                with st.spinner(f"Simulating {n_samples:,} scenarios..."):
+                    mc_results = run_monte_carlo(distributions, capacity_mw, turbine_cost, years, n_samples, mc_workers)
+            
+            # --- DESIGN: Replaced Matplotlib chart with an interactive Plotly chart ---
+            def build_cash_flow_figure():
+                fig_plotly = go.Figure()
+                if show_uncertainty:
+                    bands = mc_results["cash_flow_bands"]
+                    band_years = list(mc_results["years_range"])
+                    for low, high, opacity in [(10, 90, 0.15), (25, 75, 0.3)]:
+                        fig_plotly.add_trace(go.Scatter(x=band_years, y=bands[high], mode='lines', line=dict(width=0),
+                                                        showlegend=False, hoverinfo='skip'))
+                        fig_plotly.add_trace(go.Scatter(x=band_years, y=bands[low], mode='lines', line=dict(width=0),
+                                                        fill='tonexty', fillcolor=f'rgba(79, 209, 197, {opacity})',
+                                                        name=f'P{low}–P{high} band'))
+                    fig_plotly.add_trace(go.Scatter(x=band_years, y=bands[50], mode='lines', name='Median (P50)',
+                                                    line=dict(color='#f6e05e', width=2, dash='dot')))
+                fig_plotly.add_trace(go.Scatter(x=list(years_range), y=cumulative_cash_flow, mode='lines+markers', name='Net Cash Flow',
+                                         line=dict(color='#4fd1c5', width=3), marker=dict(size=8)))
+                fig_plotly.update_layout(
+                    title='Interactive Project Cash Flow Over Time',
+                    xaxis_title='Years',
+                    yaxis_title='Net Cash Flow (₹)',
+                    plot_bgcolor='#1a202c',
+                    paper_bgcolor='#0f1a2a',
+                    font=dict(color='#e6e9f0'),
+                    xaxis=dict(gridcolor='#4a5568'),
+                    yaxis=dict(gridcolor='#4a5568'),
+                    hovermode='x unified'
+                )
+                fig_plotly.add_hline(y=0, line_dash="dash", line_color="#fc8181")
+                return fig_plotly
+
+            # Built figures are shared across sessions; the bands are keyed by the simulation inputs
+            chart_inputs = dict(cash_flow=np.asarray(cumulative_cash_flow, dtype=float),
+                                uncertainty=(distributions, capacity_mw, turbine_cost, years, n_samples)
+                                if show_uncertainty else None)
+            st.plotly_chart(scenario_state.cached("chart.cash_flow", chart_inputs, build_cash_flow_figure),
+                            width="stretch")
+            
+            if show_uncertainty:
+                st.markdown(f"**Exceedance Statistics** ({mc_results['n_samples']:,} samples)")
+                col_p50, col_p75, col_p90 = st.columns(3)
+                for column, level in zip([col_p50, col_p75, col_p90], monte_carlo.EXCEEDANCE_LEVELS):
+                    payback = mc_results["payback_period"][level]
+                    with column:
+                        st.metric(f"P{level} Annual Energy", f"{mc_results['aep'][level]:,.0f} MWh")
+                        st.metric(f"P{level} Payback", f"{payback:.1f} years" if payback != float('inf') else "Never")
+
+    @st.fragment
+    def hourly_generation_chart(avg_wind_speed, capacity_mw, years, weibull_k, turbine_model, elevation):
+        """Lifetime hourly generation downsampled to the visible window; zooming reruns only this tab"""
+        perf.attach(*perf_session())
+        import pandas as pd
+
+        import downsample
+
+        with perf.span("chart.hourly_generation"):
+            generation = hourly_generation(avg_wind_speed, capacity_mw, years, weibull_k, turbine_model, elevation)
+            start = datetime(datetime.now().year + 1, 1, 1)
+            end = start + timedelta(hours=generation.size - 1)
+            timestamps = np.datetime64(start, "h") + np.arange(generation.size)
+
+            # A box drawn on the chart becomes the zoom window; it is applied before the slider is created
+            box = (st.session_state.get("hourly_chart") or {}).get("selection", {}).get("box")
+            if box and box[0]["x"] != st.session_state.get("hourly_applied_box"):
+                st.session_state["hourly_applied_box"] = box[0]["x"]
+                low, high = sorted(pd.Timestamp(value) for value in box[0]["x"])
+                low, high = max(low.floor("h").to_pydatetime(), start), min(high.ceil("h").to_pydatetime(), end)
+                if low < high:
+                    st.session_state["hourly_window"] = (low, high)
+            window = st.session_state.get("hourly_window")
+            if not window or not start <= window[0] < window[1] <= end:
+                st.session_state["hourly_window"] = (start, end)
+
+            col_window, col_reset = st.columns([4, 1])
+            with col_window:
+                window_start, window_end = st.slider("Zoom Window", min_value=start, max_value=end,
+                                                     step=timedelta(hours=1), format="YYYY-MM-DD HH:mm",
+                                                     key="hourly_window")
+            with col_reset:
+                st.button("Reset Zoom", on_click=lambda: st.session_state.pop("hourly_window", None))
+
+            x0, x1 = np.datetime64(window_start, "h"), np.datetime64(window_end, "h")
+
+            def build_hourly_figure():
+                fig_hourly = go.Figure(downsample.scatter(timestamps, generation, x0, x1, name='Hourly Generation',
+                                                          mode='lines', line=dict(color='#4fd1c5', width=1)))
+                fig_hourly.update_layout(
+                    title='Hourly Generation Over the Project Lifetime',
+                    xaxis_title='Date',
+                    yaxis_title='Generation (MWh)',
+                    plot_bgcolor='#1a202c',
+                    paper_bgcolor='#0f1a2a',
+                    font=dict(color='#e6e9f0'),
+                    xaxis=dict(gridcolor='#4a5568', range=[x0, x1]),
+                    yaxis=dict(gridcolor='#4a5568'),
+                    dragmode='select',
+                )
+                return fig_hourly
+
+            hourly_inputs = dict(wind_speed=avg_wind_speed, capacity_mw=capacity_mw, years=years, weibull_k=weibull_k,
+                                 turbine=turbine_model, elevation=elevation, window=(start, window_start, window_end))
+            fig_hourly = scenario_state.cached("chart.hourly_generation", hourly_inputs, build_hourly_figure)
+            trace = fig_hourly.data[0]
+            st.plotly_chart(fig_hourly, width="stretch", key="hourly_chart", on_select="rerun",
+                            selection_mode="box")
+            visible = int(np.searchsorted(timestamps, x1, side="right") - np.searchsorted(timestamps, x0))
+            shown = (f"all {visible:,} hourly readings in the window" if len(trace.x) >= visible else
+                     f"{len(trace.x):,} of {visible:,} hourly readings (min/max per bucket)")
+            st.caption(f"Drag across the chart to zoom in. Showing {shown}"
+                       f"{', drawn with WebGL' if type(trace).__name__ == 'Scattergl' else ''}; "
+                       f"{turbine_model} power curve, Weibull k = {weibull_k}.")
+
+    @st.fragment
+    def wind_rose_panel(selected_district, baseline_source, turbine_model):
+        """Wind rose and directional energy of the measured dataset; its controls rerun only this panel"""
+        perf.attach(*perf_session())
+        import wind_rose
+        from plotly.colors import sample_colorscale
+
+        with st.expander("🧭 Wind Rose & Directional Energy"):
+            counts = None
+            if baseline_source not in (scenario_state.DEFAULT_BASELINE, scenario_state.RASTER_BASELINE):
+                summary_path = os.path.join(ingest.SUMMARY_DIR, f"{baseline_source}.json")
+                counts = load_direction_histogram(baseline_source, os.path.getmtime(summary_path))
+            if counts is None:
+                st.info("Directional analysis needs measured data with a wind direction column (e.g. `wd_avg`). "
+                        "Upload a met-mast CSV under 📂 Measured Wind Data and select it as the Baseline Source.")
+                return
+            if not counts.sum():
+                st.info(f"{baseline_source} has no readings with both a valid wind speed and direction.")
+                return
+
+            col_sectors, col_classes = st.columns(2)
+            with col_sectors:
+                sectors = st.selectbox("Direction Sectors", wind_rose.SECTOR_CHOICES, index=2, key="rose_sectors")
+            with col_classes:
+                class_width = st.select_slider("Speed Class Width (m/s)", [1.0, 2.0, 3.0], value=2.0,
+                                               key="rose_class_width")
+
+            with perf.span("chart.wind_rose"):
+                rose = wind_rose.rose(counts, sectors, class_width, turbine=turbine_model,
+                                      elevation=district_data[selected_district]["elevation"])
+                colors = sample_colorscale("Teal", np.linspace(0.15, 1.0, len(rose["class_labels"])))
+                fig_rose = go.Figure()
+                for label, frequency, color in zip(rose["class_labels"], rose["frequency"], colors):
+                    fig_rose.add_trace(go.Barpolar(r=frequency, theta=rose["directions"], name=label,
+                                                   marker_color=color, customdata=rose["labels"],
+                                                   hovertemplate="%{customdata}: %{r:.1f}%<extra>" + label + "</extra>"))
+                fig_rose.update_layout(
+                    title=f'Wind Rose: {baseline_source} ({rose["readings"]:,} readings)',
+                    paper_bgcolor='#0f1a2a',
+                    font=dict(color='#e6e9f0'),
+                    polar=dict(bgcolor='#1a202c',
+                               angularaxis=dict(direction='clockwise', rotation=90, tickmode='array',
+                                                tickvals=rose["directions"], ticktext=rose["labels"],
+                                                gridcolor='#4a5568'),
+                               radialaxis=dict(ticksuffix='%', gridcolor='#4a5568')),
+                    legend_title_text='Wind Speed',
+                )
+                st.plotly_chart(fig_rose, width="stretch")
+
+                fig_sectors = go.Figure()
+                fig_sectors.add_trace(go.Bar(x=rose["labels"], y=rose["sector_frequency"], name='Time in Sector',
+                                             marker_color='#4a5568'))
+                fig_sectors.add_trace(go.Bar(x=rose["labels"], y=rose["energy_share"], name='Share of Energy',
+                                             marker_color='#4fd1c5'))
+                fig_sectors.update_layout(
+                    title='Directional Energy Breakdown',
+                    xaxis_title='Direction Sector',
+                    yaxis_title='Share (%)',
+                    plot_bgcolor='#1a202c',
+                    paper_bgcolor='#0f1a2a',
+                    font=dict(color='#e6e9f0'),
+                    xaxis=dict(gridcolor='#4a5568'),
+                    yaxis=dict(gridcolor='#4a5568'),
+                )
+                st.plotly_chart(fig_sectors, width="stretch")
+
+            prevailing = int(np.argmax(rose["sector_frequency"]))
+            strongest = int(np.argmax(rose["energy_share"]))
+            col_prevailing, col_energy = st.columns(2)
+            with col_prevailing:
+                st.metric("Prevailing Direction", rose["labels"][prevailing],
+                          f"{rose['sector_frequency'][prevailing]:.1f}% of the time", delta_color="off")
+            with col_energy:
+                st.metric("Most Energetic Sector", rose["labels"][strongest],
+                          f"{rose['energy_share'][strongest]:.1f}% of energy", delta_color="off")
+            st.caption("Energy share weights each reading by the normalized output of the "
+                       f"{turbine_model} power curve at the district's elevation.")
+
+    @st.fragment
+    def farm_layout_panel(avg_wind_speed, rating_mw, area_km, weibull_k, turbine_model, elevation, tariff_rate,
+                          baseline_source):
+        """Turbines laid out over the project area with Jensen wake losses; the turbine count reruns only this tab"""
+        perf.attach(*perf_session())
+        import farm
+        import wind_rose
+
+        n_turbines = st.slider("Number of Turbines", 1, farm.MAX_TURBINES, 20, key="farm_turbines")
+        xy, spacing = farm.grid_layout(n_turbines, area_km)
+        diameter = farm.rotor_diameter(rating_mw)
+
+        # Directions follow the measured wind rose when the baseline dataset has one, otherwise all are equally likely
+        sector_frequency = None
+        if baseline_source not in (scenario_state.DEFAULT_BASELINE, scenario_state.RASTER_BASELINE):
+            summary_path = os.path.join(ingest.SUMMARY_DIR, f"{baseline_source}.json")
+            counts = load_direction_histogram(baseline_source, os.path.getmtime(summary_path))
+            if counts is not None:
+                sector_frequency = wind_rose.sector_counts(counts, int(360 / farm.DIRECTION_STEP)).sum(axis=1)
+
+        with perf.span("chart.farm_layout"):
+            farm_inputs = dict(xy=xy, rating_mw=rating_mw, mean_speed=avg_wind_speed, shape=weibull_k,
+                               turbine=turbine_model, elevation=elevation, sector_frequency=sector_frequency)
+            result = scenario_state.cached("farm", farm_inputs, lambda: farm.farm_energy(**farm_inputs))
+            wake_loss = result["ideal_aep"] - result["aep"]
+
+            col_aep, col_efficiency, col_cf, col_loss = st.columns(4)
+            with col_aep:
+                st.metric("Farm AEP", f"{result['aep'] / 1000:,.1f} GWh",
+                          f"{n_turbines} × {rating_mw:g} MW", delta_color="off")
+            with col_efficiency:
+                st.metric("Array Efficiency", f"{100 * result['array_efficiency']:.1f}%")
+            with col_cf:
+                st.metric("Net Capacity Factor", f"{100 * result['capacity_factor']:.1f}%")
+            with col_loss:
+                st.metric("Wake Loss", f"{wake_loss:,.0f} MWh/yr",
+                          f"-₹ {wake_loss * 1000 * tariff_rate / 1e7:,.2f} Cr/yr", delta_color="off")
+
+            fig_layout = go.Figure(go.Scatter(
+                x=xy[:, 0] / 1000, y=xy[:, 1] / 1000, mode='markers',
+                marker=dict(size=max(4, 14 - n_turbines // 50), color=100 * result["turbine_efficiency"],
+                            colorscale='RdYlGn', cmin=min(70, 100 * result["turbine_efficiency"].min()), cmax=100,
+                            colorbar=dict(title='Efficiency (%)')),
+                hovertemplate='%{x:.2f} km E, %{y:.2f} km N<br>%{marker.color:.1f}% of free-stream output<extra></extra>',
+            ))
+            fig_layout.update_layout(
+                title='Turbine Layout and Wake Efficiency',
+                xaxis_title='East (km)',
+                yaxis_title='North (km)',
+                yaxis=dict(scaleanchor='x', gridcolor='#4a5568'),
+                xaxis=dict(gridcolor='#4a5568'),
+                plot_bgcolor='#1a202c',
+                paper_bgcolor='#0f1a2a',
+                font=dict(color='#e6e9f0'),
+            )
+            st.plotly_chart(fig_layout, width="stretch")
+
+            fig_directions = go.Figure(go.Scatterpolar(
+                r=100 * np.append(result["direction_efficiency"], result["direction_efficiency"][0]),
+                theta=np.append(result["directions"], 360), mode='lines', line=dict(color='#4fd1c5'),
+                hovertemplate='Wind from %{theta:.0f}°: %{r:.1f}%<extra></extra>'))
+            fig_directions.update_layout(
+                title='Array Efficiency by Wind Direction',
+                paper_bgcolor='#0f1a2a',
+                font=dict(color='#e6e9f0'),
+                polar=dict(bgcolor='#1a202c', angularaxis=dict(direction='clockwise', rotation=90, gridcolor='#4a5568'),
+                           radialaxis=dict(ticksuffix='%', gridcolor='#4a5568')),
+            )
+            st.plotly_chart(fig_directions, width="stretch")
+
+        spacing_d = min(spacing) / diameter
+        if spacing_d < 3:
+            st.warning(f"Turbines are only {spacing_d:.1f} rotor diameters apart; "
+                       "increase the project area or reduce the number of turbines.")
+        st.caption(f"{turbine_model} turbines rated {rating_mw:g} MW with a {diameter:.0f} m rotor, "
+                   f"{spacing[0] / diameter:.1f} D × {spacing[1] / diameter:.1f} D apart on a staggered grid over "
+                   f"{area_km:g} sq. km. Jensen wakes (k = {farm.WAKE_DECAY}), Weibull k = {weibull_k}, "
+                   + ("directions from the measured wind rose." if sector_frequency is not None
+                      else "all wind directions equally likely."))
+
+    @st.fragment
+    def sensitivity_charts(base_params, finance_params, selected_district, use_power_curve):
+        """Tornado chart and two-parameter heatmap; their selectors rerun only this tab"""
+        perf.attach(*perf_session())
+        with perf.span("chart.sensitivity"):
+            kpi_names = list(sensitivity.KPI_LABELS)
+            parameter_names = list(sensitivity.PARAMETER_LABELS)
+            
+            st.markdown(f'<h3 class="section-header">Tornado Chart: {selected_district}</h3>', unsafe_allow_html=True)
+            tornado_kpi = st.selectbox("Indicator", kpi_names, format_func=sensitivity.KPI_LABELS.get, key="tornado_kpi")
+
+            def build_tornado_figure():
+                bars = sensitivity.tornado(base_params, kpi=tornado_kpi, finance_params=finance_params)
+                labels = [sensitivity.PARAMETER_LABELS[bar["parameter"]] for bar in bars][::-1]
+                fig_tornado = go.Figure()
+                fig_tornado.add_trace(go.Bar(y=labels, x=[bar["low"] - bar["base"] for bar in bars][::-1], base=bars[0]["base"],
+                                             orientation='h', name='Range minimum', marker_color='#fc8181'))
+                fig_tornado.add_trace(go.Bar(y=labels, x=[bar["high"] - bar["base"] for bar in bars][::-1], base=bars[0]["base"],
+                                             orientation='h', name='Range maximum', marker_color='#4fd1c5'))
+                fig_tornado.update_layout(
+                    barmode='overlay',
+                    title=f'{sensitivity.KPI_LABELS[tornado_kpi]} across each slider range',
+                    xaxis_title=sensitivity.KPI_LABELS[tornado_kpi],
+                    plot_bgcolor='#1a202c',
+                    paper_bgcolor='#0f1a2a',
+                    font=dict(color='#e6e9f0'),
+                    xaxis=dict(gridcolor='#4a5568'),
+                    yaxis=dict(gridcolor='#4a5568'),
+                )
+                fig_tornado.add_vline(x=bars[0]["base"], line_dash="dash", line_color="#e6e9f0")
+                return fig_tornado
+
+            # Sweep results and built figures are shared across sessions through the scenario cache
+            sweep_inputs = {**base_params, **finance_params, "district": selected_district}
+            st.plotly_chart(scenario_state.cached("chart.tornado", {**sweep_inputs, "kpi": tornado_kpi},
+                                                  build_tornado_figure), width="stretch")
+            if use_power_curve:
+                st.caption("Sweeps use the empirical NIWE capacity factor, not the Weibull power-curve model.")
+            st.caption("Project area does not enter the financial model, so it is not swept. "
+                       "Payback values are shown only where the project pays back.")
+            
+            st.markdown('<h3 class="section-header">Two-Parameter Heatmap</h3>', unsafe_allow_html=True)
+            col_x, col_y, col_kpi = st.columns(3)
+            with col_x:
+                x_param = st.selectbox("X axis", parameter_names, index=parameter_names.index("tariff_rate"),
+                                       format_func=sensitivity.PARAMETER_LABELS.get, key="heatmap_x")
+            with col_y:
+                y_param = st.selectbox("Y axis", parameter_names, index=parameter_names.index("wind_speed"),
+                                       format_func=sensitivity.PARAMETER_LABELS.get, key="heatmap_y")
+            with col_kpi:
+                heatmap_kpi = st.selectbox("Indicator", kpi_names, index=kpi_names.index("payback_period"),
+                                           format_func=sensitivity.KPI_LABELS.get, key="heatmap_kpi")
+            if x_param == y_param:
+                st.warning("Please choose two different parameters for the heatmap axes.")
+            else:
+                def build_heatmap_figure():
+                    x_values, y_values, grid = sensitivity.grid_sweep(base_params, x_param, y_param, kpi=heatmap_kpi,
+                                                                      finance_params=finance_params)
+                    fig_heatmap = go.Figure(go.Heatmap(x=x_values, y=y_values, z=grid, colorscale='Teal',
+                                                       colorbar=dict(title=sensitivity.KPI_LABELS[heatmap_kpi])))
+                    fig_heatmap.add_trace(go.Scatter(x=[base_params[x_param]], y=[base_params[y_param]], mode='markers',
+                                                     name='Current scenario', marker=dict(color='#fc8181', size=12, symbol='x')))
+                    fig_heatmap.update_layout(
+                        title=f'{sensitivity.KPI_LABELS[heatmap_kpi]} for {selected_district}',
+                        xaxis_title=sensitivity.PARAMETER_LABELS[x_param],
+                        yaxis_title=sensitivity.PARAMETER_LABELS[y_param],
+                        plot_bgcolor='#1a202c',
+                        paper_bgcolor='#0f1a2a',
+                        font=dict(color='#e6e9f0'),
+                    )
+                    return fig_heatmap
+
+                heatmap_inputs = {**sweep_inputs, "x": x_param, "y": y_param, "kpi": heatmap_kpi}
+                st.plotly_chart(scenario_state.cached("chart.heatmap", heatmap_inputs, build_heatmap_figure),
+                                width="stretch")
+
+    # Exports run on a background thread; while one is running, its fragment polls for progress every second
+    export_job = st.session_state.get("export_job")
+    export_running = export_job is not None and not export_job.done
+
+    @st.fragment(run_every=1.0 if export_running else None)
+    def feasibility_export(base_params, finance_params):
+        """Excel/PDF feasibility pack for every district, generated in the background"""
+        perf.attach(*perf_session())
+        import reports
+
+        job = st.session_state.get("export_job")
+        with st.expander("📦 Export Feasibility Pack", expanded=job is not None):
+            st.caption("Yearly cash-flow workbooks and chart pages for every district, using the current "
+                       "financial inputs with each district's baseline wind.")
+            variants = st.multiselect("Scenarios", list(reports.SCENARIO_VARIANTS),
+                                      default=["Base", "Low Tariff", "High Tariff"], key="export_scenarios")
+            formats = st.multiselect("Formats", list(reports.FORMATS), default=list(reports.FORMATS),
+                                     format_func=str.upper, key="export_formats")
+            running = job is not None and not job.done
+            if st.button(f"Generate for all {len(district_data)} districts",
+                         disabled=running or not variants or not formats):
+                with perf.span("export_start"):
+                    if job is not None:
+                        # Only the session's latest pack is kept under exports/
+                        job.discard()
+                    job = reports.ExportJob(district_data, reports.build_scenarios(base_params, variants),
+                                            finance_params, formats).start()
+                st.session_state["export_job"] = job
+                # Full rerun so this fragment is redefined with polling on
+                st.rerun()
+
+            if job is not None:
+                if not job.done:
+                    st.progress(job.completed / job.total,
+                                text=f"Generating... {job.completed}/{job.total} districts ({job.elapsed():.0f}s)")
+                elif job.error is not None:
+                    st.error(f"Export failed: {job.error}")
+                else:
+                    st.success(f"Feasibility pack ready: {job.total} districts in {job.elapsed():.1f}s")
+                    st.download_button("⬇️ Download .zip", job.read, file_name=os.path.basename(job.path),
+                                       mime="application/zip", on_click="ignore")
+            if export_running and job is not None and job.done:
+                # Stop polling once the job has finished
+                st.rerun()
+
+    @st.fragment
+    def scenario_charts(base_params, finance_params, series, total_investment, selected_district, baseline_source,
+                        use_power_curve, weibull_k, turbine_model, area_km):
+        """Chart tabs of the computed scenario; ``weibull_k`` and ``turbine_model`` are the ones the model used"""
+        perf.attach(*perf_session())
+        avg_wind_speed, capacity_mw, years = base_params["wind_speed"], base_params["capacity_mw"], base_params["years"]
+        elevation = district_data[selected_district]["elevation"]
+
+        # --- DESIGN: Replaced Radio Button with modern Tabs ---
+        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["📊 Financial Performance", "⚡ Energy Output", "📈 Cash Flow Analysis (Interactive)", "🎯 Sensitivity", "⏱️ Hourly Generation", "🏗️ Farm Layout"])
+
+        with tab1, perf.span("chart.financial_performance"):
+            st.image(charts.financial_performance_chart(series["years_range"], series["cumulative_revenue"],
+                                                        total_investment), width="stretch")
+
+        with tab2, perf.span("chart.energy_output"):
+            st.image(charts.energy_output_chart(series["years_range"], series["cumulative_generation"]),
+                     width="stretch")
+
+        with tab3:
+            cash_flow_chart(avg_wind_speed, base_params["turbulence"], capacity_mw, base_params["tariff_rate"],
+                            base_params["turbine_cost"], base_params["om_cost"], years, series["years_range"],
+                            series["cumulative_cash_flow"])
+
+        with tab4:
+            sensitivity_charts(base_params, finance_params, selected_district, use_power_curve)
+
+        with tab5:
+            hourly_generation_chart(avg_wind_speed, capacity_mw, years, weibull_k, turbine_model, elevation)
+
+        with tab6:
+            # Farm mode: the turbine capacity is each machine's rating and the project area hosts the layout
+            farm_layout_panel(avg_wind_speed, capacity_mw, area_km, weibull_k, turbine_model, elevation,
+                              base_params["tariff_rate"], baseline_source)
+
+    @st.fragment
+    def kpi_column(scenario):
+        """Key performance indicator cards of the computed scenario"""
+        perf.attach(*perf_session())
+        capacity_factor = scenario["capacity_factor"]
+        estimated_annual_generation = scenario["annual_generation"]
+        total_investment = scenario["total_investment"]
+        annual_revenue = scenario["annual_revenue"]
+        net_profit = scenario["net_profit"]
+        roi = scenario["roi"]
+        payback_period = scenario["payback_period"]
+        npv = scenario["npv"]
+        equity_irr = scenario["equity_irr"]
+        lcoe = scenario["lcoe"]
+        discounted_payback = scenario["discounted_payback"]
+        with perf.span("kpi_cards"):
+            # Key metrics display
+            st.markdown('<h3 class="section-header">📊 Key Performance Indicators</h3>', unsafe_allow_html=True)
+
+            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+            st.markdown('<p class="metric-label">Capacity Factor</p>', unsafe_allow_html=True)
+            st.markdown(f'<p class="metric-value">{capacity_factor:.1%}</p>', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+
+            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+            st.markdown('<p class="metric-label">Annual Energy Generation</p>', unsafe_allow_html=True)
+            st.markdown(f'<p class="metric-value">{estimated_annual_generation:,.0f} MWh</p>', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+
+            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+            st.markdown('<p class="metric-label">Total Investment</p>', unsafe_allow_html=True)
+            st.markdown(f'<p class="metric-value">₹ {total_investment:,.0f}</p>', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+
+            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+            st.markdown('<p class="metric-label">Annual Revenue</p>', unsafe_allow_html=True)
+            st.markdown(f'<p class="metric-value">₹ {annual_revenue:,.0f}</p>', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+
+            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+            st.markdown('<p class="metric-label">Net Profit</p>', unsafe_allow_html=True)
+            st.markdown(f'<p class="metric-value">₹ {net_profit:,.0f}</p>', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+
+            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+            st.markdown('<p class="metric-label">ROI</p>', unsafe_allow_html=True)
+            st.markdown(f'<p class="metric-value">{roi:.1f}%</p>', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+
+            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+            st.markdown('<p class="metric-label">Payback Period</p>', unsafe_allow_html=True)
+            payback_display = f"{payback_period:.1f} years" if payback_period != float('inf') else "> Project Lifetime"
+            st.markdown(f'<p class="metric-value">{payback_display}</p>', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+
+            st.markdown('<h3 class="section-header">🏦 Discounted Cash Flow</h3>', unsafe_allow_html=True)
+
+            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+            st.markdown('<p class="metric-label">Equity NPV</p>', unsafe_allow_html=True)
+            st.markdown(f'<p class="metric-value">₹ {npv:,.0f}</p>', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+
+            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+            st.markdown('<p class="metric-label">Equity IRR</p>', unsafe_allow_html=True)
+            irr_display = f"{equity_irr:.1f}%" if equity_irr == equity_irr else "n/a"
+            st.markdown(f'<p class="metric-value">{irr_display}</p>', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+
+            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+            st.markdown('<p class="metric-label">LCOE</p>', unsafe_allow_html=True)
+            st.markdown(f'<p class="metric-value">₹ {lcoe:.2f}/kWh</p>', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+
+            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+            st.markdown('<p class="metric-label">Discounted Payback</p>', unsafe_allow_html=True)
+            discounted_payback_display = (f"{discounted_payback:.1f} years" if discounted_payback != float('inf')
+                                          else "> Project Lifetime")
+            st.markdown(f'<p class="metric-value">{discounted_payback_display}</p>', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+
+    @st.fragment
+    def scenario_dashboard(selected_district, baseline_source, baselines, defaults, project_container, wind_container,
+                           rose_container, main_container, kpi_container):
+        """Scenario inputs, model and calculation steps; the results are drawn by the charts and KPI fragments"""
+        perf.attach(*perf_session())
+        wind_baseline, turbulence_baseline, weibull_k_baseline = baselines
+        with project_container, perf.span("scenario_inputs"):
+            years = st.slider("Project Lifetime (Years)", *wind_model.INPUT_RANGES["years"], defaults["years"])
+            capacity_mw = st.number_input("Turbine Capacity (MW)", *wind_model.INPUT_RANGES["capacity_mw"],
+                                          defaults["capacity_mw"], step=0.5)
+            area_km = st.number_input("Project Area (sq. km)", *scenario_state.RANGES["area_km"], defaults["area_km"],
+                                      step=1.0)
+
+        with wind_container, perf.span("scenario_inputs"):
+            avg_wind_speed = st.slider("Average Wind Speed (m/s)", *wind_model.INPUT_RANGES["wind_speed"], 
+                                       wind_baseline, step=0.1)
+            st.markdown('<div class="wind-speed-indicator"></div>', unsafe_allow_html=True)
+            st.caption("Low ← Wind Speed → High")
+        
+            turbulence = st.slider("Turbulence Intensity (%)", *wind_model.INPUT_RANGES["turbulence"], 
+                                   turbulence_baseline, step=0.1)
+        
+            energy_model = st.selectbox("Energy Model", list(scenario_state.ENERGY_MODELS),
+                                        index=list(scenario_state.ENERGY_MODELS).index(defaults["energy_model"]),
+                                        format_func=scenario_state.ENERGY_MODELS.get, key="energy_model")
+            use_power_curve = energy_model == "weibull"
+            if use_power_curve:
+                turbine_model = st.selectbox("Turbine Power Curve", list(energy.TURBINES),
+                                             index=list(energy.TURBINES).index(defaults["turbine"]), key="turbine_model")
+                weibull_k = st.slider("Weibull Shape Factor (k)", *scenario_state.RANGES["weibull_k"], weibull_k_baseline,
+                                      step=0.1)
+        
+            st.markdown('<h3 class="section-header">💰 Financial Parameters</h3>', unsafe_allow_html=True)
+            turbine_cost = st.number_input("Turbine Cost (₹ lakhs/MW)", *wind_model.INPUT_RANGES["turbine_cost"],
+                                           defaults["turbine_cost"])
+            om_cost = st.number_input("O&M Cost (₹ lakhs/MW/year)", *wind_model.INPUT_RANGES["om_cost"], defaults["om_cost"])
+            tariff_rate = st.number_input("Electricity Tariff (₹/kWh)", *wind_model.INPUT_RANGES["tariff_rate"],
+                                          defaults["tariff_rate"], step=0.1)
+        
+            with st.expander("🏦 Financing & Discounting"):
+                finance_params = {
+                    "discount_rate": st.number_input("Discount Rate (%/year)", *scenario_state.RANGES["discount_rate"],
+                                                     defaults["discount_rate"], step=0.5),
+                    "tariff_escalation": st.number_input("Tariff Escalation (%/year)",
+                                                         *scenario_state.RANGES["tariff_escalation"],
+                                                         defaults["tariff_escalation"], step=0.5),
+                    "om_escalation": st.number_input("O&M Escalation (%/year)", *scenario_state.RANGES["om_escalation"],
+                                                     defaults["om_escalation"], step=0.5),
+                    "degradation": st.number_input("Output Degradation (%/year)", *scenario_state.RANGES["degradation"],
+                                                   defaults["degradation"], step=0.1),
+                    "debt_share": st.slider("Debt Share (%)", *scenario_state.RANGES["debt_share"], defaults["debt_share"],
+                                            step=5.0),
+                    "interest_rate": st.number_input("Loan Interest Rate (%/year)", *scenario_state.RANGES["interest_rate"],
+                                                     defaults["interest_rate"], step=0.25),
+                    "loan_tenor": st.slider("Loan Tenor (Years)", *scenario_state.RANGES["loan_tenor"], defaults["loan_tenor"]),
+                }
+
+            # Keep the URL in step with the inputs so the current scenario can be shared as a link
+            scenario_query = scenario_state.encode(dict(
+                district=selected_district,
+                baseline=baseline_source,
+                wind_speed=avg_wind_speed,
+                turbulence=turbulence,
+                weibull_k=weibull_k if use_power_curve else None,
+                years=years,
+                capacity_mw=capacity_mw,
+                area_km=area_km,
+                energy_model=energy_model,
+                turbine=turbine_model if use_power_curve else None,
+                turbine_cost=turbine_cost,
+                om_cost=om_cost,
+                tariff_rate=tariff_rate,
+                **finance_params,
+            ))
+            if st.query_params.to_dict() != scenario_query:
+                st.query_params.from_dict(scenario_query)
+
+        with perf.span("scenario_model"):
+            # Financial metrics from the shared scenario engine (also used for batch scoring)
+            if use_power_curve:
+                site_elevation = district_data[selected_district]["elevation"]
+                site_air_density = float(energy.air_density(site_elevation))
+                weibull_c = float(energy.weibull_scale(avg_wind_speed, weibull_k))
+                capacity_factor_override = float(energy.weibull_capacity_factor(
+                    avg_wind_speed, weibull_k, turbine_model, site_elevation))
+            else:
+                capacity_factor_override = None
+            model_inputs = dict(
+                wind_speed=avg_wind_speed,
+                turbulence=turbulence,
+                capacity_mw=capacity_mw,
+                tariff_rate=tariff_rate,
+                turbine_cost=turbine_cost,
+                om_cost=om_cost,
+                years=years,
+                capacity_factor_override=capacity_factor_override,
+                **finance_params,
+            )
+
+            def run_scenario():
+                scenario = finance.evaluate_scenario(**model_inputs)
+                return scenario, wind_model.cumulative_series(scenario, years)
+
+            # Shared with every session that opens the same scenario
+            scenario, series = scenario_state.cached("scenario", model_inputs, run_scenario)
+            capacity_factor = scenario["capacity_factor"]
+            estimated_annual_generation = scenario["annual_generation"]
+            annual_revenue = scenario["annual_revenue"]
+            total_investment = scenario["total_investment"]
+            annual_om_cost = scenario["annual_om_cost"]
+            npv = scenario["npv"]
+            lcoe = scenario["lcoe"]
+
+            # Inputs of the sensitivity sweeps, each scored as one batched call to the scenario engine
+            base_params = dict(
+                wind_speed=avg_wind_speed,
+                turbulence=turbulence,
+                capacity_mw=capacity_mw,
+                tariff_rate=tariff_rate,
+                turbine_cost=turbine_cost,
+                om_cost=om_cost,
+                years=years,
+            )
+
+        with rose_container:
+            wind_rose_panel(selected_district, baseline_source,
+                            turbine_model if use_power_curve else energy.DEFAULT_TURBINE)
+
+        with main_container:
+            # --- DESIGN: Calculations placed inside an expander to clean up the UI ---
+            with st.expander("Show Detailed Calculation Steps"), perf.span("calculation_steps"):
+                st.markdown('<h3 class="section-header">Energy Production Calculations</h3>', unsafe_allow_html=True)
+            
+                st.markdown("**Capacity Factor Calculation:**")
+                st.markdown('<div class="calculation-box">', unsafe_allow_html=True)
+                if use_power_curve:
+                    st.markdown("Air Density ρ = ISA density at the district elevation")
+                    st.markdown(f"= ρ({site_elevation:.0f} m) = {site_air_density:.3f} kg/m³")
+                    st.markdown("Weibull Scale c = V_avg / Γ(1 + 1/k)")
+                    st.markdown(f"= {avg_wind_speed} / Γ(1 + 1/{weibull_k}) = {weibull_c:.2f} m/s")
+                    st.markdown("Capacity Factor = ∫ P(v · (ρ/1.225)^⅓) × Weibull(v; c, k) dv")
+                    st.markdown(f"= {capacity_factor:.3f}")
+                    st.markdown('</div>', unsafe_allow_html=True)
+                    st.caption(f"Power curve: {turbine_model}, normalized to rated output with IEC 61400-12-1 "
+                               "air-density correction. Turbulence intensity is not used by this model.")
+                else:
+                    st.markdown("Capacity Factor = 0.087 × V_avg - (Turbulence × 0.005)")
+                    st.markdown(f"= 0.087 × {avg_wind_speed} - ({turbulence} × 0.005) = {capacity_factor:.3f}")
+                    st.markdown('</div>', unsafe_allow_html=True)
+                    st.caption("Based on empirical formula from NIWE studies (V_avg = wind speed in m/s)")
+            
+                st.markdown("**Annual Energy Generation:**")
+                st.markdown('<div class="calculation-box">', unsafe_allow_html=True)
+                st.markdown("Annual Generation (MWh) = Capacity (MW) × 8760 hours × Capacity Factor")
+                st.markdown(f"= {capacity_mw} × 8760 × {capacity_factor:.3f} = {estimated_annual_generation:,.0f} MWh")
+                st.markdown('</div>', unsafe_allow_html=True)
+            
+                st.markdown('<h3 class="section-header">Financial Calculations</h3>', unsafe_allow_html=True)
+            
+                st.markdown("**Revenue Calculation:**")
+                st.markdown('<div class="calculation-box">', unsafe_allow_html=True)
+                st.markdown("Annual Revenue (₹) = Annual Generation (MWh) × Tariff (₹/kWh) × 1000")
+                st.markdown(f"= {estimated_annual_generation:,.0f} × {tariff_rate} × 1000 = ₹ {annual_revenue:,.0f}")
+                st.markdown('</div>', unsafe_allow_html=True)
+            
+                st.markdown("**Cost Calculations:**")
+                st.markdown('<div class="calculation-box">', unsafe_allow_html=True)
+                st.markdown("Total Investment (₹) = Turbine Cost (₹ lakhs/MW) × Capacity (MW) × 100,000")
+                st.markdown(f"= {turbine_cost} × {capacity_mw} × 100,000 = ₹ {total_investment:,.0f}")
+            
+                st.markdown("Annual O&M Cost (₹) = O&M Cost (₹ lakhs/MW/year) × Capacity (MW) × 100,000")
+                st.markdown(f"= {om_cost} × {capacity_mw} × 100,000 = ₹ {annual_om_cost:,.0f}")
+                st.markdown('</div>', unsafe_allow_html=True)
+            
+                st.markdown("**Discounted Cash Flow:**")
+                st.markdown('<div class="calculation-box">', unsafe_allow_html=True)
+                st.markdown("Revenueₜ = Annual Revenue × (1 - Degradation)ᵗ⁻¹ × (1 + Tariff Escalation)ᵗ⁻¹")
+                st.markdown("O&Mₜ = Annual O&M Cost × (1 + O&M Escalation)ᵗ⁻¹")
+                st.markdown(f"Equity Cash Flowₜ = Revenueₜ - O&Mₜ - Debt Service (annuity over "
+                            f"{min(finance_params['loan_tenor'], years)} years at {finance_params['interest_rate']}%)")
+                st.markdown(f"NPV = Σ Equity Cash Flowₜ / (1 + {finance_params['discount_rate']}%)ᵗ "
+                            f"- Equity ({100 - finance_params['debt_share']:.0f}% of investment) = ₹ {npv:,.0f}")
+                st.markdown("LCOE = PV(Investment + O&M) / PV(Generation)")
+                st.markdown(f"= ₹ {lcoe:.2f}/kWh")
+                st.markdown('</div>', unsafe_allow_html=True)
+
+            # The computed results go to their own fragments. The hourly series and farm layout need a power curve;
+            # the empirical model uses the baseline shape and default turbine for them
+            scenario_charts(base_params, finance_params, series, total_investment, selected_district, baseline_source,
+                            use_power_curve, weibull_k if use_power_curve else weibull_k_baseline,
+                            turbine_model if use_power_curve else energy.DEFAULT_TURBINE, area_km)
+            feasibility_export(base_params, finance_params)
+
+        with kpi_container:
+            kpi_column(scenario)
+
+    # A shared link's scenario is read once per session and used as the widget defaults
+    if "shared_scenario" not in st.session_state:
+        st.session_state["shared_scenario"] = scenario_state.decode(st.query_params)
+    shared_scenario = st.session_state["shared_scenario"]
+
+    # Sidebar for user inputs; the scenario fragment draws its inputs into the placeholder containers
+    with st.sidebar, perf.span("sidebar"):
         st.markdown('<div class="district-selector">', unsafe_allow_html=True)
         st.header("📍 Select District")
-        selected_district = st.selectbox("", list(district_data.keys()), index=1)
+        district_names = list(district_data.keys())
+        selected_district = st.selectbox("", district_names, index=district_names.index(shared_scenario["district"])
+                                         if shared_scenario.get("district") in district_data else 1)
         st.markdown('</div>', unsafe_allow_html=True)
         
         # --- DESIGN: Added icons to headers ---
         st.markdown('<h3 class="section-header">⚙️ Project Parameters</h3>', unsafe_allow_html=True)
-        years = st.slider("Project Lifetime (Years)", 1, 25, 15)
-        capacity_mw = st.number_input("Turbine Capacity (MW)", 0.5, 10.0, 2.5, step=0.5)
-        area_km = st.number_input("Project Area (sq. km)", 1.0, 100.0, 10.0, step=1.0)
+        project_container = st.container()
         
         st.markdown('<h3 class="section-header">💨 Wind Conditions</h3>', unsafe_allow_html=True)
-        avg_wind_speed = st.slider("Average Wind Speed (m/s)", 3.0, 12.0, 
-                                   district_data[selected_district]["wind_speed"], step=0.1)
-        st.markdown('<div class="wind-speed-indicator"></div>', unsafe_allow_html=True)
-        st.caption("Low ← Wind Speed → High")
+        with st.expander("📂 Measured Wind Data"):
+            uploaded_csv = st.file_uploader("Met-mast / SCADA CSV (10-minute records)", type="csv")
+            if uploaded_csv is not None and st.session_state.get("ingested_upload") != uploaded_csv.file_id:
+                with st.spinner("Summarizing measurements..."):
+                    try:
+                        measured = ingest.summarize_csv(uploaded_csv)
+                        summary_name = os.path.splitext(uploaded_csv.name)[0]
+                        ingest.write_summary(measured, os.path.join(ingest.SUMMARY_DIR, f"{summary_name}.json"))
+                        st.session_state["ingested_upload"] = uploaded_csv.file_id
+                        st.success(f"Summarized {measured['records']:,} records as '{summary_name}'.")
+                    except ValueError as e:
+                        st.error(f"Could not read measurements: {e}")
+            st.caption("Multi-GB files: run `python ingest.py <file.csv>` on the server instead.")
+            resource_raster = wind_raster()
+            baseline_sources = ([scenario_state.DEFAULT_BASELINE]
+                                + ([scenario_state.RASTER_BASELINE] if resource_raster is not None else [])
+                                + ingest.list_summaries())
+            baseline_source = st.selectbox("Baseline Source", baseline_sources,
+                                           index=baseline_sources.index(shared_scenario["baseline"])
+                                           if shared_scenario.get("baseline") in baseline_sources else 0)
         
-        turbulence = st.slider("Turbulence Intensity (%)", 5.0, 25.0, 
-                               district_data[selected_district]["turbulence"], step=0.1)
+        wind_baseline = district_data[selected_district]["wind_speed"]
+        turbulence_baseline = district_data[selected_district]["turbulence"]
+        weibull_k_baseline = 2.0
+        if baseline_source == scenario_state.RASTER_BASELINE:
+            import calendar
+            import raster
+
+            # Any point of the raster: defaults to the district, or type in coordinates from a map click
+            point_lat = st.number_input("Latitude", -90.0, 90.0, float(district_data[selected_district]["lat"]),
+                                        step=0.01, format="%.3f")
+            point_lon = st.number_input("Longitude", -180.0, 180.0, float(district_data[selected_district]["lon"]),
+                                        step=0.01, format="%.3f")
+            heights = resource_raster.heights
+            hub_height = None
+            if heights.size > 1:
+                hub_height = st.slider("Hub Height (m)", float(heights.min()), float(heights.max()),
+                                       float(np.clip(100.0, heights.min(), heights.max())), step=5.0)
+            elif heights.size:
+                hub_height = float(heights[0])
+            raster_speed = float(resource_raster.sample(raster.MEAN_SPEED, point_lat, point_lon, height=hub_height))
+            if np.isnan(raster_speed):
+                st.warning("This point is outside the wind-resource raster; using the district baseline.")
+            else:
+                wind_baseline = round(float(np.clip(raster_speed, *wind_model.INPUT_RANGES["wind_speed"])), 1)
+                at_height = f" at {hub_height:g} m" if hub_height is not None else ""
+                st.caption(f"Baseline {raster_speed:.2f} m/s{at_height} from the wind-resource raster.")
+                if raster.MONTHLY_SPEED in resource_raster.variables:
+                    monthly = resource_raster.sample(raster.MONTHLY_SPEED, point_lat, point_lon, height=hub_height)
+                    months = [calendar.month_abbr[int(month)] for month in resource_raster.coords["month"]]
+                    st.caption(f"Monthly mean {np.nanmin(monthly):.1f}–{np.nanmax(monthly):.1f} m/s "
+                               f"(calmest {months[int(np.nanargmin(monthly))]}, "
+                               f"windiest {months[int(np.nanargmax(monthly))]}).")
+        elif baseline_source != scenario_state.DEFAULT_BASELINE:
+            measured = ingest.load_summary(baseline_source)
+            wind_baseline = round(float(np.clip(measured["mean_wind_speed"], *wind_model.INPUT_RANGES["wind_speed"])), 1)
+            if measured["turbulence_intensity"] is not None:
+                turbulence_baseline = round(float(np.clip(measured["turbulence_intensity"],
+                                                          *wind_model.INPUT_RANGES["turbulence"])), 1)
+            if measured["weibull_k"] is not None:
+                weibull_k_baseline = round(float(np.clip(measured["weibull_k"], 1.2, 3.5)), 1)
+            st.caption(f"Baseline from {measured['records']:,} measured records ({baseline_source}).")
+        # The shared link's wind inputs apply while its district and baseline source are selected
+        if (shared_scenario.get("district") == selected_district
+                and shared_scenario.get("baseline", scenario_state.DEFAULT_BASELINE) == baseline_source):
+            wind_baseline = shared_scenario.get("wind_speed", wind_baseline)
+            turbulence_baseline = shared_scenario.get("turbulence", turbulence_baseline)
+            weibull_k_baseline = shared_scenario.get("weibull_k", weibull_k_baseline)
         
-        st.markdown('<h3 class="section-header">💰 Financial Parameters</h3>', unsafe_allow_html=True)
-        turbine_cost = st.number_input("Turbine Cost (₹ lakhs/MW)", 500, 1000, 700)
-        om_cost = st.number_input("O&M Cost (₹ lakhs/MW/year)", 10, 50, 30)
-        tariff_rate = st.number_input("Electricity Tariff (₹/kWh)", 3.0, 8.0, 5.2, step=0.1)
+        wind_container = st.container()
         
         st.markdown("---")
         st.info("Adjust parameters to simulate different wind project scenarios.")
@@ -379,183 +1270,26 @@ if page == "Wind Dashboard":
         # District information
         st.markdown(f'<h3 class="section-header">🗺️ District Overview: {selected_district}</h3>', unsafe_allow_html=True)
         
-        # Create a map centered on the selected district
-        map_center = [district_data[selected_district]["lat"], district_data[selected_district]["lon"]]
-        # --- DESIGN: Changed map style ---
-        m = folium.Map(location=map_center, zoom_start=9, tiles="CartoDB positron")
-        
-        # Add marker for the selected district
-        folium.Marker(
-            map_center,
-            popup=f"<strong>{selected_district}</strong><br>Wind Speed: {district_data[selected_district]['wind_speed']} m/s",
-            tooltip=f"Click for details",
-            icon=folium.Icon(color="green", icon="wind", prefix="fa") # --- DESIGN: Changed icon color ---
-        ).add_to(m)
-        
-        # Display the map
-        st.markdown('<div class="map-container">', unsafe_allow_html=True)
-        folium_static(m, width=700, height=300)
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        # District metrics
-        col1a, col2a, col3a = st.columns(3)
-        with col1a:
-            st.metric("Average Wind Speed", f"{district_data[selected_district]['wind_speed']} m/s")
-        with col2a:
-            st.metric("Wind Potential", district_data[selected_district]["potential"])
-        with col3a:
-            st.metric("Theoretical Potential", f"{district_data[selected_district]['wind_potential']} MW/sq.km")
+        district_map(selected_district)
+        district_metrics(selected_district)
+        # Filled by the scenario dashboard, which owns the turbine selection the energy share depends on
+        rose_container = st.container()
         
-        st.markdown(f"**Data Source:** [{district_data[selected_district]['source']}]({district_data[selected_district]['source_url']})")
+        if len(site_data) > len(district_data):
+            with st.expander("Nearest Candidate Sites"):
+                nearest_index, nearest_km = site_data.nearest(district_data[selected_district]["lat"],
+                                                              district_data[selected_district]["lon"],
+                                                              k=min(6, len(site_data)))
+                nearby = site_data.frame.iloc[nearest_index].assign(distance_km=nearest_km.round(1))
+                nearby = nearby[nearby["name"] != selected_district].head(5)
+                st.dataframe(nearby[["name", "distance_km", "wind_speed", "turbulence", "wind_potential", "source"]],
+                             hide_index=True)
         
-        # --- DESIGN: Calculations placed inside an expander to clean up the UI ---
-        with st.expander("Show Detailed Calculation Steps"):
-            st.markdown('<h3 class="section-header">Energy Production Calculations</h3>', unsafe_allow_html=True)
-            
-            st.markdown("**Capacity Factor Calculation:**")
-            st.markdown('<div class="calculation-box">', unsafe_allow_html=True)
-            st.markdown("Capacity Factor = 0.087 × V_avg - (Turbulence × 0.005)")
-            capacity_factor = max(0.087 * avg_wind_speed - (turbulence * 0.005), 0)
-            st.markdown(f"= 0.087 × {avg_wind_speed} - ({turbulence} × 0.005) = {capacity_factor:.3f}")
-            st.markdown('</div>', unsafe_allow_html=True)
-            st.caption("Based on empirical formula from NIWE studies (V_avg = wind speed in m/s)")
-            
-            st.markdown("**Annual Energy Generation:**")
-            st.markdown('<div class="calculation-box">', unsafe_allow_html=True)
-            st.markdown("Annual Generation (MWh) = Capacity (MW) × 8760 hours × Capacity Factor")
-            estimated_annual_generation = capacity_mw * 8760 * capacity_factor
-            st.markdown(f"= {capacity_mw} × 8760 × {capacity_factor:.3f} = {estimated_annual_generation:,.0f} MWh")
-            st.markdown('</div>', unsafe_allow_html=True)
-            
-            st.markdown('<h3 class="section-header">Financial Calculations</h3>', unsafe_allow_html=True)
-            
-            st.markdown("**Revenue Calculation:**")
-            st.markdown('<div class="calculation-box">', unsafe_allow_html=True)
-            st.markdown("Annual Revenue (₹) = Annual Generation (MWh) × Tariff (₹/kWh) × 1000")
-            annual_revenue = estimated_annual_generation * tariff_rate * 1000
-            st.markdown(f"= {estimated_annual_generation:,.0f} × {tariff_rate} × 1000 = ₹ {annual_revenue:,.0f}")
-            st.markdown('</div>', unsafe_allow_html=True)
-            
-            st.markdown("**Cost Calculations:**")
-            st.markdown('<div class="calculation-box">', unsafe_allow_html=True)
-            st.markdown("Total Investment (₹) = Turbine Cost (₹ lakhs/MW) × Capacity (MW) × 100,000")
-            total_investment = capacity_mw * turbine_cost * 100000
-            st.markdown(f"= {turbine_cost} × {capacity_mw} × 100,000 = ₹ {total_investment:,.0f}")
-            
-            st.markdown("Annual O&M Cost (₹) = O&M Cost (₹ lakhs/MW/year) × Capacity (MW) × 100,000")
-            annual_om_cost = capacity_mw * om_cost * 100000
-            st.markdown(f"= {om_cost} × {capacity_mw} × 100,000 = ₹ {annual_om_cost:,.0f}")
-            st.markdown('</div>', unsafe_allow_html=True)
-
-        # Financial metrics (calculated outside expander to be available for charts)
-        capacity_factor = max(0.087 * avg_wind_speed - (turbulence * 0.005), 0)
-        estimated_annual_generation = capacity_mw * 8760 * capacity_factor
-        annual_revenue = estimated_annual_generation * tariff_rate * 1000
-        total_investment = capacity_mw * turbine_cost * 100000
-        annual_om_cost = capacity_mw * om_cost * 100000
-        annual_cash_flow = annual_revenue - annual_om_cost
-        total_revenue = annual_revenue * years
-        total_om_cost = annual_om_cost * years
-        net_profit = total_revenue - total_investment - total_om_cost
-        roi = (net_profit / total_investment) * 100 if total_investment > 0 else 0
-        payback_period = total_investment / annual_cash_flow if annual_cash_flow > 0 else float('inf')
-        
-        years_range = np.arange(1, years + 1)
-        cumulative_generation = [estimated_annual_generation * y for y in years_range]
-        cumulative_revenue = [annual_revenue * y for y in years_range]
-        cumulative_cash_flow = [annual_cash_flow * y - total_investment for y in years_range]
-        
-        # --- DESIGN: Replaced Radio Button with modern Tabs ---
-        tab1, tab2, tab3 = st.tabs(["📊 Financial Performance", "⚡ Energy Output", "📈 Cash Flow Analysis (Interactive)"])
-        
-        with tab1:
-            fig, ax = plt.subplots(figsize=(10, 6))
-            plt.style.use('dark_background')
-            ax.set_facecolor('#1a202c')
-            fig.patch.set_facecolor('#0f1a2a')
-            ax.plot(years_range, cumulative_revenue, marker="s", linewidth=2.5, color="#4fd1c5", label="Revenue", markersize=8)
-            ax.axhline(y=total_investment, color="#fc8181", linestyle="--", linewidth=2, label="Initial Investment")
-            ax.fill_between(years_range, cumulative_revenue, alpha=0.3, color="#4fd1c5")
-            ax.set_ylabel("Amount (₹)", fontweight='bold', color='white')
-            ax.set_title("Financial Performance Over Time", fontweight='bold', fontsize=14, color='white')
-            ax.legend(facecolor='#2d3748', edgecolor='#4a5568', labelcolor='white')
-            ax.grid(True, alpha=0.3, linestyle='--', color='#4a5568')
-            ax.tick_params(colors='white')
-            ax.set_xlabel("Years", fontweight='bold', color='white')
-            st.pyplot(fig)
-            
-        with tab2:
-            fig2, ax2 = plt.subplots(figsize=(10, 6))
-            plt.style.use('dark_background')
-            ax2.set_facecolor('#1a202c')
-            fig2.patch.set_facecolor('#0f1a2a')
-            ax2.plot(years_range, cumulative_generation, marker="o", linewidth=2.5, color="#4fd1c5", markersize=8)
-            ax2.fill_between(years_range, cumulative_generation, alpha=0.3, color="#4fd1c5")
-            ax2.set_ylabel("Cumulative Energy (MWh)", fontweight='bold', color='white')
-            ax2.set_title("Projected Energy Output Over Time", fontweight='bold', fontsize=14, color='white')
-            ax2.grid(True, alpha=0.3, linestyle='--', color='#4a5568')
-            ax2.tick_params(colors='white')
-            ax2.set_xlabel("Years", fontweight='bold', color='white')
-            st.pyplot(fig2)
-
-        with tab3:
-            # --- DESIGN: Replaced Matplotlib chart with an interactive Plotly chart ---
-            fig_plotly = go.Figure()
-            fig_plotly.add_trace(go.Scatter(x=list(years_range), y=cumulative_cash_flow, mode='lines+markers', name='Net Cash Flow',
-                                     line=dict(color='#4fd1c5', width=3), marker=dict(size=8)))
-            fig_plotly.update_layout(
-                title='Interactive Project Cash Flow Over Time',
-                xaxis_title='Years',
-                yaxis_title='Net Cash Flow (₹)',
-                plot_bgcolor='#1a202c',
-                paper_bgcolor='#0f1a2a',
-                font=dict(color='#e6e9f0'),
-                xaxis=dict(gridcolor='#4a5568'),
-                yaxis=dict(gridcolor='#4a5568'),
-                hovermode='x unified'
-            )
-            fig_plotly.add_hline(y=0, line_dash="dash", line_color="#fc8181")
-            st.plotly_chart(fig_plotly, use_container_width=True)
+        scenario_container = st.container()
 
-    with col2:
-        # Key metrics display
-        st.markdown('<h3 class="section-header">📊 Key Performance Indicators</h3>', unsafe_allow_html=True)
-        
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.markdown('<p class="metric-label">Capacity Factor</p>', unsafe_allow_html=True)
-        st.markdown(f'<p class="metric-value">{capacity_factor:.1%}</p>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.markdown('<p class="metric-label">Annual Energy Generation</p>', unsafe_allow_html=True)
-        st.markdown(f'<p class="metric-value">{estimated_annual_generation:,.0f} MWh</p>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.markdown('<p class="metric-label">Total Investment</p>', unsafe_allow_html=True)
-        st.markdown(f'<p class="metric-value">₹ {total_investment:,.0f}</p>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.markdown('<p class="metric-label">Annual Revenue</p>', unsafe_allow_html=True)
-        st.markdown(f'<p class="metric-value">₹ {annual_revenue:,.0f}</p>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.markdown('<p class="metric-label">Net Profit</p>', unsafe_allow_html=True)
-        st.markdown(f'<p class="metric-value">₹ {net_profit:,.0f}</p>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.markdown('<p class="metric-label">ROI</p>', unsafe_allow_html=True)
-        st.markdown(f'<p class="metric-value">{roi:.1f}%</p>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.markdown('<p class="metric-label">Payback Period</p>', unsafe_allow_html=True)
-        payback_display = f"{payback_period:.1f} years" if payback_period != float('inf') else "> Project Lifetime"
-        st.markdown(f'<p class="metric-value">{payback_display}</p>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+    scenario_dashboard(selected_district, baseline_source, (wind_baseline, turbulence_baseline, weibull_k_baseline),
+                       {**scenario_state.DEFAULTS, **shared_scenario}, project_container, wind_container,
+                       rose_container, scenario_container, col2)
 
     # --- ADDED FOOTNOTE ---
     st.markdown("""
@@ -565,22 +1299,212 @@ if page == "Wind Dashboard":
     </p>
     """, unsafe_allow_html=True)
 
-# --- ADDED TABLEAU PAGE ---
-elif page == "Tableau Dashboard":
-    st.markdown('<h1 class="main-header">📊 Tableau Public Dashboard</h1>', unsafe_allow_html=True)
-    st.info("This page displays an interactive dashboard hosted on Tableau Public.")
+# --- ADDED PORTFOLIO OPTIMIZER PAGE ---
+elif page == "Portfolio Optimizer":
+    import pandas as pd
+    import plotly.graph_objects as go
 
-    tableau_url = "https://public.tableau.com/shared/HRDB37R89?:display_count=n&:origin=viz_share_link"
-    
-    
+    import finance
+    import portfolio
+    import site_store
+    import wind_model
 
-    embed_code = f'<iframe src="{tableau_url}:showVizHome=no&:embed=true" width="100%" height="800px" frameBorder="0"></iframe>'
-    
-    components.html(embed_code, height=825, scrolling=True)
+    st.markdown('<h1 class="main-header">🗂️ Portfolio Optimizer</h1>', unsafe_allow_html=True)
+    st.info("Split a capital budget across every district and candidate site. Each site is scored per MW once, "
+            "then funded in order of value per rupee up to its capacity limit (Wind Potential × developable area).")
+
+    with st.sidebar, perf.span("portfolio_inputs"):
+        st.markdown('<h3 class="section-header">💼 Portfolio</h3>', unsafe_allow_html=True)
+        budget_crore = st.number_input("Capital Budget (₹ crore)", 10.0, 100000.0, 500.0, step=50.0)
+        objective = st.radio("Maximise", list(portfolio.OBJECTIVES), key="portfolio_objective",
+                             format_func=lambda key: portfolio.OBJECTIVES[key][1])
+        default_area_km = st.number_input("Developable Area per Site (sq. km)", 1.0, 100.0,
+                                          portfolio.DEFAULT_AREA_KM, step=1.0,
+                                          help="Used for sites without an area_km value in the site table")
+        unit_mw = st.number_input("Turbine Unit Size (MW, 0 = continuous)", 0.0, 10.0, 2.5, step=0.5)
+
+        st.markdown('<h3 class="section-header">💰 Financial Parameters</h3>', unsafe_allow_html=True)
+        years = st.slider("Project Lifetime (Years)", *wind_model.INPUT_RANGES["years"], 20)
+        turbine_cost = st.number_input("Turbine Cost (₹ lakhs/MW)", *wind_model.INPUT_RANGES["turbine_cost"], 700)
+        om_cost = st.number_input("O&M Cost (₹ lakhs/MW/year)", *wind_model.INPUT_RANGES["om_cost"], 30)
+        tariff_rate = st.number_input("Electricity Tariff (₹/kWh)", *wind_model.INPUT_RANGES["tariff_rate"], 5.2, step=0.1)
+        with st.expander("🏦 Financing & Discounting"):
+            finance_params = {
+                "discount_rate": st.number_input("Discount Rate (%/year)", *finance.FINANCE_RANGES["discount_rate"],
+                                                 step=0.5),
+                "debt_share": st.slider("Debt Share (%)", *finance.FINANCE_RANGES["debt_share"], step=5.0),
+                "interest_rate": st.number_input("Loan Interest Rate (%/year)", *finance.FINANCE_RANGES["interest_rate"],
+                                                 step=0.25),
+            }
+
+    with perf.span("portfolio_optimize"):
+        sites = site_store.load_sites().frame
+        allocation = portfolio.optimize(sites, budget_crore, objective, tariff_rate, turbine_cost, om_cost, years,
+                                        default_area_km, unit_mw, **finance_params)
+    totals = allocation["totals"]
+    crore = portfolio.RUPEES_PER_CRORE
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Capital Deployed", f"₹ {totals['investment'] / crore:,.1f} crore",
+                  f"{totals['investment'] / crore / budget_crore:.0%} of budget", delta_color="off")
+    with col2:
+        sites_funded = totals["sites_funded"]
+        st.metric("Installed Capacity", f"{totals['capacity_mw']:,.1f} MW",
+                  f"{sites_funded} site{'' if sites_funded == 1 else 's'}", delta_color="off")
+    with col3:
+        st.metric("Portfolio Equity NPV", f"₹ {totals['npv'] / crore:,.1f} crore")
+    with col4:
+        st.metric("Annual Generation", f"{totals['annual_generation']:,.0f} MWh")
+
+    if objective == "npv":
+        achieved, bound_display = totals["npv"], f"₹ {totals['upper_bound'] / crore:,.1f} crore"
+    else:
+        achieved, bound_display = totals["annual_generation"], f"{totals['upper_bound']:,.0f} MWh"
+    if sites_funded == 0:
+        st.warning("No site adds value under these assumptions; nothing was funded.")
+    elif unit_mw and totals["upper_bound"] > 0:
+        st.caption(f"Whole {unit_mw:g} MW units reach {achieved / totals['upper_bound']:.2%} of the continuous "
+                   f"optimum ({portfolio.OBJECTIVES[objective][1]} {bound_display}).")
+
+    with perf.span("chart.portfolio"):
+        funded = allocation["order"][allocation["capacity_mw"][allocation["order"]] > 0]
+        table = pd.DataFrame({
+            "name": sites["name"].to_numpy()[funded],
+            "kind": sites["kind"].to_numpy()[funded],
+            "wind_speed": sites["wind_speed"].to_numpy()[funded],
+            "capacity_mw": allocation["capacity_mw"][funded],
+            "max_mw": allocation["max_mw"][funded],
+            "investment_crore": allocation["investment"][funded] / crore,
+            "npv_crore": allocation["npv"][funded] / crore,
+            "annual_generation_mwh": allocation["annual_generation"][funded],
+            "equity_irr": allocation["equity_irr"][funded],
+            "value_per_crore": allocation["value_per_crore"][funded],
+        })
+
+        st.markdown('<h3 class="section-header">📊 Allocation by Site</h3>', unsafe_allow_html=True)
+        shown = table.head(30)
+        fig_portfolio = go.Figure()
+        fig_portfolio.add_trace(go.Bar(x=shown["name"], y=shown["max_mw"] - shown["capacity_mw"], name='Unused Capacity',
+                                       marker_color='#4a5568'))
+        fig_portfolio.add_trace(go.Bar(x=shown["name"], y=shown["capacity_mw"], name='Allocated Capacity',
+                                       marker_color='#4fd1c5'))
+        fig_portfolio.update_layout(
+            barmode='stack',
+            title='Capacity per Site, in Funding Order' + (' (top 30)' if len(table) > 30 else ''),
+            xaxis_title='Site',
+            yaxis_title='Capacity (MW)',
+            plot_bgcolor='#1a202c',
+            paper_bgcolor='#0f1a2a',
+            font=dict(color='#e6e9f0'),
+            xaxis=dict(gridcolor='#4a5568'),
+            yaxis=dict(gridcolor='#4a5568'),
+        )
+        st.plotly_chart(fig_portfolio, width="stretch")
+        st.dataframe(table, hide_index=True, width="stretch")
+        value_unit = "₹ of equity NPV" if objective == "npv" else "MWh of annual generation"
+        st.caption(f"{len(sites):,} districts and sites scored. Value per crore is the {value_unit} "
+                   f"added by each ₹ 1 crore invested at that site.")
+
+# --- ADDED DISTRICT ANALYTICS PAGE ---
+elif page == "District Analytics":
+    # Native charts from pre-aggregated district data (formerly an embedded Tableau Public view)
+    import numpy as np
+    import plotly.graph_objects as go
+
+    import district_analytics
+    import site_store
+
+    st.markdown('<h1 class="main-header">📊 District Analytics</h1>', unsafe_allow_html=True)
+    st.info("District wind resource and default-scenario economics, computed locally from the district dataset.")
+
+    with perf.span("district_analytics"):
+        summary = district_analytics_summary(os.path.getmtime(site_store.DISTRICTS_PATH))
+        totals = summary["totals"]
+        ratings = summary["by_rating"]["potential"]
+
+        col_filter, col_metric = st.columns(2)
+        with col_filter:
+            selected_ratings = st.multiselect("Potential Rating", ratings, default=ratings)
+        with col_metric:
+            metric = st.selectbox("Compare Districts By", list(district_analytics.METRICS),
+                                  index=list(district_analytics.METRICS).index("wind_potential"),
+                                  format_func=lambda column: district_analytics.METRICS[column][0])
+        shown = district_analytics.select(summary, selected_ratings)
+
+        col_count, col_speed, col_potential, col_npv = st.columns(4)
+        with col_count:
+            st.metric("Districts", f"{len(shown['name'])} of {totals['districts']}")
+        with col_speed:
+            st.metric("Mean Wind Speed", f"{shown['wind_speed'].mean():.2f} m/s" if shown["name"] else "–")
+        with col_potential:
+            st.metric("Highest Potential", totals["top_potential"] or "–")
+        with col_npv:
+            st.metric("Best Default-Scenario NPV", totals["best_npv"] or "–")
+
+        label, value_format = district_analytics.METRICS[metric]
+        order = np.argsort(-shown[metric]) if shown["name"] else []
+        col_bar, col_scatter = st.columns(2)
+        with col_bar:
+            fig_bar = go.Figure(go.Bar(
+                x=[shown["name"][i] for i in order], y=shown[metric][order], marker_color='#4fd1c5',
+                hovertemplate=f'%{{x}}: %{{y:{value_format}}}<extra></extra>'))
+            fig_bar.update_layout(title=label, yaxis_tickformat=value_format, plot_bgcolor='#1a202c',
+                                  paper_bgcolor='#0f1a2a', font=dict(color='#e6e9f0'),
+                                  xaxis=dict(gridcolor='#4a5568'), yaxis=dict(gridcolor='#4a5568'))
+            st.plotly_chart(fig_bar, width="stretch")
+        with col_scatter:
+            fig_scatter = go.Figure(go.Scatter(
+                x=shown["wind_speed"], y=shown["turbulence"], mode='markers+text', text=shown["name"],
+                textposition='top center', customdata=shown["wind_potential"],
+                marker=dict(size=8 + 2 * shown["wind_potential"], color=shown["capacity_factor"],
+                            colorscale='YlGnBu', colorbar=dict(title='Capacity Factor', tickformat='.0%')),
+                hovertemplate='%{text}<br>%{x:.1f} m/s, %{y:.1f}% turbulence<br>'
+                              '%{customdata:.1f} MW/sq.km<extra></extra>'))
+            fig_scatter.update_layout(title='Wind Speed vs Turbulence (size: wind potential)',
+                                      xaxis_title='Wind Speed (m/s)', yaxis_title='Turbulence Intensity (%)',
+                                      plot_bgcolor='#1a202c', paper_bgcolor='#0f1a2a', font=dict(color='#e6e9f0'),
+                                      xaxis=dict(gridcolor='#4a5568'), yaxis=dict(gridcolor='#4a5568'))
+            st.plotly_chart(fig_scatter, width="stretch")
+
+        by_rating = summary["by_rating"]
+        fig_rating = go.Figure()
+        fig_rating.add_trace(go.Bar(x=by_rating["potential"], y=by_rating["wind_speed"], name='Mean Wind Speed (m/s)',
+                                    marker_color='#4a5568'))
+        fig_rating.add_trace(go.Bar(x=by_rating["potential"], y=by_rating["wind_potential"],
+                                    name='Mean Potential (MW/sq.km)', marker_color='#4fd1c5'))
+        fig_rating.update_layout(title='By Potential Rating', barmode='group', plot_bgcolor='#1a202c',
+                                 paper_bgcolor='#0f1a2a', font=dict(color='#e6e9f0'),
+                                 xaxis=dict(gridcolor='#4a5568'), yaxis=dict(gridcolor='#4a5568'))
+        st.plotly_chart(fig_rating, width="stretch")
+
+        # Plotly table rather than st.dataframe, so the page does not need pandas
+        table_columns = ["wind_speed", "wind_potential", "turbulence", "capacity_factor", "weibull_capacity_factor",
+                         "annual_generation", "payback_period", "equity_irr", "lcoe"]
+        fig_table = go.Figure(go.Table(
+            header=dict(values=["District", "Rating"] + [district_analytics.METRICS[c][0] for c in table_columns],
+                        fill_color='#1a202c', font=dict(color='#e6e9f0'), align='left'),
+            cells=dict(values=[shown["name"], shown["potential"]] + [shown[c] for c in table_columns],
+                       format=[None, None] + [district_analytics.METRICS[c][1] for c in table_columns],
+                       fill_color='#0f1a2a', font=dict(color='#e6e9f0'), align='left')))
+        fig_table.update_layout(paper_bgcolor='#0f1a2a', margin=dict(l=0, r=0, t=10, b=0),
+                                height=60 + 30 * max(len(shown["name"]), 1))
+        st.plotly_chart(fig_table, width="stretch")
+
+        scenario = summary["scenario"]
+        st.caption(f"Default scenario: {scenario['capacity_mw']:g} MW, ₹{scenario['tariff_rate']:g}/kWh tariff, "
+                   f"₹{scenario['turbine_cost']} lakhs/MW, ₹{scenario['om_cost']} lakhs/MW/year O&M over "
+                   f"{scenario['years']} years; the Weibull capacity factor uses k = 2 and the "
+                   f"{summary['turbine']} power curve at each district's elevation.")
 
 #data source page
 
 elif page == "Data Sources & Information":
+    import site_store
+
+    # Baselines straight from data/districts.csv; the full site store (pandas, SciPy) is not needed here
+    district_data = site_store.district_baselines()
+
     st.markdown('<h1 class="main-header">📚 Data Sources & Detailed Methodology</h1>', unsafe_allow_html=True)
     st.info("This section provides a transparent, detailed breakdown of our data sources and the precise step-by-step calculations used in the dashboard.")
     st.markdown("---")
@@ -717,52 +1641,42 @@ elif page == "AI Assistant":
     st.markdown('<h1 class="main-header">🤖 AI Assistant for Wind Energy</h1>', unsafe_allow_html=True)
     st.info("Ask a question about wind energy, technology, or policy. Improvements are currently underway.")
 
-    API_URL = "https://api-inference.huggingface.co/models/google/gemma-7b-it" 
-    
+    import requests
+
+    import ai_client
+
     if 'HF_TOKEN' in st.secrets:
-        headers = {"Authorization": f"Bearer {st.secrets['HF_TOKEN']}"}
+        client = get_inference_client(st.secrets['HF_TOKEN'], st.secrets.get('HF_API_URL', ai_client.DEFAULT_API_URL))
     else:
         st.error("Hugging Face API token not found. Please add it to your Streamlit secrets.")
         st.stop()
 
-    def query_model(payload):
-        response = requests.post(API_URL, headers=headers, json=payload)
-        return response
-
     user_prompt = st.text_area("Your question:", placeholder="e.g., How does a wind turbine generate electricity?", height=100)
+    stream_answer = st.checkbox("Stream the answer as it is generated", value=True)
 
     if st.button("Get AI Answer"):
         if user_prompt:
-            with st.spinner("Querying the AI model... This may take a moment on the first run."):
-                try:
-                    response = query_model({
-                        "inputs": user_prompt,
-                        "parameters": {"max_new_tokens": 250}
-                    })
-                    
-                    if response.status_code == 200:
-                        output = response.json()
-                        if isinstance(output, list) and 'generated_text' in output[0]:
-                            generated_text = output[0]['generated_text']
-                            answer = generated_text.replace(user_prompt, "").strip()
-                            st.markdown("### Answer:")
-                            st.write(answer)
-                        elif 'error' in output:
-                            st.error(f"Model Error: {output['error']}")
-                            if 'estimated_time' in output:
-                                st.warning(f"The model is still loading. Please try again in about {int(output['estimated_time'])} seconds.")
-                        else:
-                            st.error("Received an unexpected response from the model.")
-                            st.write("Raw model output for debugging:", output)
+            parameters = {"max_new_tokens": 250}
+            try:
+                with perf.span("ai_query"):
+                    if stream_answer:
+                        st.markdown("### Answer:")
+                        st.write_stream(client.stream(user_prompt, parameters))
                     else:
-                        st.error(f"Failed to query model. Status code: {response.status_code}")
-                        st.write("Response content:", response.text)
-                        st.warning("The model may be loading or unavailable. Please try again in a minute.")
-
-                except requests.exceptions.RequestException as e:
-                    st.error(f"Network error: {e}")
-                except Exception as e:
-                    st.error(f"An error occurred: {e}")
+                        with st.spinner("Querying the AI model... This may take a moment on the first run."):
+                            answer = client.generate(user_prompt, parameters)
+                        st.markdown("### Answer:")
+                        st.write(answer)
+            except ai_client.ModelError as e:
+                st.error(f"Model Error: {e}")
+                if e.estimated_time:
+                    st.warning(f"The model is still loading. Please try again in about {int(e.estimated_time)} seconds.")
+                elif e.status_code:
+                    st.warning("The model may be loading or unavailable. Please try again in a minute.")
+            except requests.exceptions.RequestException as e:
+                st.error(f"Network error: {e}")
+            except Exception as e:
+                st.error(f"An error occurred: {e}")
         else:
             st.warning("Please enter a question.")
 
@@ -805,7 +1719,7 @@ elif page == "Feedback & Support":
         email_config = get_email_config()
 
         # Check if email credentials are set
-        if not email_config['sender_email'] or not email_config['sender_password']:
+        if not is_email_configured(email_config):
             st.warning("The email feedback form is currently disabled because email credentials are not configured in the application's secrets.")
         else:
             with st.form(key='feedback_form'):
@@ -825,12 +1739,12 @@ elif page == "Feedback & Support":
                     elif not is_valid_email(email):
                         st.error("Please enter a valid email address.")
                     else:
-                        with st.spinner("Sending your feedback..."):
+                        with perf.span("feedback_enqueue"):
                             success = send_feedback_email(name, email, feedback_type, message, email_config)
-                            if success:
-                                st.success("Thank you! Your feedback has been sent successfully.")
-                            else:
-                                st.error("Sorry, something went wrong. Please try again later or use the Google Form.")
+                        if success:
+                            st.success("Thank you! Your feedback has been received and will be emailed to our team shortly.")
+                        else:
+                            st.error("Sorry, something went wrong. Please try again later or use the Google Form.")
     
     st.markdown("---")
     st.markdown('<h3 class="section-header">Contact Information</h3>', unsafe_allow_html=True)
@@ -847,3 +1761,23 @@ elif page == "Feedback & Support":
         For informational purposes only. Actual project feasibility requires detailed site assessment.
     </p>
     """, unsafe_allow_html=True)
+
+# --- ADDED PERFORMANCE PANEL ---
+perf.end_run(f"page.{page}")
+with st.sidebar:
+    st.markdown("---")
+    if st.checkbox("⏱️ Performance panel", key="perf_panel",
+                   help="Time the dashboard's sections on every rerun of this session"):
+        if perf.enabled():
+            st.caption("This session (ms)")
+            st.dataframe(perf.rows(st.session_state["perf_stats"]), hide_index=True)
+            st.caption("All sessions in this process (ms)")
+            st.dataframe(perf.rows(perf.process_stats()), hide_index=True)
+            export_dir = os.environ.get("DASHBOARD_PERF_EXPORT_DIR", "perf")
+            col_json, col_prom = st.columns(2)
+            if col_json.button("Export JSON"):
+                st.success(f"Written to {perf.export(os.path.join(export_dir, 'spans.json'))}")
+            if col_prom.button("Export Prometheus"):
+                st.success(f"Written to {perf.export(os.path.join(export_dir, 'spans.prom'))}")
+        else:
+            st.caption("Timings start with the next interaction.")
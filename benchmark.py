@@ -0,0 +1,329 @@
+"""Benchmark suite for dashboard startup, page reruns and the financial model.
+
+Startup is measured per page in a fresh interpreter: the time spent
+importing modules during the first render (``-X importtime``) and the
+first-render time itself, plus which heavy dependencies the page pulled
+in. A page importing a heavy module outside its ``PAGE_IMPORTS``
+allowance fails the run like a timing regression. Pages are driven headlessly with Streamlit's ``AppTest``: each page in the
+navigation is rendered, then re-rendered after representative widget
+changes, recording wall time and peak Python memory (tracemalloc) per
+rerun. The calculation layer is micro-benchmarked separately. Results are
+written as JSON and checked against ``benchmark_thresholds.json``; the
+process exits non-zero when any benchmark exceeds its threshold.
+
+Usage:
+    python benchmark.py                      # run and enforce thresholds
+    python benchmark.py --update-thresholds  # re-baseline (results × headroom)
+    python benchmark.py --only startup       # cold start budget only
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(ROOT, "app.py")
+THRESHOLDS_PATH = os.path.join(ROOT, "benchmark_thresholds.json")
+PAGES = ["Wind Dashboard", "Portfolio Optimizer", "District Analytics", "Data Sources & Information", "AI Assistant",
+         "Feedback & Support"]
+# Placeholder secrets so every page renders; nothing is sent anywhere during a rerun
+BENCHMARK_SECRETS = {
+    "HF_TOKEN": "benchmark",
+    "SENDER_EMAIL": "benchmark@example.com",
+    "SENDER_PASSWORD": "benchmark",
+    "RECEIVER_EMAIL": "benchmark@example.com",
+}
+# Heavy dependencies that app.py imports lazily, and the ones each page is allowed to load
+LAZY_MODULES = ["numpy", "pandas", "scipy", "matplotlib", "folium", "requests", "smtplib"]
+PAGE_IMPORTS = {
+    "Wind Dashboard": {"numpy", "pandas", "scipy", "matplotlib", "folium", "requests"},
+    "Portfolio Optimizer": {"numpy", "pandas", "scipy"},
+    "District Analytics": {"numpy"},
+    "Data Sources & Information": {"numpy"},
+    "AI Assistant": {"numpy", "requests"},
+    "Feedback & Support": set(),
+}
+FLOORS = {"seconds": 0.005, "import_seconds": 0.005, "peak_mb": 1.0}
+# Run in a fresh interpreter per page so nothing is imported yet
+STARTUP_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+app_path, page, secrets, lazy_modules = json.loads(sys.argv[1])
+at = AppTest.from_file(app_path, default_timeout=120)
+at.secrets.update(secrets)
+at.session_state["page"] = page
+sys.stderr.write("benchmark: first render\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+at.run()
+seconds = time.perf_counter() - start
+error = at.exception[0].value if at.exception else None
+print(json.dumps({"seconds": seconds, "error": error, "modules": [m for m in lazy_modules if m in sys.modules]}))
+"""
+
+
+def _measure(func, repeat):
+    """Median wall time (s) over ``repeat`` calls, then peak traced memory (MB) of one more.
+
+    Memory is traced in a separate call because tracemalloc itself slows
+    Python code down several times over.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": statistics.median(times), "peak_mb": peak / 1024 ** 2}
+
+
+def _widget(widgets, label):
+    return next(widget for widget in widgets if widget.label == label)
+
+
+def _new_app():
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import AppTest, local_script_runner
+
+    # A server compiles app.py once; AppTest gives every run a fresh script cache and would recompile it on
+    # each rerun, so page memory would track the size of app.py rather than the page
+    script_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: script_cache
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.secrets.update(BENCHMARK_SECRETS)
+    return at
+
+
+def _select_page(at, page):
+    _widget(at.sidebar.selectbox, "Navigate").set_value(page)
+
+
+def _import_seconds(stderr):
+    """Cumulative time of top-level imports logged by ``-X importtime`` after the first-render marker"""
+    total_us = 0
+    lines = stderr.splitlines()
+    for line in lines[lines.index("benchmark: first render") + 1:]:
+        if line.startswith("import time:"):
+            _, cumulative, name = line.split("|")
+            # Nested imports are indented below their parent and already counted in its cumulative time
+            if not name[1:].startswith(" ") and cumulative.strip().isdigit():
+                total_us += int(cumulative)
+    return total_us / 1e6
+
+
+def startup_benchmarks(repeat):
+    """Import time and first-render time of every page in a fresh interpreter (median over runs)"""
+    results = {}
+    for page in PAGES:
+        runs = []
+        for _ in range(repeat):
+            arg = json.dumps([APP_PATH, page, BENCHMARK_SECRETS, LAZY_MODULES])
+            proc = subprocess.run([sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT, arg],
+                                  capture_output=True, text=True, cwd=ROOT)
+            if proc.returncode != 0:
+                raise RuntimeError(f"startup of {page} failed:\n{proc.stderr[-2000:]}")
+            run = json.loads(proc.stdout.strip().splitlines()[-1])
+            if run["error"]:
+                raise RuntimeError(f"{page} raised: {run['error']}")
+            run["import_seconds"] = _import_seconds(proc.stderr)
+            runs.append(run)
+        results[f"startup.{page}"] = {
+            "seconds": statistics.median(run["seconds"] for run in runs),
+            "import_seconds": statistics.median(run["import_seconds"] for run in runs),
+            "modules": runs[-1]["modules"],
+        }
+    return results
+
+
+def check_imports(results):
+    """Pages that imported heavy modules outside their allowance"""
+    failures = []
+    for page, allowed in PAGE_IMPORTS.items():
+        result = results.get(f"startup.{page}")
+        if result is not None:
+            extra = sorted(set(result["modules"]) - allowed)
+            if extra:
+                failures.append(f"startup.{page}: imports {', '.join(extra)}")
+    return failures
+
+
+def page_benchmarks(repeat):
+    """Rerun timings for every page, plus slider changes on the Wind Dashboard"""
+    results = {}
+    at = _new_app()
+    start = time.perf_counter()
+    at.run()
+    results["page.cold_start"] = {"seconds": time.perf_counter() - start}
+    for page in PAGES:
+        def rerun(page=page):
+            _select_page(at, page)
+            at.run()
+        results[f"page.{page}"] = _measure(rerun, repeat)
+        if at.exception:
+            raise RuntimeError(f"{page} raised: {at.exception[0].value}")
+
+    _select_page(at, "Wind Dashboard")
+    at.run()
+    changes = {
+        "tariff_rate": lambda i: _widget(at.sidebar.number_input, "Electricity Tariff (₹/kWh)").set_value(4.0 + 0.1 * i),
+        "wind_speed": lambda i: _widget(at.sidebar.slider, "Average Wind Speed (m/s)").set_value(5.0 + 0.1 * i),
+        "years": lambda i: _widget(at.sidebar.slider, "Project Lifetime (Years)").set_value(10 + i),
+        "district": lambda i: at.sidebar.selectbox[1].set_value(at.sidebar.selectbox[1].options[i % 4]),
+    }
+    for name, change in changes.items():
+        step = iter(range(repeat + 1))
+
+        def rerun(change=change, step=step):
+            change(next(step))
+            at.run()
+        results[f"rerun.{name}"] = _measure(rerun, repeat)
+    return results
+
+
+def model_benchmarks(repeat):
+    """Micro-benchmarks of the calculation layer"""
+    import downsample
+    import energy
+    import farm
+    import finance
+    import portfolio
+    import raster
+    import scoring
+    import sensitivity
+    import wind_model
+    import wind_rose
+
+    base = dict(wind_speed=5.7, turbulence=11.2, capacity_mw=2.5, tariff_rate=5.2, turbine_cost=700, om_cost=30,
+                years=15)
+    rng = np.random.default_rng(0)
+    n = 1_000_000
+    batch = {name: rng.uniform(*wind_model.INPUT_RANGES[name], n) for name in base}
+    batch["years"] = np.round(batch["years"])
+    dcf_batch = {name: values[:100_000] for name, values in batch.items()}
+    scoring_rows = [{"district": name, "tariff_rate": tariff, "years": 15}
+                    for name, tariff in zip(["Bhopal", "Indore", "Jabalpur", "Ujjain"] * 2500, batch["tariff_rate"])]
+    sites = {"wind_speed": batch["wind_speed"][:10_000], "turbulence": batch["turbulence"][:10_000],
+             "wind_potential": rng.uniform(1, 15, 10_000), "area_km": np.full(10_000, np.nan)}
+    direction = rng.uniform(0, 360, n)
+    rose_counts = wind_rose.histogram(batch["wind_speed"], direction)
+    hourly = energy.lifetime_hourly_generation(5.7, 2.5, 25, elevation=553)
+    hours = np.arange(hourly.size)
+    farm_xy, _ = farm.grid_layout(500, 100.0)
+    # A 0.01° raster over Madhya Pradesh at three hub heights, memory-mapped from disk
+    with tempfile.TemporaryDirectory() as raster_dir:
+        raster.write_raster(raster_dir, np.linspace(21, 27, 601), np.linspace(74, 83, 901),
+                            {raster.MEAN_SPEED: (rng.uniform(3, 8, (3, 601, 901)), ("height", "lat", "lon"))},
+                            {"height": [50, 100, 150]})
+        resource = raster.open_raster(raster_dir)
+        points = rng.uniform(21, 27, n), rng.uniform(74, 83, n)
+        raster_sample = _measure(lambda: resource.sample(raster.MEAN_SPEED, *points, height=120), repeat)
+        del resource  # release the memory maps before the directory is removed
+
+    return {
+        "model.single_scenario": _measure(lambda: wind_model.evaluate_scenario(**base), repeat),
+        "model.cumulative_series": _measure(
+            lambda: wind_model.cumulative_series(wind_model.evaluate_scenario(**base), 25), repeat),
+        "model.batch_1e6": _measure(lambda: wind_model.evaluate_scenarios(**batch), repeat),
+        "model.sensitivity_grid_200x200": _measure(
+            lambda: sensitivity.grid_sweep(base, "tariff_rate", "wind_speed"), repeat),
+        "model.tornado": _measure(lambda: sensitivity.tornado(base), repeat),
+        "model.dcf_batch_1e5": _measure(lambda: finance.evaluate_scenarios(**dcf_batch), repeat),
+        "model.dcf_grid_200x200": _measure(
+            lambda: sensitivity.grid_sweep(base, "tariff_rate", "wind_speed", kpi="equity_irr"), repeat),
+        "model.portfolio_10k_sites": _measure(
+            lambda: portfolio.optimize(sites, 5000, tariff_rate=5.2, turbine_cost=700, om_cost=30, years=15,
+                                       unit_mw=2.5), repeat),
+        "model.scoring_10k_rows": _measure(lambda: "".join(scoring.score_stream(scoring_rows)), repeat),
+        "model.wind_rose_bin_1e6": _measure(lambda: wind_rose.histogram(batch["wind_speed"], direction), repeat),
+        "model.wind_rose_16_sectors": _measure(lambda: wind_rose.rose(rose_counts, 16, 2.0), repeat),
+        "model.downsample_minmax_25_years": _measure(lambda: downsample.window(hours, hourly), repeat),
+        "model.downsample_lttb_25_years": _measure(lambda: downsample.window(hours, hourly, method="lttb"), repeat),
+        "model.raster_sample_1e6": raster_sample,
+        "model.farm_wakes_500_turbines": _measure(lambda: farm.farm_energy(farm_xy, 2.5, 6.0, elevation=553), repeat),
+        "model.hourly_25_years": _measure(
+            lambda: energy.lifetime_hourly_generation(5.7, 2.5, 25, elevation=553), repeat),
+    }
+
+
+def check(results, thresholds):
+    """Names and details of benchmarks that exceed their thresholds"""
+    failures = []
+    for name, limit in thresholds.items():
+        if name not in results:
+            continue
+        for metric in FLOORS:
+            if metric in limit and metric in results[name] and results[name][metric] > limit[metric]:
+                failures.append(f"{name}: {metric} {results[name][metric]:.4g} > {limit[metric]:.4g}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", choices=["startup", "pages", "model"])
+    parser.add_argument("--update-thresholds", action="store_true")
+    parser.add_argument("--headroom", type=float, default=2.0, help="threshold = result × headroom")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    results = {}
+    if args.only in (None, "startup"):
+        results.update(startup_benchmarks(args.repeat))
+    if args.only in (None, "pages"):
+        results.update(page_benchmarks(args.repeat))
+    if args.only in (None, "model"):
+        results.update(model_benchmarks(args.repeat))
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    for name, result in results.items():
+        peak = f"{result['peak_mb']:10.2f} MB" if "peak_mb" in result else ""
+        if "import_seconds" in result:
+            peak = f"{result['import_seconds'] * 1000:10.2f} ms importing {', '.join(result['modules']) or '-'}"
+        print(f"{name:45s} {result['seconds'] * 1000:10.2f} ms {peak}")
+
+    thresholds = {}
+    if os.path.exists(THRESHOLDS_PATH):
+        with open(THRESHOLDS_PATH) as f:
+            thresholds = json.load(f)
+
+    if args.update_thresholds:
+        # Floors keep sub-millisecond benchmarks from failing on timer noise; benchmarks
+        # that were not run (--only) keep their previous thresholds
+        thresholds.update({name: {metric: round(max(value, FLOORS[metric]) * args.headroom, 6)
+                                  for metric, value in result.items() if metric in FLOORS}
+                           for name, result in results.items()})
+        with open(THRESHOLDS_PATH, "w") as f:
+            json.dump(thresholds, f, indent=2)
+        print(f"Thresholds written to {THRESHOLDS_PATH}")
+        return 0
+
+    failures = check(results, thresholds) + check_imports(results)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
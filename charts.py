@@ -0,0 +1,95 @@
+"""Cached matplotlib chart rendering for the Wind Dashboard.
+
+Charts are rendered to PNG or SVG bytes, memoized in a bounded LRU cache
+keyed by their input arrays, so identical reruns cost a dictionary lookup.
+Figures are built with ``matplotlib.figure.Figure`` rather than pyplot:
+pyplot's global figure manager is not thread-safe, and Streamlit runs every
+session's script (and export jobs) on its own thread. Nothing registers the
+figures anywhere, so long-lived servers do not accumulate open figures.
+"""
+import io
+
+import numpy as np
+from matplotlib import style
+from matplotlib.figure import Figure
+
+from caching import LRUCache, make_key
+
+# Style is process-wide state: apply it once instead of on every rerun
+style.use('dark_background')
+
+FIGURE_SIZE = (10, 6)
+DPI = 150
+chart_cache = LRUCache(max_entries=64, max_bytes=64 * 1024 * 1024)
+
+
+def _style_axes(fig, ax, title, ylabel):
+    ax.set_facecolor('#1a202c')
+    fig.patch.set_facecolor('#0f1a2a')
+    ax.set_ylabel(ylabel, fontweight='bold', color='white')
+    ax.set_title(title, fontweight='bold', fontsize=14, color='white')
+    ax.grid(True, alpha=0.3, linestyle='--', color='#4a5568')
+    ax.tick_params(colors='white')
+    ax.set_xlabel("Years", fontweight='bold', color='white')
+
+
+def _render(draw, fmt):
+    """Draw onto a fresh figure and serialize it"""
+    fig = Figure(figsize=FIGURE_SIZE)
+    draw(fig, fig.subplots())
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=DPI, facecolor=fig.get_facecolor(), bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def financial_performance_chart(years_range, cumulative_revenue, total_investment, fmt="png"):
+    """Cumulative revenue against the initial investment, as image bytes"""
+    def draw(fig, ax):
+        ax.plot(years_range, cumulative_revenue, marker="s", linewidth=2.5, color="#4fd1c5", label="Revenue", markersize=8)
+        ax.axhline(y=total_investment, color="#fc8181", linestyle="--", linewidth=2, label="Initial Investment")
+        ax.fill_between(years_range, cumulative_revenue, alpha=0.3, color="#4fd1c5")
+        _style_axes(fig, ax, "Financial Performance Over Time", "Amount (₹)")
+        ax.legend(facecolor='#2d3748', edgecolor='#4a5568', labelcolor='white')
+
+    key = make_key("financial_performance", years_range, cumulative_revenue, total_investment, fmt)
+    return chart_cache.get_or_set(key, lambda: _render(draw, fmt))
+
+
+def energy_output_chart(years_range, cumulative_generation, fmt="png"):
+    """Cumulative energy output over the project lifetime, as image bytes"""
+    def draw(fig, ax):
+        ax.plot(years_range, cumulative_generation, marker="o", linewidth=2.5, color="#4fd1c5", markersize=8)
+        ax.fill_between(years_range, cumulative_generation, alpha=0.3, color="#4fd1c5")
+        _style_axes(fig, ax, "Projected Energy Output Over Time", "Cumulative Energy (MWh)")
+
+    key = make_key("energy_output", years_range, cumulative_generation, fmt)
+    return chart_cache.get_or_set(key, lambda: _render(draw, fmt))
+
+
+def feasibility_page(pdf, title, flows, kpis):
+    """One PDF page: cumulative equity cash flow and annual generation of a scenario, with its KPIs"""
+    years = np.arange(flows["equity"].shape[-1])
+    fig = Figure(figsize=(8.27, 11.69))
+    ax_cash, ax_energy = fig.subplots(2, 1)
+    ax_cash.bar(years, flows["equity"], color=np.where(flows["equity"] < 0, "#fc8181", "#4fd1c5"), alpha=0.6,
+                label="Equity Cash Flow")
+    ax_cash.plot(years, flows["equity"].cumsum(), marker="o", linewidth=2.5, color="#f6e05e",
+                 label="Cumulative Equity Cash Flow")
+    ax_cash.axhline(y=0, color="#e6e9f0", linewidth=1)
+    _style_axes(fig, ax_cash, "Equity Cash Flow", "Amount (₹)")
+    ax_cash.legend(facecolor='#2d3748', edgecolor='#4a5568', labelcolor='white')
+
+    ax_energy.plot(years[1:], flows["generation"][1:], marker="o", linewidth=2.5, color="#4fd1c5")
+    ax_energy.fill_between(years[1:], flows["generation"][1:], alpha=0.3, color="#4fd1c5")
+    _style_axes(fig, ax_energy, "Annual Energy Output", "Energy (MWh)")
+
+    irr = f"{kpis['equity_irr']:.1f}%" if kpis["equity_irr"] == kpis["equity_irr"] else "n/a"
+    payback = (f"{kpis['discounted_payback']:.1f} years" if kpis["discounted_payback"] != float("inf")
+               else "> Project Lifetime")
+    fig.suptitle(title, fontweight='bold', fontsize=16, color='white')
+    fig.text(0.5, 0.93, f"Capacity factor {kpis['capacity_factor']:.1%}  ·  Equity NPV ₹ {kpis['npv']:,.0f}  ·  "
+             f"Equity IRR {irr}\nLCOE ₹ {kpis['lcoe']:.2f}/kWh  ·  Discounted payback {payback}",
+             ha="center", color="white")
+    # Fixed margins: tight_layout would draw every page twice
+    fig.subplots_adjust(top=0.86, bottom=0.06, hspace=0.3)
+    pdf.savefig(fig, facecolor=fig.get_facecolor())
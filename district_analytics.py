@@ -0,0 +1,84 @@
+"""Pre-aggregated district summaries for the District Analytics page.
+
+``summarize`` computes everything the page shows in one pass over the
+district records. Per district it gives the wind resource, the Weibull
+capacity factor of the default turbine at the district's elevation, and the
+KPIs of the default scenario, scored in one batched ``finance`` call. It
+also rolls these up by potential rating. The page caches the result per
+districts file and only filters and plots it, so it needs no third-party
+server.
+"""
+import numpy as np
+
+import energy
+import finance
+import scenario_state
+
+SCENARIO_INPUTS = ("capacity_mw", "tariff_rate", "turbine_cost", "om_cost", "years")
+RESOURCE_COLUMNS = ("wind_speed", "turbulence", "wind_potential", "elevation", "lat", "lon")
+KPI_COLUMNS = ("capacity_factor", "weibull_capacity_factor", "annual_generation", "roi", "payback_period", "npv",
+               "equity_irr", "lcoe")
+# Column -> (label, format) for charts and tables
+METRICS = {
+    "wind_speed": ("Wind Speed (m/s)", ".1f"),
+    "wind_potential": ("Wind Potential (MW/sq.km)", ".1f"),
+    "turbulence": ("Turbulence Intensity (%)", ".1f"),
+    "elevation": ("Elevation (m)", ".0f"),
+    "capacity_factor": ("Capacity Factor (empirical)", ".1%"),
+    "weibull_capacity_factor": ("Capacity Factor (Weibull)", ".1%"),
+    "annual_generation": ("Annual Generation (MWh)", ",.0f"),
+    "roi": ("ROI (%)", ".1f"),
+    "payback_period": ("Payback (years)", ".1f"),
+    "npv": ("NPV (₹)", ",.0f"),
+    "equity_irr": ("Equity IRR (%)", ".1f"),
+    "lcoe": ("LCOE (₹/kWh)", ".2f"),
+}
+
+
+def summarize(records):
+    """Per-district columns, roll-ups by potential rating and headline totals for ``{name: record}``"""
+    names = sorted(records, key=lambda name: -records[name]["wind_potential"])
+    columns = {"name": names, "potential": [records[name]["potential"] for name in names]}
+    for column in RESOURCE_COLUMNS:
+        columns[column] = np.array([records[name][column] for name in names], dtype=float)
+
+    # The default scenario (sidebar defaults) at every district in one batch
+    scenario = {name: scenario_state.DEFAULTS[name] for name in SCENARIO_INPUTS}
+    kpis = finance.evaluate_scenarios(columns["wind_speed"], columns["turbulence"], **scenario,
+                                      **finance.FINANCE_DEFAULTS)
+    for column in KPI_COLUMNS:
+        if column in kpis:
+            columns[column] = np.asarray(kpis[column], dtype=float)
+    # The density correction takes one elevation per call
+    columns["weibull_capacity_factor"] = np.array([
+        float(energy.weibull_capacity_factor(speed, 2.0, scenario_state.DEFAULTS["turbine"], elevation))
+        for speed, elevation in zip(columns["wind_speed"], columns["elevation"])])
+
+    ratings = list(dict.fromkeys(columns["potential"]))
+    rating = np.array([ratings.index(value) for value in columns["potential"]], dtype=np.intp)
+    counts = np.bincount(rating, minlength=len(ratings))
+    by_rating = {"potential": ratings, "districts": counts}
+    for column in ("wind_speed", "wind_potential", "capacity_factor", "npv"):
+        by_rating[column] = np.bincount(rating, weights=columns[column], minlength=len(ratings)) / counts
+
+    return {
+        "districts": columns,
+        "by_rating": by_rating,
+        "scenario": scenario,
+        "turbine": scenario_state.DEFAULTS["turbine"],
+        "totals": {
+            "districts": len(names),
+            "mean_wind_speed": float(columns["wind_speed"].mean()) if names else float("nan"),
+            "top_potential": names[0] if names else None,
+            "best_npv": names[int(np.argmax(columns["npv"]))] if names else None,
+        },
+    }
+
+
+def select(summary, ratings):
+    """Per-district columns restricted to the given potential ratings"""
+    columns = summary["districts"]
+    keep = np.array([value in ratings for value in columns["potential"]], dtype=bool)
+    return {column: ([value for value, kept in zip(values, keep) if kept] if isinstance(values, list)
+                     else values[keep])
+            for column, values in columns.items()}
@@ -0,0 +1,82 @@
+"""Server-side downsampling of long time series for the browser.
+
+A chart never needs more points than it has pixels across. ``minmax``
+keeps the lowest and highest reading of each of ``max_points / 2`` equal
+buckets, so every peak and trough stays visible; ``lttb`` (Largest-Triangle-
+Three-Buckets) keeps one visually significant point per bucket for smooth
+lines. ``window`` slices a zoomed range first, so zooming in re-fetches the
+visible span at full resolution while the payload stays at most
+``max_points`` per trace however long the series is. ``scatter`` builds a
+Plotly trace from the result, switching to WebGL above ``WEBGL_THRESHOLD``.
+"""
+import numpy as np
+
+MAX_POINTS = 2000  # per trace; about one point per pixel column of a full-width chart
+WEBGL_THRESHOLD = 1000  # series longer than this are drawn with Scattergl
+
+
+def _bucket_rows(n, buckets):
+    """Bucket size and count splitting ``n`` readings into at most ``buckets`` equal buckets"""
+    size = -(-n // buckets)
+    return size, -(-n // size)
+
+
+def minmax(x, y, max_points=MAX_POINTS):
+    """Indices of the minimum and maximum of each bucket (plus the end points), in order"""
+    y = np.asarray(y, dtype=float)
+    n = y.size
+    if n <= max_points:
+        return np.arange(n)
+    size, rows = _bucket_rows(n - 2, max(1, (max_points - 2) // 2))
+    # Pad the last bucket with its final reading so the buckets reshape into one array
+    inner = np.pad(y[1:-1], (0, size * rows - (n - 2)), mode="edge").reshape(rows, size)
+    offsets = 1 + size * np.arange(rows)
+    picked = np.concatenate([[0], offsets + inner.argmin(axis=1), offsets + inner.argmax(axis=1), [n - 1]])
+    return np.unique(np.minimum(picked, n - 1))
+
+
+def lttb(x, y, max_points=MAX_POINTS):
+    """Indices of the Largest-Triangle-Three-Buckets points (plus the end points), in order"""
+    x = np.asarray(x)
+    x = (x.astype(np.int64) if x.dtype.kind == "M" else x).astype(float)
+    y = np.asarray(y, dtype=float)
+    n = y.size
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.intp)
+    # The third vertex of each triangle is the mean of the following bucket
+    sums = np.add.reduceat(np.stack([x[1:-1], y[1:-1]]), edges[:-1] - 1, axis=1)
+    means = sums / np.diff(edges)
+    means = np.concatenate([means[:, 1:], [[x[-1]], [y[-1]]]], axis=1)
+    picked = np.empty(max_points, dtype=np.intp)
+    picked[0], picked[-1] = 0, n - 1
+    for bucket, (start, stop) in enumerate(zip(edges[:-1], edges[1:])):
+        a = picked[bucket]
+        # Twice the triangle area between the last kept point, each candidate and the next bucket's mean
+        area = np.abs((x[a] - means[0, bucket]) * (y[start:stop] - y[a])
+                      - (x[a] - x[start:stop]) * (means[1, bucket] - y[a]))
+        picked[bucket + 1] = start + area.argmax()
+    return picked
+
+
+METHODS = {"minmax": minmax, "lttb": lttb}
+
+
+def window(x, y, x0=None, x1=None, max_points=MAX_POINTS, method="minmax"):
+    """``(x, y)`` downsampled to the range ``[x0, x1]`` of sorted ``x``, keeping one point either side of it"""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    start = max(0, np.searchsorted(x, x0, side="left") - 1) if x0 is not None else 0
+    stop = min(x.size, np.searchsorted(x, x1, side="right") + 1) if x1 is not None else x.size
+    x, y = x[start:stop], y[start:stop]
+    picked = METHODS[method](x, y, max_points)
+    return x[picked], y[picked]
+
+
+def scatter(x, y, x0=None, x1=None, max_points=MAX_POINTS, method="minmax", **trace):
+    """Plotly line trace of the visible window: ``go.Scatter`` for short series, ``go.Scattergl`` for long ones"""
+    import plotly.graph_objects as go
+
+    length = np.size(y)
+    x, y = window(x, y, x0, x1, max_points, method)
+    return (go.Scattergl if length > WEBGL_THRESHOLD else go.Scatter)(x=x, y=y, **trace)
@@ -0,0 +1,102 @@
+"""Weibull / hourly energy engine with tabulated turbine power curves.
+
+Wind is modelled as a Weibull distribution (or taken from an hourly series)
+and converted to output through a normalized turbine power curve that is
+precomputed once as a fine lookup table. Site air density, derived from the
+district elevation, is applied with the IEC 61400-12-1 equivalent wind
+speed correction. Everything is vectorized, so a 25-year hourly run is a
+handful of array operations.
+"""
+from functools import lru_cache
+from math import gamma
+
+import numpy as np
+
+HOURS_PER_YEAR = 8760
+STANDARD_AIR_DENSITY = 1.225  # kg/m³ at sea level, 15 °C
+LOOKUP_RESOLUTION = 0.01  # m/s
+LOOKUP_MAX_SPEED = 40.0  # m/s
+
+# Generic pitch-regulated turbine classes; output is normalized to rated power
+TURBINES = {
+    "Generic IEC III (low wind)": {"cut_in": 3.0, "rated_speed": 10.5, "cut_out": 22.0},
+    "Generic IEC II (medium wind)": {"cut_in": 3.0, "rated_speed": 12.0, "cut_out": 25.0},
+    "Generic IEC I (high wind)": {"cut_in": 3.5, "rated_speed": 13.5, "cut_out": 25.0},
+}
+DEFAULT_TURBINE = "Generic IEC III (low wind)"
+
+
+def air_density(elevation):
+    """Air density (kg/m³) at an elevation (m) in the ICAO standard atmosphere"""
+    elevation = np.asarray(elevation, dtype=float)
+    temperature = 288.15 - 0.0065 * elevation
+    pressure = 101325 * (temperature / 288.15) ** 5.2559
+    return pressure / (287.05 * temperature)
+
+
+def _power_curve(speeds, spec):
+    """Normalized output of a pitch-regulated turbine: cubic ramp to rated, flat to cut-out"""
+    cut_in, rated_speed, cut_out = spec["cut_in"], spec["rated_speed"], spec["cut_out"]
+    ramp = (speeds ** 3 - cut_in ** 3) / (rated_speed ** 3 - cut_in ** 3)
+    output = np.where(speeds < rated_speed, ramp, 1.0)
+    return np.where((speeds >= cut_in) & (speeds < cut_out), np.clip(output, 0.0, 1.0), 0.0)
+
+
+@lru_cache(maxsize=None)
+def power_curve_table(turbine):
+    """Lookup table of normalized output at 0..LOOKUP_MAX_SPEED in LOOKUP_RESOLUTION steps"""
+    speeds = np.arange(0.0, LOOKUP_MAX_SPEED + LOOKUP_RESOLUTION, LOOKUP_RESOLUTION)
+    table = _power_curve(speeds, TURBINES[turbine])
+    table.setflags(write=False)
+    return table
+
+
+def normalized_output(wind_speed, turbine=DEFAULT_TURBINE, elevation=0.0):
+    """Normalized turbine output for an array of wind speeds at a site elevation"""
+    table = power_curve_table(turbine)
+    # Equivalent standard-density wind speed (IEC 61400-12-1)
+    density_ratio = air_density(elevation) / STANDARD_AIR_DENSITY
+    position = np.asarray(wind_speed, dtype=float) * density_ratio ** (1 / 3) / LOOKUP_RESOLUTION
+    position = np.clip(position, 0, len(table) - 1)
+    index = np.minimum(position.astype(np.intp), len(table) - 2)
+    fraction = position - index
+    return table[index] * (1 - fraction) + table[index + 1] * fraction
+
+
+def weibull_scale(mean_speed, shape):
+    """Weibull scale parameter c for a mean wind speed and shape k"""
+    return np.asarray(mean_speed, dtype=float) / gamma(1 + 1 / shape)
+
+
+def weibull_capacity_factor(mean_speed, shape=2.0, turbine=DEFAULT_TURBINE, elevation=0.0):
+    """Expected capacity factor for Weibull winds, integrated over the lookup grid.
+
+    ``mean_speed`` may be an array; the result has the same shape.
+    """
+    table = power_curve_table(turbine)
+    density_ratio = air_density(elevation) / STANDARD_AIR_DENSITY
+    # Integrate on the equivalent-speed grid: site speed v maps to v * ratio^(1/3)
+    site_speeds = np.arange(len(table)) * LOOKUP_RESOLUTION / density_ratio ** (1 / 3)
+    scale = weibull_scale(mean_speed, shape)[..., np.newaxis]
+    cdf = 1 - np.exp(-(site_speeds / scale) ** shape)
+    # Probability of each grid interval times the mean output over it
+    interval_output = (table[1:] + table[:-1]) / 2
+    return (np.diff(cdf, axis=-1) * interval_output).sum(axis=-1)
+
+
+def weibull_hourly_speeds(mean_speed, shape=2.0, hours=HOURS_PER_YEAR, seed=0):
+    """Synthetic hourly wind speeds drawn from a Weibull distribution"""
+    rng = np.random.default_rng(seed)
+    return weibull_scale(mean_speed, shape) * rng.weibull(shape, hours)
+
+
+def hourly_generation(wind_speeds, capacity_mw, turbine=DEFAULT_TURBINE, elevation=0.0):
+    """Hourly generation (MWh) for an hourly wind speed series"""
+    return capacity_mw * normalized_output(wind_speeds, turbine, elevation)
+
+
+def lifetime_hourly_generation(mean_speed, capacity_mw, years, shape=2.0, turbine=DEFAULT_TURBINE,
+                               elevation=0.0, seed=0):
+    """Hourly generation (MWh) over the full project lifetime from Weibull winds"""
+    speeds = weibull_hourly_speeds(mean_speed, shape, hours=int(years) * HOURS_PER_YEAR, seed=seed)
+    return hourly_generation(speeds, capacity_mw, turbine, elevation)
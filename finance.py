@@ -0,0 +1,212 @@
+"""Discounted cash flow engine on top of the scenario engine.
+
+Takes the year-one results of ``wind_model.evaluate_scenarios`` and builds
+year-by-year project and equity cash flows with tariff and O&M escalation,
+annual output degradation and an annuity loan for the debt share of the
+investment. Every input may be a scalar or an array; cash flows carry a
+trailing year axis (year 0 = construction) up to the longest lifetime in
+the batch, and years past a scenario's own lifetime are zero. The equity IRR
+is solved for the whole batch at once with safeguarded Newton iterations.
+"""
+import numpy as np
+
+import wind_model
+
+# Financing inputs (min, max, default), rates and shares in % like the other sidebar inputs
+FINANCE_RANGES = {
+    "discount_rate": (0.0, 20.0, 10.0),  # % per year, nominal cost of equity
+    "tariff_escalation": (0.0, 10.0, 0.0),  # % per year
+    "om_escalation": (0.0, 10.0, 5.0),  # % per year
+    "degradation": (0.0, 3.0, 0.5),  # % of output lost per year
+    "debt_share": (0.0, 90.0, 70.0),  # % of the investment financed by debt
+    "interest_rate": (0.0, 20.0, 9.5),  # % per year
+    "loan_tenor": (1, 20, 10),  # years
+}
+FINANCE_DEFAULTS = {name: default for name, (_, _, default) in FINANCE_RANGES.items()}
+
+KPI_NAMES = ("npv", "equity_irr", "lcoe", "discounted_payback")
+
+
+def _years_axis(years):
+    """Year index 1..horizon and the mask of years inside each scenario's lifetime"""
+    years = np.asarray(years, dtype=float)
+    horizon = int(np.max(years))
+    t = np.arange(1, horizon + 1, dtype=float)
+    return t, t <= years[..., np.newaxis]
+
+
+def _column(value):
+    """Batch input as an array with a trailing axis for broadcasting against years"""
+    return np.asarray(value, dtype=float)[..., np.newaxis]
+
+
+def _with_year_zero(year_zero, later_years, shape):
+    """Prepend the year-0 value to the operating years, broadcast to ``shape`` (batch + years)"""
+    return np.concatenate([np.broadcast_to(year_zero, shape[:-1] + (1,)), np.broadcast_to(later_years, shape)],
+                          axis=-1)
+
+
+def cash_flows(results, years, discount_rate=FINANCE_DEFAULTS["discount_rate"],
+               tariff_escalation=FINANCE_DEFAULTS["tariff_escalation"],
+               om_escalation=FINANCE_DEFAULTS["om_escalation"], degradation=FINANCE_DEFAULTS["degradation"],
+               debt_share=FINANCE_DEFAULTS["debt_share"], interest_rate=FINANCE_DEFAULTS["interest_rate"],
+               loan_tenor=FINANCE_DEFAULTS["loan_tenor"]):
+    """Year-by-year cash flows (₹) and generation (MWh), year 0 included.
+
+    Returns a dict of arrays with a trailing year axis: ``generation``,
+    ``revenue``, ``om_cost``, ``debt_service``, ``project`` (unlevered) and
+    ``equity`` cash flows. The loan is repaid as an annuity over
+    ``loan_tenor`` years, capped at the project lifetime. ``discount_rate``
+    is accepted so the full parameter set can be passed through; it does
+    not change the cash flows themselves.
+    """
+    t, alive = _years_axis(years)
+    age = t - 1
+
+    output_factor = (1 - _column(degradation) / 100) ** age
+    generation = _column(results["annual_generation"]) * output_factor * alive
+    revenue = _column(results["annual_revenue"]) * output_factor * (1 + _column(tariff_escalation) / 100) ** age * alive
+    om_cost = _column(results["annual_om_cost"]) * (1 + _column(om_escalation) / 100) ** age * alive
+
+    investment = _column(results["total_investment"])
+    debt = investment * _column(debt_share) / 100
+    rate = _column(interest_rate) / 100
+    tenor = np.minimum(_column(loan_tenor), _column(years))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = np.where(rate > 0, debt * rate / (1 - (1 + rate) ** -tenor), debt / tenor)
+    debt_service = annuity * (t <= tenor)
+
+    operating = revenue - om_cost
+    shape = np.broadcast_shapes(operating.shape, debt_service.shape, investment.shape)
+    return {
+        "generation": _with_year_zero(0.0, generation, shape),
+        "revenue": _with_year_zero(0.0, revenue, shape),
+        "om_cost": _with_year_zero(0.0, om_cost, shape),
+        "debt_service": _with_year_zero(0.0, debt_service, shape),
+        "project": _with_year_zero(-investment, operating, shape),
+        "equity": _with_year_zero(debt - investment, operating - debt_service, shape),
+    }
+
+
+def discount_factors(rate, periods):
+    """(1 + rate)^-t for t = 0..periods-1; ``rate`` in % (scalar or array)"""
+    return (1 + np.asarray(rate, dtype=float)[..., np.newaxis] / 100) ** -np.arange(periods)
+
+
+def npv(flows, rate):
+    """Net present value of cash flows (trailing axis = years from 0) at ``rate`` %"""
+    return (flows * discount_factors(rate, flows.shape[-1])).sum(axis=-1)
+
+
+def irr(flows, low=-0.99, high=10.0, tol=1e-9, max_iter=100):
+    """Internal rate of return (%) of each cash flow row, solved for the whole batch at once.
+
+    Newton steps are taken on all unconverged rows together and fall back to
+    bisection whenever a step leaves the row's bracket (which starts as
+    ``[low, high]``, as fractions), so every row converges. Rows without a
+    sign change in the bracket are NaN.
+    """
+    flows = np.asarray(flows, dtype=float)
+    # One row per year so each Horner step below is a contiguous vector operation
+    years = np.ascontiguousarray(flows.reshape(-1, flows.shape[-1]).T)
+
+    def value_and_slope(cash, x):
+        """NPV at rate x and its derivative, by Horner's rule in v = 1 / (1 + x)"""
+        v = 1 / (1 + x)
+        value = np.zeros_like(x)
+        dvalue_dv = np.zeros_like(x)
+        for year_flow in cash[::-1]:
+            dvalue_dv *= v
+            dvalue_dv += value
+            value *= v
+            value += year_flow
+        return value, -dvalue_dv * v * v
+
+    f_low, _ = value_and_slope(years, np.full(years.shape[1], low))
+    f_high, _ = value_and_slope(years, np.full(years.shape[1], high))
+    work = np.flatnonzero(np.sign(f_low) * np.sign(f_high) <= 0)
+    result = np.full(years.shape[1], np.nan)
+
+    # Start from the rate that compounds the outflows into the inflows over half the cash flow span
+    cash = years[:, work]
+    inflow = np.where(cash > 0, cash, 0).sum(axis=0)
+    outflow = -np.where(cash < 0, cash, 0).sum(axis=0)
+    span = np.maximum(np.count_nonzero(cash, axis=0), 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = np.clip(np.nan_to_num((inflow / outflow) ** (2 / span) - 1, nan=0.1), low / 2, high / 2)
+    lo = np.full(work.size, low)
+    hi = np.full(work.size, high)
+    sign_lo = np.sign(f_low[work])
+    done = np.zeros(work.size, dtype=bool)
+    for _ in range(max_iter):
+        if not work.size:
+            break
+        f, slope = value_and_slope(cash, x)
+        # Shrink each bracket around its root, keeping the end whose sign matches f(low)
+        same_as_lo = np.sign(f) == sign_lo
+        lo = np.where(same_as_lo, x, lo)
+        hi = np.where(same_as_lo, hi, x)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = x - f / slope
+        bisect = ~np.isfinite(newton) | (newton <= lo) | (newton >= hi)
+        x_next = np.where(done, x, np.where(bisect, (lo + hi) / 2, newton))
+        done |= np.abs(x_next - x) < tol
+        x = x_next
+        if done.all():
+            break
+        # Drop converged rows once they are half of the working set; copying every step costs more
+        if done.sum() * 2 > done.size:
+            result[work[done]] = x[done]
+            keep = ~done
+            work, cash, x, lo, hi, sign_lo, done = (work[keep], cash[:, keep], x[keep], lo[keep], hi[keep],
+                                                    sign_lo[keep], done[keep])
+    result[work] = x
+    return (result * 100).reshape(flows.shape[:-1])
+
+
+def discounted_payback(flows, rate):
+    """Years until the discounted cumulative cash flow turns non-negative (interpolated); inf if never"""
+    cumulative = np.cumsum(flows * discount_factors(rate, flows.shape[-1]), axis=-1)
+    paid = cumulative >= 0
+    first = np.argmax(paid, axis=-1)
+    ever = paid.any(axis=-1) & (first > 0)
+    index = np.maximum(first, 1)[..., np.newaxis]
+    before = np.take_along_axis(cumulative, index - 1, axis=-1)[..., 0]
+    after = np.take_along_axis(cumulative, index, axis=-1)[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = -before / (after - before)
+    return np.where(ever, first - 1 + fraction, np.inf)
+
+
+def evaluate_dcf(results, years, **finance_params):
+    """NPV (₹, equity flows at the discount rate), equity IRR (%), LCOE (₹/kWh) and discounted payback (years).
+
+    ``results`` are the KPI arrays of ``wind_model.evaluate_scenarios``;
+    ``finance_params`` are the keys of ``FINANCE_RANGES`` (defaults apply).
+    LCOE is the present value of the investment and O&M costs over the
+    present value of the generation.
+    """
+    params = {**FINANCE_DEFAULTS, **finance_params}
+    flows = cash_flows(results, years, **params)
+    rate = params["discount_rate"]
+    factors = discount_factors(rate, flows["equity"].shape[-1])
+    costs = (flows["om_cost"] * factors).sum(axis=-1) + np.asarray(results["total_investment"], dtype=float)
+    energy_kwh = (flows["generation"] * factors).sum(axis=-1) * wind_model.KWH_PER_MWH
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lcoe = np.where(energy_kwh > 0, costs / energy_kwh, np.inf)
+    values = (npv(flows["equity"], rate), irr(flows["equity"]), lcoe, discounted_payback(flows["equity"], rate))
+    return dict(zip(KPI_NAMES, np.broadcast_arrays(*values)))
+
+
+def evaluate_scenarios(wind_speed, turbulence, capacity_mw, tariff_rate, turbine_cost, om_cost, years,
+                       capacity_factor_override=None, **finance_params):
+    """``wind_model.evaluate_scenarios`` plus the DCF KPIs, for batches of scenarios"""
+    results = wind_model.evaluate_scenarios(wind_speed, turbulence, capacity_mw, tariff_rate, turbine_cost,
+                                            om_cost, years, capacity_factor_override)
+    years = np.broadcast_to(np.asarray(years, dtype=float), results["roi"].shape)
+    return {**results, **evaluate_dcf(results, years, **finance_params)}
+
+
+def evaluate_scenario(**params):
+    """Score a single scenario, DCF included, and return its KPIs as plain floats"""
+    return {name: float(value) for name, value in evaluate_scenarios(**params).items()}
@@ -0,0 +1,198 @@
+"""Streaming ingestion of met-mast and SCADA wind time series.
+
+Large 10-minute CSV exports are read in fixed-size chunks restricted to the
+columns that are needed, and every statistic is updated incrementally, so
+peak memory depends on ``chunksize`` and not on the size of the file. The
+result is a compact JSON summary the dashboard can use in place of the
+hard-coded district baselines. When the file has a wind direction column,
+readings are also binned by direction and speed for the wind rose.
+
+Usage:
+    python ingest.py mast.csv --out data/summaries/my_site.json
+"""
+import argparse
+import json
+import os
+from math import gamma
+
+import numpy as np
+import pandas as pd
+
+import wind_rose
+
+SUMMARY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "summaries")
+SPEED_BIN_WIDTH = 0.25  # m/s
+MAX_SPEED = 40.0  # m/s
+# Turbulence intensity is only meaningful above low wind speeds
+MIN_TI_SPEED = 4.0  # m/s
+
+# Lower-case header names tried, in order, when a column is not given explicitly
+COLUMN_CANDIDATES = {
+    "speed": ["wind_speed", "ws", "ws_avg", "ws_mean", "windspeed", "speed", "wind_speed_avg"],
+    "std": ["wind_speed_std", "ws_std", "ws_sd", "speed_std", "windspeed_std", "std"],
+    "time": ["timestamp", "time", "datetime", "date_time", "date"],
+    "direction": ["wind_direction", "wd", "wd_avg", "wd_mean", "winddirection", "direction", "dir"],
+}
+
+
+def detect_columns(header, speed=None, std=None, time=None, direction=None):
+    """Map roles (speed, std, time, direction) to header names; only speed is required"""
+    lower = {name.strip().lower(): name for name in header}
+    columns = {"speed": speed, "std": std, "time": time, "direction": direction}
+    for role, candidates in COLUMN_CANDIDATES.items():
+        if columns[role] is None:
+            columns[role] = next((lower[name] for name in candidates if name in lower), None)
+    if columns["speed"] is None:
+        raise ValueError(f"No wind speed column found in {list(header)}; pass it explicitly")
+    return columns
+
+
+class WindStatistics:
+    """Incrementally updated wind statistics over any number of chunks"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations (Chan et al. parallel update)
+        self.ti_sum = 0.0
+        self.ti_count = 0
+        self.speed_histogram = np.zeros(int(MAX_SPEED / SPEED_BIN_WIDTH), dtype=np.int64)
+        self.monthly_sum = np.zeros(12)
+        self.monthly_count = np.zeros(12, dtype=np.int64)
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.direction_histogram = None
+
+    def update(self, speed, std=None, timestamps=None, direction=None):
+        """Fold one chunk of readings into the running statistics"""
+        if direction is not None:
+            chunk_histogram = wind_rose.histogram(speed, direction)
+            if self.direction_histogram is None:
+                self.direction_histogram = chunk_histogram
+            else:
+                self.direction_histogram += chunk_histogram
+
+        valid = np.isfinite(speed) & (speed >= 0)
+        speed = speed[valid]
+        n = speed.size
+        if n == 0:
+            return
+        chunk_mean = speed.mean()
+        chunk_m2 = ((speed - chunk_mean) ** 2).sum()
+        delta = chunk_mean - self.mean
+        total = self.count + n
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+        bins = np.minimum((speed / SPEED_BIN_WIDTH).astype(np.intp), len(self.speed_histogram) - 1)
+        self.speed_histogram += np.bincount(bins, minlength=len(self.speed_histogram))
+
+        if std is not None:
+            std = std[valid]
+            usable = (speed >= MIN_TI_SPEED) & np.isfinite(std)
+            self.ti_sum += (std[usable] / speed[usable]).sum()
+            self.ti_count += int(usable.sum())
+
+        if timestamps is not None:
+            timestamps = timestamps[valid]
+            known = ~timestamps.isna()
+            months = timestamps[known].dt.month.to_numpy() - 1
+            self.monthly_sum += np.bincount(months, weights=speed[known.to_numpy()], minlength=12)
+            self.monthly_count += np.bincount(months, minlength=12)
+            if known.any():
+                first, last = timestamps[known].min(), timestamps[known].max()
+                self.first_timestamp = first if self.first_timestamp is None else min(first, self.first_timestamp)
+                self.last_timestamp = last if self.last_timestamp is None else max(last, self.last_timestamp)
+
+    def summary(self):
+        """Compact, JSON-serializable summary of everything seen so far"""
+        std = float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else 0.0
+        # Justus moment estimate of the Weibull parameters
+        weibull_k = float((std / self.mean) ** -1.086) if std > 0 and self.mean > 0 else None
+        weibull_c = float(self.mean / gamma(1 + 1 / weibull_k)) if weibull_k else None
+        with np.errstate(invalid="ignore"):
+            monthly_mean = self.monthly_sum / self.monthly_count
+        return {
+            "records": int(self.count),
+            "mean_wind_speed": float(self.mean),
+            "std_wind_speed": std,
+            "turbulence_intensity": float(100 * self.ti_sum / self.ti_count) if self.ti_count else None,
+            "weibull_k": weibull_k,
+            "weibull_c": weibull_c,
+            "monthly_mean_wind_speed": [None if np.isnan(v) else float(v) for v in monthly_mean]
+            if self.monthly_count.any() else None,
+            "speed_bin_width": SPEED_BIN_WIDTH,
+            "speed_histogram": self.speed_histogram.tolist(),
+            "start": None if self.first_timestamp is None else self.first_timestamp.isoformat(),
+            "end": None if self.last_timestamp is None else self.last_timestamp.isoformat(),
+            "direction_histogram": None if self.direction_histogram is None
+            else wind_rose.to_sparse(self.direction_histogram),
+        }
+
+
+def summarize_csv(source, speed_column=None, std_column=None, time_column=None, chunksize=200_000,
+                  direction_column=None):
+    """Stream a CSV (path or file object) and return its wind summary"""
+    header = pd.read_csv(source, nrows=0).columns
+    if hasattr(source, "seek"):
+        source.seek(0)
+    columns = detect_columns(header, speed_column, std_column, time_column, direction_column)
+    usecols = [name for name in columns.values() if name is not None]
+    stats = WindStatistics()
+    for chunk in pd.read_csv(source, usecols=usecols, chunksize=chunksize):
+        speed = pd.to_numeric(chunk[columns["speed"]], errors="coerce").to_numpy(dtype=float)
+        std = None
+        if columns["std"] is not None:
+            std = pd.to_numeric(chunk[columns["std"]], errors="coerce").to_numpy(dtype=float)
+        timestamps = None
+        if columns["time"] is not None:
+            timestamps = pd.to_datetime(chunk[columns["time"]], errors="coerce").reset_index(drop=True)
+        direction = None
+        if columns["direction"] is not None:
+            direction = pd.to_numeric(chunk[columns["direction"]], errors="coerce").to_numpy(dtype=float)
+        stats.update(speed, std, timestamps, direction)
+    summary = stats.summary()
+    summary["columns"] = {role: name for role, name in columns.items() if name is not None}
+    return summary
+
+
+def write_summary(summary, path):
+    """Write a summary as JSON, creating its directory if needed"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(summary, f, indent=2)
+
+
+def list_summaries(directory=SUMMARY_DIR):
+    """Names of the summaries stored in ``directory``"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-5] for name in os.listdir(directory) if name.endswith(".json"))
+
+
+def load_summary(name, directory=SUMMARY_DIR):
+    with open(os.path.join(directory, f"{name}.json")) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a met-mast or SCADA wind CSV in bounded memory")
+    parser.add_argument("csv", help="10-minute wind time series in CSV format")
+    parser.add_argument("--out", help="summary JSON path (default: data/summaries/<csv name>.json)")
+    parser.add_argument("--speed-column")
+    parser.add_argument("--std-column")
+    parser.add_argument("--time-column")
+    parser.add_argument("--direction-column")
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    args = parser.parse_args()
+
+    summary = summarize_csv(args.csv, args.speed_column, args.std_column, args.time_column, args.chunksize,
+                            args.direction_column)
+    out = args.out or os.path.join(SUMMARY_DIR, os.path.splitext(os.path.basename(args.csv))[0] + ".json")
+    write_summary(summary, out)
+    print(f"{summary['records']:,} records, mean {summary['mean_wind_speed']:.2f} m/s -> {out}")
+
+
+if __name__ == "__main__":
+    main()
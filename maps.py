@@ -0,0 +1,118 @@
+"""Pre-rendered, cached Folium maps for the Wind Dashboard.
+
+The map only depends on the selected district, so its HTML is rendered
+once per district and served from a bounded LRU cache; financial slider
+changes never rebuild or re-serialize it. The all-district overlay is
+built once per dataset and shared by every map. The interpolated wind
+layers are pre-rendered raster tiles (see ``tiles.py``) that the browser
+fetches from Streamlit's static file server, so the map HTML only carries
+their URL templates.
+"""
+import folium
+
+from caching import LRUCache, make_key
+
+MAP_WIDTH = 700
+MAP_HEIGHT = 300
+map_cache = LRUCache(max_entries=64, max_bytes=32 * 1024 * 1024)
+_overlay_cache = LRUCache(max_entries=4)
+
+# (upper bound of wind_potential in MW per sq.km, colour, legend label)
+POTENTIAL_CLASSES = [
+    (9.0, "#fc8181", "< 9 MW/sq.km"),
+    (12.0, "#f6ad55", "9–12 MW/sq.km"),
+    (14.0, "#f6e05e", "12–14 MW/sq.km"),
+    (float("inf"), "#48bb78", "≥ 14 MW/sq.km"),
+]
+
+
+def potential_color(wind_potential):
+    """Colour of the potential class a district falls into"""
+    for upper, color, _ in POTENTIAL_CLASSES:
+        if wind_potential < upper:
+            return color
+
+
+def _data_key(district_data):
+    return make_key(sorted((name, sorted(info.items())) for name, info in district_data.items()))
+
+
+def district_overlay(district_data):
+    """GeoJSON of every district, colour-coded by wind potential (built once per dataset)"""
+    def build():
+        features = []
+        for name, info in district_data.items():
+            features.append({
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [info["lon"], info["lat"]]},
+                "properties": {
+                    "name": name,
+                    "wind_speed": info["wind_speed"],
+                    "wind_potential": info["wind_potential"],
+                    "color": potential_color(info["wind_potential"]),
+                },
+            })
+        return {"type": "FeatureCollection", "features": features}
+
+    return _overlay_cache.get_or_set(_data_key(district_data), build)
+
+
+def add_tile_layers(m, tileset):
+    """Overlay the pre-rendered wind layers of ``tiles.ensure_tiles`` metadata; wind potential is shown first"""
+    lat_min, lat_max, lon_min, lon_max = tileset["bounds"]
+    for index, (column, layer) in enumerate(tileset["layers"].items()):
+        low, high = layer["range"]
+        folium.TileLayer(
+            tiles=tileset["url"][column],
+            attr="Interpolated from district and site data",
+            name=f"{layer['label']}: {low:g}–{high:g}",
+            overlay=True,
+            show=index == 0,
+            opacity=0.6,
+            max_zoom=18,
+            max_native_zoom=tileset["max_zoom"],
+            minNativeZoom=tileset["min_zoom"],
+            bounds=[[lat_min, lon_min], [lat_max, lon_max]],
+        ).add_to(m)
+
+
+def _build_map_html(selected_district, district_data, tileset=None, show_coordinates=False):
+    info = district_data[selected_district]
+    map_center = [info["lat"], info["lon"]]
+    # --- DESIGN: Changed map style ---
+    m = folium.Map(location=map_center, zoom_start=9, tiles="CartoDB positron")
+    if tileset is not None:
+        add_tile_layers(m, tileset)
+
+    folium.GeoJson(
+        district_overlay(district_data),
+        name="All districts (wind potential)",
+        marker=folium.CircleMarker(radius=9, fill=True, fill_opacity=0.8, weight=1),
+        style_function=lambda feature: {"color": feature["properties"]["color"],
+                                        "fillColor": feature["properties"]["color"]},
+        tooltip=folium.GeoJsonTooltip(fields=["name", "wind_speed", "wind_potential"],
+                                      aliases=["District", "Wind Speed (m/s)", "Potential (MW/sq.km)"]),
+    ).add_to(m)
+
+    # Add marker for the selected district
+    folium.Marker(
+        map_center,
+        popup=f"<strong>{selected_district}</strong><br>Wind Speed: {info['wind_speed']} m/s",
+        tooltip="Click for details",
+        icon=folium.Icon(color="green", icon="wind", prefix="fa")  # --- DESIGN: Changed icon color ---
+    ).add_to(m)
+    if show_coordinates:
+        # Clicking the map shows that point's coordinates, to sample the wind-resource raster there
+        folium.LatLngPopup().add_to(m)
+    folium.LayerControl(collapsed=True).add_to(m)
+
+    # Same wrapping as streamlit_folium.folium_static, rendered once instead of per rerun
+    figure = folium.Figure().add_child(m)
+    return figure.render()
+
+
+def district_map_html(selected_district, district_data, tileset=None, show_coordinates=False):
+    """Standalone HTML of the map for one district, served from cache when possible"""
+    key = make_key(selected_district, _data_key(district_data), tileset and tileset["version"], show_coordinates)
+    return map_cache.get_or_set(key, lambda: _build_map_html(selected_district, district_data, tileset,
+                                                             show_coordinates))
@@ -0,0 +1,201 @@
+"""Durable feedback outbox with a background SMTP worker.
+
+Submissions are written to a local SQLite table and the caller returns
+immediately. A single daemon thread drains the table: it keeps one
+authenticated SMTP connection open between batches, folds several pending
+messages into one digest email, and retries failed sends with exponential
+backoff. Pending messages survive restarts because they live on disk.
+"""
+import logging
+import smtplib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from email.mime.text import MIMEText
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    sent_at REAL,
+    last_error TEXT
+)
+"""
+
+
+class Outbox:
+    """SQLite-backed outbox drained by one background thread.
+
+    ``config`` uses the keys of ``get_email_config`` plus an optional
+    ``starttls`` flag (default True); set it to False and leave the password
+    empty to deliver to a plain local debugging SMTP server.
+    """
+
+    def __init__(self, db_path, config, batch_size=20, max_attempts=8, backoff=5.0, max_backoff=900.0,
+                 poll_interval=30.0, idle_timeout=60.0):
+        self.db_path = db_path
+        self.config = config
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self._smtp = None
+        self._last_used = 0.0
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        with self._connect() as db:
+            db.execute(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection committing on success (SQLite connections are per thread)"""
+        db = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def enqueue(self, subject, body):
+        """Store a message for delivery and wake the worker; returns its id"""
+        now = time.time()
+        with self._connect() as db:
+            message_id = db.execute(
+                "INSERT INTO outbox (created_at, subject, body, next_attempt_at) VALUES (?, ?, ?, ?)",
+                (now, subject, body, now)).lastrowid
+        self._wakeup.set()
+        return message_id
+
+    def pending_count(self):
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM outbox WHERE sent_at IS NULL AND attempts < ?",
+                              (self.max_attempts,)).fetchone()[0]
+
+    def start(self):
+        if not self.running:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="feedback-outbox", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=10):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._close_smtp()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        failures = 0
+        while not self._stopping.is_set():
+            # Nothing may end the worker: a locked or unreadable database is logged and retried with backoff
+            try:
+                delivered = self.deliver_due()
+                if not delivered:
+                    if self._smtp is not None and time.monotonic() - self._last_used > self.idle_timeout:
+                        self._close_smtp()
+                    wait = self._seconds_until_due()
+                failures = 0
+            except Exception:
+                wait = min(self.backoff * 2 ** failures, self.max_backoff)
+                failures += 1
+                delivered = 0
+                logger.exception("Feedback outbox worker failed; retrying in %.0f s", wait)
+            if not delivered:
+                self._wakeup.wait(wait)
+                self._wakeup.clear()
+
+    def _seconds_until_due(self):
+        """Time to sleep before the next retry is due, at most ``poll_interval``"""
+        with self._connect() as db:
+            next_attempt_at = db.execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE sent_at IS NULL AND attempts < ?",
+                (self.max_attempts,)).fetchone()[0]
+        if next_attempt_at is None:
+            return self.poll_interval
+        return min(max(next_attempt_at - time.time(), 0.1), self.poll_interval)
+
+    def _due_messages(self):
+        with self._connect() as db:
+            return db.execute(
+                "SELECT id, created_at, subject, body, attempts FROM outbox "
+                "WHERE sent_at IS NULL AND attempts < ? AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (self.max_attempts, time.time(), self.batch_size)).fetchall()
+
+    def _smtp_connection(self):
+        """Reuse the open, authenticated connection when it is still alive"""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close_smtp()
+        server = smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port'], timeout=30)
+        if self.config.get('starttls', True):
+            server.starttls()
+        if self.config.get('sender_password'):
+            server.login(self.config['sender_email'], self.config['sender_password'])
+        self._smtp = server
+        return server
+
+    def _close_smtp(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+    def _build_message(self, rows):
+        if len(rows) == 1:
+            subject, body = rows[0][2], rows[0][3]
+        else:
+            subject = f"🌬️ Wind Dashboard Feedback Digest - {len(rows)} submissions"
+            parts = [f"--- {row[2]} (received {datetime.fromtimestamp(row[1]).strftime('%Y-%m-%d %H:%M:%S')}) ---\n"
+                     f"{row[3].strip()}" for row in rows]
+            body = "\n\n".join(parts)
+        msg = MIMEText(body, 'plain')
+        msg['From'] = self.config['sender_email']
+        msg['To'] = self.config['receiver_email']
+        msg['Subject'] = subject
+        return msg
+
+    def deliver_due(self):
+        """Send everything that is due as one message or digest; returns the number delivered"""
+        rows = self._due_messages()
+        if not rows:
+            return 0
+        ids = [row[0] for row in rows]
+        placeholders = ",".join("?" * len(ids))
+        try:
+            self._smtp_connection().send_message(self._build_message(rows))
+            self._last_used = time.monotonic()
+        except (smtplib.SMTPException, OSError) as e:
+            self._close_smtp()
+            now = time.time()
+            with self._connect() as db:
+                for message_id, _, _, _, attempts in rows:
+                    delay = min(self.backoff * 2 ** attempts, self.max_backoff)
+                    db.execute("UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                               (attempts + 1, now + delay, str(e), message_id))
+            return 0
+        with self._connect() as db:
+            db.execute(f"UPDATE outbox SET sent_at = ?, attempts = attempts + 1 WHERE id IN ({placeholders})",
+                       [time.time()] + ids)
+        return len(rows)
@@ -0,0 +1,126 @@
+"""Lightweight timing spans for the dashboard's hot paths.
+
+Wrap a section in ``with perf.span("name"):``. When timing is off for the
+current script run, ``span`` returns a shared no-op context manager, so the
+cost is one thread-local lookup. When on, durations are aggregated both
+for the session (a dict kept in ``st.session_state``) and for the whole
+process, and can be exported as JSON or Prometheus text format.
+
+Timing is on for a run when ``DASHBOARD_PERF=1`` is set in the environment
+or when the session opted in through the sidebar performance panel.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+ENV_ENABLED = os.environ.get("DASHBOARD_PERF", "") not in ("", "0", "false", "False")
+
+_NULL_SPAN = nullcontext()
+_local = threading.local()
+_process_stats = {}
+_process_lock = threading.Lock()
+
+
+def begin_run(session_stats, enabled=False):
+    """Start timing a script run; ``session_stats`` is the session's aggregate dict"""
+    attach(session_stats, enabled)
+    _local.run_start = time.perf_counter()
+
+
+def attach(session_stats, enabled=False):
+    """Enable spans for the current thread without starting a run (fragment reruns skip ``begin_run``)"""
+    _local.stats = session_stats if (enabled or ENV_ENABLED) else None
+
+
+def end_run(name):
+    """Record the time since ``begin_run`` as span ``name``"""
+    stats = getattr(_local, "stats", None)
+    if stats is not None:
+        _observe(stats, name, time.perf_counter() - _local.run_start)
+
+
+def _record(stats, name, seconds):
+    entry = stats.get(name)
+    if entry is None:
+        stats[name] = {"count": 1, "total": seconds, "max": seconds, "last": seconds}
+    else:
+        entry["count"] += 1
+        entry["total"] += seconds
+        entry["max"] = max(entry["max"], seconds)
+        entry["last"] = seconds
+
+
+def _observe(session_stats, name, seconds):
+    _record(session_stats, name, seconds)
+    with _process_lock:
+        _record(_process_stats, name, seconds)
+
+
+class _Span:
+    __slots__ = ("name", "session_stats", "start")
+
+    def __init__(self, name, session_stats):
+        self.name = name
+        self.session_stats = session_stats
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _observe(self.session_stats, self.name, time.perf_counter() - self.start)
+        return False
+
+
+def span(name):
+    """Context manager timing one section of the current run"""
+    stats = getattr(_local, "stats", None)
+    if stats is None:
+        return _NULL_SPAN
+    return _Span(name, stats)
+
+
+def enabled():
+    return getattr(_local, "stats", None) is not None
+
+
+def process_stats():
+    """Snapshot of the process-wide aggregate"""
+    with _process_lock:
+        return {name: dict(entry) for name, entry in _process_stats.items()}
+
+
+def rows(stats):
+    """Table rows (milliseconds) sorted by total time, for display"""
+    return [{"span": name, "count": entry["count"], "last_ms": entry["last"] * 1000,
+             "mean_ms": entry["total"] / entry["count"] * 1000, "max_ms": entry["max"] * 1000}
+            for name, entry in sorted(stats.items(), key=lambda item: -item[1]["total"])]
+
+
+def to_prometheus(stats, metric="dashboard_span_seconds"):
+    """Prometheus text exposition of span aggregates"""
+    lines = [f"# HELP {metric} Time spent in dashboard sections.", f"# TYPE {metric} summary"]
+    for name, entry in sorted(stats.items()):
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        lines.append(f'{metric}_count{{span="{label}"}} {entry["count"]}')
+        lines.append(f'{metric}_sum{{span="{label}"}} {entry["total"]:.6f}')
+    lines.append(f"# HELP {metric}_max Longest observed duration per section.")
+    lines.append(f"# TYPE {metric}_max gauge")
+    for name, entry in sorted(stats.items()):
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        lines.append(f'{metric}_max{{span="{label}"}} {entry["max"]:.6f}')
+    return "\n".join(lines) + "\n"
+
+
+def export(path, stats=None):
+    """Write span aggregates to ``path`` as Prometheus text (.prom/.txt) or JSON"""
+    stats = process_stats() if stats is None else stats
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        if path.endswith((".prom", ".txt")):
+            f.write(to_prometheus(stats))
+        else:
+            json.dump({"exported_at": time.time(), "spans": stats}, f, indent=2)
+    return path
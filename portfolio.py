@@ -0,0 +1,113 @@
+"""Capital budget allocation across districts and candidate sites.
+
+A site's economics are linear in its installed capacity: generation,
+revenue, O&M, the investment and the loan all scale with MW. One batched
+DCF run at 1 MW therefore gives every site's marginal NPV, generation and
+capital cost per MW. With a single budget constraint and a capacity cap per
+site (``wind_potential`` × developable area), the allocation LP is a
+fractional knapsack. Funding sites in order of value per rupee until the
+budget runs out solves it exactly in O(n log n). Allocating whole turbine
+units makes it a bounded knapsack, which is filled greedily in the same
+order. The LP optimum is reported alongside as an upper bound.
+"""
+import numpy as np
+
+import finance
+import wind_model
+
+RUPEES_PER_CRORE = 100 * wind_model.RUPEES_PER_LAKH
+# Objective -> (per-MW economics key, label)
+OBJECTIVES = {
+    "npv": ("npv", "Equity NPV"),
+    "energy": ("annual_generation", "Annual Generation"),
+}
+DEFAULT_AREA_KM = 10.0  # sq.km assumed developable where a site has no area_km
+
+
+def site_economics(wind_speed, turbulence, tariff_rate, turbine_cost, om_cost, years, **finance_params):
+    """Economics of 1 MW at every site (arrays): the ``finance.evaluate_scenarios`` KPIs per MW"""
+    return finance.evaluate_scenarios(wind_speed, turbulence, 1.0, tariff_rate, turbine_cost, om_cost, years,
+                                      **finance_params)
+
+
+def capacity_limits(wind_potential, area_km, default_area_km=DEFAULT_AREA_KM):
+    """Maximum installable MW per site: MW per sq.km × area, with ``default_area_km`` where the area is NaN"""
+    area_km = np.asarray(area_km, dtype=float)
+    return np.asarray(wind_potential, dtype=float) * np.where(np.isnan(area_km), default_area_km, area_km)
+
+
+def allocate(value, capex, max_mw, budget, unit_mw=0.0):
+    """MW per site maximising total ``value`` for at most ``budget`` (₹) of capital.
+
+    ``value`` and ``capex`` are per MW. Sites with non-positive value are
+    never funded. Returns ``(capacity_mw, upper_bound, order)``: the
+    allocation, the total value of the continuous LP optimum and the site
+    indices in funding order. With ``unit_mw`` > 0 capacities are whole
+    units, so the allocation can fall short of the bound by the budget
+    left over after rounding.
+    """
+    value, capex, max_mw = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (value, capex, max_mw)))
+    eligible = np.flatnonzero((value > 0) & (capex > 0) & (max_mw > 0))
+    order = eligible[np.argsort(-value[eligible] / capex[eligible], kind="stable")]
+
+    def fill(step_mw, steps):
+        """Fund whole ``steps`` in order; returns the MW per site and the budget left"""
+        capacity_mw = np.zeros(value.shape)
+        step_cost = step_mw[order] * capex[order]
+        # Every site before the first one the budget cannot cover in full is funded in full
+        spent = np.cumsum(steps[order] * step_cost)
+        funded = np.searchsorted(spent, budget, side="right")
+        capacity_mw[order[:funded]] = steps[order[:funded]] * step_mw[order[:funded]]
+        return capacity_mw, budget - (spent[funded - 1] if funded else 0.0), funded
+
+    # Continuous LP: whole sites, then a fraction of the site the budget runs out in
+    lp_mw, remaining, funded = fill(max_mw, np.ones(value.shape))
+    if funded < order.size:
+        lp_mw[order[funded]] = remaining / capex[order[funded]]
+    upper_bound = float(value @ lp_mw)
+    if not unit_mw:
+        return lp_mw, upper_bound, order
+
+    units = np.floor(max_mw / unit_mw + 1e-9)
+    capacity_mw, remaining, funded = fill(np.full(value.shape, float(unit_mw)), units)
+    # Past the first site that does not fit, take whatever whole units still fit at each later site
+    tail = order[funded:]
+    unit_cost = unit_mw * capex[tail]
+    cheapest = unit_cost.min() if tail.size else np.inf
+    for site, cost in zip(tail, unit_cost):
+        if remaining < cheapest:
+            break
+        take = min(units[site], np.floor(remaining / cost))
+        capacity_mw[site] = take * unit_mw
+        remaining -= take * cost
+    return capacity_mw, upper_bound, order
+
+
+def optimize(sites, budget_crore, objective="npv", tariff_rate=5.0, turbine_cost=700, om_cost=30, years=20,
+             default_area_km=DEFAULT_AREA_KM, unit_mw=0.0, **finance_params):
+    """Split ``budget_crore`` across ``sites`` for maximum NPV or generation.
+
+    ``sites`` is any mapping of site columns (a ``SiteStore`` frame works).
+    Returns per-site arrays (``capacity_mw``, ``max_mw``, ``investment``,
+    ``npv``, ``annual_generation``, ``equity_irr``, ``value_per_crore``)
+    and portfolio totals.
+    """
+    key, _ = OBJECTIVES[objective]
+    per_mw = site_economics(sites["wind_speed"], sites["turbulence"], tariff_rate, turbine_cost, om_cost, years,
+                            **finance_params)
+    max_mw = capacity_limits(sites["wind_potential"], sites["area_km"], default_area_km)
+    capacity_mw, upper_bound, order = allocate(per_mw[key], per_mw["total_investment"], max_mw,
+                                               budget_crore * RUPEES_PER_CRORE, unit_mw)
+    result = {
+        "capacity_mw": capacity_mw,
+        "max_mw": max_mw,
+        "investment": capacity_mw * per_mw["total_investment"],
+        "npv": capacity_mw * per_mw["npv"],
+        "annual_generation": capacity_mw * per_mw["annual_generation"],
+        "equity_irr": per_mw["equity_irr"],
+        "value_per_crore": per_mw[key] / per_mw["total_investment"] * RUPEES_PER_CRORE,
+    }
+    totals = {name: float(result[name].sum()) for name in ("capacity_mw", "investment", "npv", "annual_generation")}
+    totals["upper_bound"] = upper_bound
+    totals["sites_funded"] = int(np.count_nonzero(capacity_mw))
+    return {**result, "order": order, "totals": totals}
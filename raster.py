@@ -0,0 +1,258 @@
+"""Memory-mapped gridded wind-resource rasters with vectorized bilinear sampling.
+
+A raster is a directory holding one ``.npy`` array per variable and a
+``raster.json`` describing the regular latitude/longitude axes, each
+variable's dimensions (``lat`` and ``lon`` last, optionally ``height`` and
+``month`` before them) and the coordinates of those extra dimensions, e.g.
+``mean_speed`` (height, lat, lon) and ``monthly_speed`` (month, height,
+lat, lon). Arrays are opened with ``np.load(mmap_mode="r")``: opening reads
+nothing, and sampling gathers only the four grid cells around each point,
+so the OS pages in just the blocks that hold them. NetCDF and Zarr files
+(wind atlas or reanalysis exports) are opened lazily through xarray when it
+is installed, which likewise reads only the chunks the points fall in;
+``convert`` rewrites them as ``.npy`` rasters block by block. The dashboard
+loads the raster named by the ``WIND_RASTER_PATH`` environment variable.
+
+Usage:
+    python raster.py sample rasters/mp_atlas 23.26 77.41 --height 100
+    python raster.py convert atlas.nc rasters/mp_atlas --variable mean_speed=ws
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+META_FILE = "raster.json"
+MEAN_SPEED = "mean_speed"  # m/s at each hub height
+MONTHLY_SPEED = "monthly_speed"  # m/s per calendar month (and hub height)
+LAT_NAMES = ("lat", "latitude")
+LON_NAMES = ("lon", "longitude")
+CONVERT_BLOCK_ROWS = 256  # latitude rows copied per step by ``convert``
+
+
+def _regular_axis(values, name):
+    """(start, step, size) of an evenly spaced axis"""
+    values = np.asarray(values, dtype=float)
+    if values.size < 2:
+        raise ValueError(f"{name} axis needs at least two points")
+    step = (values[-1] - values[0]) / (values.size - 1)
+    if not np.allclose(np.diff(values), step, rtol=1e-4, atol=1e-9):
+        raise ValueError(f"{name} axis is not evenly spaced")
+    return float(values[0]), float(step), int(values.size)
+
+
+def _axis_position(axis, values):
+    """Lower cell index and fractional offset along a regular axis; NaN outside the grid"""
+    start, step, size = axis
+    position = (np.asarray(values, dtype=float) - start) / step
+    position = np.where((position >= 0) & (position <= size - 1), position, np.nan)
+    lower = np.minimum(np.nan_to_num(position).astype(np.intp), size - 2)
+    return lower, position - lower
+
+
+class _XarrayVariable:
+    """Index an xarray variable like a NumPy array, with pointwise indexing of the last two axes"""
+
+    def __init__(self, data_array, lat_dim, lon_dim):
+        self.data_array = data_array.transpose(..., lat_dim, lon_dim)
+        self.shape = self.data_array.shape
+
+    def __getitem__(self, key):
+        import xarray as xr
+
+        *leading, rows, cols = key
+        dims = self.data_array.dims
+        selected = self.data_array.isel({dim: index for dim, index in zip(dims[:-2], leading)})
+        points = selected.isel({dims[-2]: xr.DataArray(rows.ravel(), dims="points"),
+                                dims[-1]: xr.DataArray(cols.ravel(), dims="points")})
+        values = np.asarray(points.values, dtype=float)
+        return values.reshape(values.shape[:-1] + rows.shape)
+
+
+class WindRaster:
+    """Gridded variables on one regular lat/lon grid; see ``open_raster``"""
+
+    def __init__(self, lat, lon, variables, coords=None, attrs=None):
+        self.lat_axis = _regular_axis(lat, "lat")
+        self.lon_axis = _regular_axis(lon, "lon")
+        # name -> (array-like indexed [..., lat, lon], dims)
+        self.variables = variables
+        self.coords = {name: np.asarray(values, dtype=float) for name, values in (coords or {}).items()}
+        self.attrs = attrs or {}
+
+    @property
+    def bounds(self):
+        """(lat_min, lat_max, lon_min, lon_max)"""
+        lat = [self.lat_axis[0], self.lat_axis[0] + self.lat_axis[1] * (self.lat_axis[2] - 1)]
+        lon = [self.lon_axis[0], self.lon_axis[0] + self.lon_axis[1] * (self.lon_axis[2] - 1)]
+        return min(lat), max(lat), min(lon), max(lon)
+
+    @property
+    def heights(self):
+        return self.coords.get("height", np.array([]))
+
+    def _leading_index(self, dims, height, month):
+        """[(weight, index tuple)] selecting the non-grid dimensions; unselected ones are kept whole"""
+        index = [(1.0, ())]
+        for dim in dims[:-2]:
+            if dim == "height" and height is not None:
+                # Linear in height between the two nearest levels (clamped to the lowest and highest)
+                levels = self.coords["height"]
+                h = float(np.clip(height, levels.min(), levels.max()))
+                upper = int(np.clip(np.searchsorted(levels, h), 1, levels.size - 1)) if levels.size > 1 else 0
+                lower = max(upper - 1, 0)
+                w = (h - levels[lower]) / (levels[upper] - levels[lower]) if upper != lower else 0.0
+                pairs = [(1 - w, lower), (w, upper)] if w else [(1.0, lower)]
+                index = [(weight * w_level, key + (level,)) for weight, key in index for w_level, level in pairs]
+            elif dim == "month" and month is not None:
+                position = int(np.flatnonzero(self.coords["month"] == month)[0])
+                index = [(weight, key + (position,)) for weight, key in index]
+            else:
+                index = [(weight, key + (slice(None),)) for weight, key in index]
+        return index
+
+    def sample(self, variable, lat, lon, height=None, month=None):
+        """Bilinear values of ``variable`` at every (lat, lon) pair; NaN outside the grid.
+
+        ``height`` (m) interpolates linearly between hub-height levels and
+        ``month`` (1-12) selects a calendar month. Dimensions that are not
+        selected are kept and become trailing axes, so a monthly variable
+        sampled without ``month`` returns 12 values per point.
+        """
+        array, dims = self.variables[variable]
+        lat, lon = np.broadcast_arrays(np.asarray(lat, dtype=float), np.asarray(lon, dtype=float))
+        row, row_weight = _axis_position(self.lat_axis, lat.ravel())
+        col, col_weight = _axis_position(self.lon_axis, lon.ravel())
+        # The four corners of every point's cell, gathered in one indexing call per level
+        rows = np.stack([row, row, row + 1, row + 1])
+        cols = np.stack([col, col + 1, col, col + 1])
+        corner_weights = np.stack([(1 - row_weight) * (1 - col_weight), (1 - row_weight) * col_weight,
+                                   row_weight * (1 - col_weight), row_weight * col_weight])
+        values = 0.0
+        for weight, key in self._leading_index(dims, height, month):
+            corners = np.asarray(array[key + (rows, cols)], dtype=float)
+            values = values + weight * (corners * corner_weights).sum(axis=-2)
+        values = np.moveaxis(np.asarray(values), -1, 0)
+        return values.reshape(lat.shape + values.shape[1:])
+
+
+def write_raster(path, lat, lon, variables, coords=None, attrs=None):
+    """Save ``{name: (array, dims)}`` as an ``.npy`` raster directory"""
+    os.makedirs(path, exist_ok=True)
+    meta = {"lat": _regular_axis(lat, "lat"), "lon": _regular_axis(lon, "lon"), "variables": {},
+            "coords": {name: np.asarray(values).tolist() for name, values in (coords or {}).items()},
+            "attrs": attrs or {}}
+    for name, (array, dims) in variables.items():
+        np.save(os.path.join(path, f"{name}.npy"), np.asarray(array, dtype=np.float32))
+        meta["variables"][name] = {"file": f"{name}.npy", "dims": list(dims)}
+    with open(os.path.join(path, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def _axis_values(axis):
+    start, step, size = axis
+    return start + step * np.arange(size)
+
+
+def open_npy_raster(path):
+    """Open an ``.npy`` raster directory; every array is memory-mapped, nothing is read yet"""
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+    variables = {name: (np.load(os.path.join(path, spec["file"]), mmap_mode="r"), tuple(spec["dims"]))
+                 for name, spec in meta["variables"].items()}
+    return WindRaster(_axis_values(meta["lat"]), _axis_values(meta["lon"]), variables, meta["coords"],
+                      meta.get("attrs"))
+
+
+def _open_dataset(path):
+    try:
+        import xarray as xr
+    except ImportError as e:
+        raise ImportError("NetCDF/Zarr rasters need xarray (and netCDF4 or zarr); "
+                          "convert them to an .npy raster where it is installed") from e
+    if path.rstrip("/").endswith(".zarr"):
+        return xr.open_zarr(path)
+    return xr.open_dataset(path)
+
+
+def _dataset_dim(dims, names):
+    for name in names:
+        if name in dims:
+            return name
+    raise ValueError(f"no {names[0]} dimension in {', '.join(dims)}")
+
+
+def open_xarray_raster(path, variables=None):
+    """Open a NetCDF or Zarr raster lazily; ``variables`` maps raster names to dataset names"""
+    dataset = _open_dataset(path)
+    variables = variables or {name: name for name in dataset.data_vars}
+    lat_dim = _dataset_dim(dataset.dims, LAT_NAMES)
+    lon_dim = _dataset_dim(dataset.dims, LON_NAMES)
+    wrapped = {}
+    for name, source in variables.items():
+        wrapper = _XarrayVariable(dataset[source], lat_dim, lon_dim)
+        wrapped[name] = (wrapper, tuple(wrapper.data_array.dims[:-2]) + ("lat", "lon"))
+    coords = {dim: dataset[dim].values for dim in ("height", "month") if dim in dataset.coords}
+    return WindRaster(dataset[lat_dim].values, dataset[lon_dim].values, wrapped, coords, dict(dataset.attrs))
+
+
+def open_raster(path, variables=None):
+    """Open an ``.npy`` raster directory, or a NetCDF/Zarr file through xarray"""
+    if os.path.isdir(path) and os.path.exists(os.path.join(path, META_FILE)):
+        return open_npy_raster(path)
+    return open_xarray_raster(path, variables)
+
+
+def load_raster(path=None):
+    """The configured raster, or None; ``path`` defaults to $WIND_RASTER_PATH"""
+    path = path or os.environ.get("WIND_RASTER_PATH")
+    return open_raster(path) if path else None
+
+
+def convert(source, path, variables=None):
+    """Rewrite a NetCDF/Zarr raster as an ``.npy`` raster, copying CONVERT_BLOCK_ROWS latitude rows at a time"""
+    raster = open_xarray_raster(source, variables)
+    os.makedirs(path, exist_ok=True)
+    meta = {"lat": raster.lat_axis, "lon": raster.lon_axis, "variables": {},
+            "coords": {name: values.tolist() for name, values in raster.coords.items()}, "attrs": raster.attrs}
+    for name, (wrapper, dims) in raster.variables.items():
+        out = np.lib.format.open_memmap(os.path.join(path, f"{name}.npy"), mode="w+", dtype=np.float32,
+                                        shape=wrapper.shape)
+        lat_dim = wrapper.data_array.dims[-2]
+        for start in range(0, wrapper.shape[-2], CONVERT_BLOCK_ROWS):
+            block = wrapper.data_array.isel({lat_dim: slice(start, start + CONVERT_BLOCK_ROWS)})
+            out[..., start:start + CONVERT_BLOCK_ROWS, :] = block.values
+        out.flush()
+        meta["variables"][name] = {"file": f"{name}.npy", "dims": list(dims)}
+    with open(os.path.join(path, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    sample = commands.add_parser("sample", help="print values at one point")
+    sample.add_argument("path")
+    sample.add_argument("lat", type=float)
+    sample.add_argument("lon", type=float)
+    sample.add_argument("--height", type=float)
+    to_npy = commands.add_parser("convert", help="rewrite a NetCDF/Zarr raster as an .npy raster")
+    to_npy.add_argument("source")
+    to_npy.add_argument("path")
+    to_npy.add_argument("--variable", action="append", default=[], metavar="NAME=SOURCE",
+                        help="raster variable name and its dataset name (default: every data variable)")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        variables = dict(item.split("=", 1) for item in args.variable) or None
+        convert(args.source, args.path, variables)
+        print(f"Wrote {args.path}")
+        return
+    raster = open_raster(args.path)
+    for name in raster.variables:
+        print(name, np.round(raster.sample(name, args.lat, args.lon, height=args.height), 3).tolist())
+
+
+if __name__ == "__main__":
+    main()
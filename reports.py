@@ -0,0 +1,263 @@
+"""Feasibility pack export: Excel cash-flow workbooks and PDF chart pages for every district.
+
+Each district is one task. A process pool builds that district's workbook
+(one yearly cash-flow sheet per scenario plus a summary) and its PDF (one
+chart page per scenario). The worker writes both files to a scratch
+directory and returns only their paths and a few KPIs. The caller streams
+finished files into a zip as they complete and deletes them, so no figure or
+workbook is held in memory longer than one task. ``ExportJob`` runs the
+whole export on a background thread so the dashboard stays responsive.
+
+Usage:
+    python reports.py --out exports/feasibility_pack.zip --workers 4
+"""
+import argparse
+import csv
+import io
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import finance
+
+EXPORT_DIR = os.environ.get("DASHBOARD_EXPORT_DIR", "exports")
+FORMATS = ("xlsx", "pdf")
+# Scenario name -> factors applied to the dashboard's current inputs
+SCENARIO_VARIANTS = {
+    "Base": {},
+    "Low Tariff": {"tariff_rate": 0.9},
+    "High Tariff": {"tariff_rate": 1.1},
+    "High Capex": {"turbine_cost": 1.15},
+    "High O&M": {"om_cost": 1.2},
+}
+SUMMARY_COLUMNS = ("district", "scenario", "capacity_factor", "annual_generation", "total_investment", "npv",
+                   "equity_irr", "lcoe", "discounted_payback")
+# Yearly table: (cash_flows key, column header)
+CASH_FLOW_COLUMNS = (
+    ("generation", "Generation (MWh)"),
+    ("revenue", "Revenue (₹)"),
+    ("om_cost", "O&M Cost (₹)"),
+    ("debt_service", "Debt Service (₹)"),
+    ("project", "Project Cash Flow (₹)"),
+    ("equity", "Equity Cash Flow (₹)"),
+)
+
+
+def default_workers():
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def build_scenarios(base, variants=("Base",)):
+    """``[(name, inputs)]`` with each variant's factors applied to the scenario inputs ``base``"""
+    return [(name, {**base, **{key: base[key] * factor for key, factor in SCENARIO_VARIANTS[name].items()}})
+            for name in variants]
+
+
+def _slug(name):
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_") or "district"
+
+
+def _finite(value):
+    """KPIs as spreadsheet-friendly values: inf and NaN become empty cells"""
+    value = float(value)
+    return value if value == value and abs(value) != float("inf") else None
+
+
+def scenario_tables(district, scenarios, finance_params):
+    """KPIs and yearly cash flows of every scenario, with the district's baseline wind replacing the scenario's"""
+    tables = []
+    for name, inputs in scenarios:
+        inputs = {**inputs, "wind_speed": district["wind_speed"], "turbulence": district["turbulence"]}
+        kpis = finance.evaluate_scenario(**inputs, **finance_params)
+        flows = finance.cash_flows(kpis, inputs["years"], **finance_params)
+        tables.append((name, inputs, kpis, flows))
+    return tables
+
+
+def write_workbook(path, district, tables, finance_params):
+    """Summary sheet plus one yearly cash-flow sheet per scenario (streamed with openpyxl's write-only mode)"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    summary = workbook.create_sheet("Summary")
+    params = {**finance.FINANCE_DEFAULTS, **finance_params}
+    summary.append([f"Feasibility pack: {district['name']}"])
+    summary.append(["wind_speed", district["wind_speed"]])
+    summary.append(["turbulence", district["turbulence"]])
+    for key, value in params.items():
+        summary.append([key, value])
+    summary.append([])
+    summary.append(list(SUMMARY_COLUMNS[1:]))
+    for name, _, kpis, _ in tables:
+        summary.append([name] + [_finite(kpis[column]) for column in SUMMARY_COLUMNS[2:]])
+
+    rate = params["discount_rate"]
+    for name, inputs, _, flows in tables:
+        sheet = workbook.create_sheet(name[:31])
+        sheet.append([f"{name}: {inputs['capacity_mw']:g} MW, ₹ {inputs['tariff_rate']:.2f}/kWh, "
+                      f"₹ {inputs['turbine_cost']:.0f} lakhs/MW, {int(inputs['years'])} years"])
+        sheet.append(["Year"] + [header for _, header in CASH_FLOW_COLUMNS]
+                     + ["Cumulative Equity (₹)", "Discounted Equity (₹)"])
+        factors = finance.discount_factors(rate, flows["equity"].shape[-1])
+        cumulative = flows["equity"].cumsum()
+        for year in range(flows["equity"].shape[-1]):
+            sheet.append([year] + [float(flows[key][year]) for key, _ in CASH_FLOW_COLUMNS]
+                         + [float(cumulative[year]), float(flows["equity"][year] * factors[year])])
+    workbook.save(path)
+
+
+def write_pdf(path, district, tables):
+    """One chart page per scenario; each figure is closed as soon as its page is written"""
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    import charts
+
+    with PdfPages(path) as pdf:
+        for name, inputs, kpis, flows in tables:
+            charts.feasibility_page(pdf, f"{district['name']}: {name}", flows, kpis)
+
+
+def district_pack(task):
+    """Write one district's files into ``out_dir``; returns their paths and the summary rows.
+
+    File names are prefixed with the task index, since district names that
+    differ only in punctuation share a slug.
+    """
+    index, district, scenarios, finance_params, out_dir, formats = task
+    tables = scenario_tables(district, scenarios, finance_params)
+    stem = os.path.join(out_dir, f"{index:03d}_{_slug(district['name'])}")
+    paths = []
+    if "xlsx" in formats:
+        paths.append(stem + ".xlsx")
+        write_workbook(paths[-1], district, tables, finance_params)
+    if "pdf" in formats:
+        paths.append(stem + ".pdf")
+        write_pdf(paths[-1], district, tables)
+    rows = [[district["name"], name] + [_finite(kpis[column]) for column in SUMMARY_COLUMNS[2:]]
+            for name, _, kpis, _ in tables]
+    return paths, rows
+
+
+def _run_tasks(tasks, workers):
+    """Yield task results as they finish, from a process pool when ``workers`` > 1"""
+    if workers <= 1:
+        yield from map(district_pack, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for future in as_completed([pool.submit(district_pack, task) for task in tasks]):
+            yield future.result()
+
+
+def export(zip_path, districts, scenarios, finance_params=None, formats=FORMATS, workers=1, progress=None):
+    """Build the feasibility pack for ``districts`` (``{name: record}``) and stream it into ``zip_path``.
+
+    ``progress(completed, total)`` is called after each district. Returns
+    ``zip_path``.
+    """
+    finance_params = finance_params or {}
+    os.makedirs(os.path.dirname(os.path.abspath(zip_path)), exist_ok=True)
+    scratch = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(zip_path)))
+    tasks = [(index, dict(record), scenarios, finance_params, scratch, tuple(formats))
+             for index, record in enumerate(districts.values(), start=1)]
+    summary = io.StringIO()
+    writer = csv.writer(summary)
+    writer.writerow(SUMMARY_COLUMNS)
+    try:
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for completed, (paths, rows) in enumerate(_run_tasks(tasks, workers), start=1):
+                for path in paths:
+                    archive.write(path, os.path.basename(path))
+                    os.remove(path)
+                writer.writerows(rows)
+                if progress is not None:
+                    progress(completed, len(tasks))
+            archive.writestr("summary.csv", summary.getvalue())
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return zip_path
+
+
+class ExportJob:
+    """Feasibility pack export running on a background thread; poll ``completed``/``done`` from the UI"""
+
+    def __init__(self, districts, scenarios, finance_params=None, formats=FORMATS, workers=None,
+                 export_dir=EXPORT_DIR):
+        self.districts = districts
+        self.scenarios = scenarios
+        self.finance_params = finance_params or {}
+        self.formats = formats
+        self.workers = workers or default_workers()
+        # The random suffix keeps jobs started by different sessions in the same second apart
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.path = os.path.join(export_dir, f"feasibility_pack_{stamp}_{uuid.uuid4().hex[:8]}.zip")
+        self.total = len(districts)
+        self.completed = 0
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._thread = None
+
+    def start(self):
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="feasibility-export", daemon=True)
+        self._thread.start()
+        return self
+
+    def _progress(self, completed, total):
+        self.completed = completed
+
+    def _run(self):
+        try:
+            export(self.path, self.districts, self.scenarios, self.finance_params, self.formats, self.workers,
+                   self._progress)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished_at = time.time()
+
+    @property
+    def done(self):
+        return self.finished_at is not None
+
+    def elapsed(self):
+        return (self.finished_at or time.time()) - self.started_at
+
+    def discard(self):
+        """Delete the zip of a finished job (a running job is left alone)"""
+        if self.done and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def read(self):
+        """Contents of the finished zip (passed to the download button as deferred data)"""
+        with open(self.path, "rb") as f:
+            return f.read()
+
+
+def main():
+    import site_store
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default=os.path.join(EXPORT_DIR, "feasibility_pack.zip"))
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIO_VARIANTS), choices=list(SCENARIO_VARIANTS))
+    parser.add_argument("--formats", nargs="+", default=list(FORMATS), choices=list(FORMATS))
+    parser.add_argument("--workers", type=int, default=default_workers())
+    args = parser.parse_args()
+
+    base = dict(capacity_mw=2.5, tariff_rate=5.2, turbine_cost=700, om_cost=30, years=15)
+    districts = site_store.load_sites().district_records()
+    start = time.perf_counter()
+    export(args.out, districts, build_scenarios(base, args.scenarios), formats=args.formats, workers=args.workers,
+           progress=lambda completed, total: print(f"{completed}/{total} districts", flush=True))
+    print(f"Wrote {args.out} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
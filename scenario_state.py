@@ -0,0 +1,118 @@
+"""Shareable scenario URLs and the process-wide scenario result cache.
+
+A scenario is the selected district, its baseline source and every sidebar
+input. ``encode`` turns it into query-string values and ``decode`` reads a
+shared link back, dropping unknown or malformed values and clipping numbers
+to their slider ranges. The dashboard uses the decoded values as widget
+defaults, so a shared link opens on the same scenario.
+
+Computed results and built Plotly figures are stored in ``result_cache``,
+an ``LRUCache`` keyed by a hash of the inputs that produced them and
+bounded by entry count and approximate payload size. Streamlit sessions
+share one process, so the second analyst to open a scenario reuses the
+first one's work.
+"""
+import math
+import os
+
+import numpy as np
+
+import energy
+import finance
+import wind_model
+from caching import LRUCache, make_key
+
+DEFAULT_BASELINE = "District baseline"
+RASTER_BASELINE = "Wind resource raster"  # offered when WIND_RASTER_PATH is set
+ENERGY_MODELS = {"empirical": "Empirical (NIWE formula)", "weibull": "Weibull + Power Curve"}
+# Sidebar input -> default, in URL order; wind_speed, turbulence and weibull_k default to the district baseline
+DEFAULTS = {
+    "years": 15,
+    "capacity_mw": 2.5,
+    "area_km": 10.0,
+    "energy_model": "empirical",
+    "turbine": energy.DEFAULT_TURBINE,
+    "turbine_cost": 700,
+    "om_cost": 30,
+    "tariff_rate": 5.2,
+    **finance.FINANCE_DEFAULTS,
+}
+RANGES = {
+    **wind_model.INPUT_RANGES,
+    "area_km": (1.0, 100.0),
+    "weibull_k": (1.2, 3.5),
+    **{name: (low, high) for name, (low, high, _) in finance.FINANCE_RANGES.items()},
+}
+INTEGER_PARAMS = {"years", "turbine_cost", "om_cost", "loan_tenor"}
+CHOICES = {"energy_model": ENERGY_MODELS, "turbine": energy.TURBINES}
+URL_PARAMS = ("district", "baseline", "wind_speed", "turbulence", "weibull_k") + tuple(DEFAULTS)
+
+CACHE_MB = float(os.environ.get("DASHBOARD_SCENARIO_CACHE_MB", "128"))
+
+
+def _number(name, text):
+    """A query-string number clipped to its range, or None when it is not a finite number"""
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    if not math.isfinite(value):
+        return None
+    value = min(max(value, RANGES[name][0]), RANGES[name][1])
+    return int(round(value)) if name in INTEGER_PARAMS else value
+
+
+def decode(query):
+    """Valid scenario values from a query-string mapping (``st.query_params`` or a dict of strings)"""
+    values = {}
+    for name in URL_PARAMS:
+        text = query.get(name)
+        if text is None or text == "":
+            continue
+        if name in RANGES:
+            value = _number(name, text)
+        elif name in CHOICES:
+            value = text if text in CHOICES[name] else None
+        else:
+            value = text
+        if value is not None:
+            values[name] = value
+    return values
+
+
+def encode(values):
+    """Query-string values of a scenario, in URL order; the default baseline source is left out"""
+    query = {}
+    for name in URL_PARAMS:
+        value = values.get(name)
+        if value is None or (name == "baseline" and value == DEFAULT_BASELINE):
+            continue
+        query[name] = f"{value:g}" if isinstance(value, (int, float)) else str(value)
+    return query
+
+
+def payload_size(value):
+    """Approximate bytes held by a cached result: arrays, strings, containers and Plotly figures"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return 64 + sum(payload_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return 64 + sum(payload_size(item) for item in value)
+    if hasattr(value, "to_plotly_json"):
+        import plotly.io
+
+        return len(plotly.io.to_json(value, validate=False))
+    return 32
+
+
+result_cache = LRUCache(max_entries=1024, max_bytes=int(CACHE_MB * 1024 * 1024), size_of=payload_size)
+
+
+def cached(kind, params, factory):
+    """``factory()`` for ``kind`` (e.g. a chart name) and ``params``, computed once per process and LRU-evicted"""
+    # Flattened so array values are hashed by content rather than by their (truncated) repr
+    parts = [part for item in sorted(params.items()) for part in item]
+    return result_cache.get_or_set(make_key(kind, *parts), factory)
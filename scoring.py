@@ -0,0 +1,341 @@
+"""Headless batch scoring of wind project scenarios, as a CLI and a local HTTP endpoint.
+
+Scenarios arrive as CSV or JSON Lines using the sidebar's input names.
+Any input a row omits takes the sidebar default. Each row also needs a
+location, given in one of three ways:
+- ``district``: a district or site name from the site store
+- ``lat``/``lon``: resolved to the nearest entry of the store
+- explicit ``wind_speed`` and ``turbulence`` values
+Explicit wind inputs override the location's baseline, like moving the
+sliders; values outside the sidebar ranges are rejected. Rows are scored
+in chunks by the dashboard's engine (``finance.evaluate_scenarios``) on a
+pool of worker processes. Results are
+written back in input order as each chunk finishes, so memory is bounded by
+the chunk size times the number of chunks in flight. A row that cannot be
+scored gets an ``error`` instead of stopping the stream. Streamlit is never
+imported.
+
+Usage:
+    python scoring.py score scenarios.csv --out results.jsonl --workers 4
+    cat scenarios.jsonl | python scoring.py score - --output-format csv
+    python scoring.py serve --port 8765 --workers 4
+    curl --data-binary @scenarios.csv -H "Content-Type: text/csv" localhost:8765/score
+"""
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+import finance
+import site_store
+import wind_model
+
+FORMATS = ("csv", "jsonl")
+# Sidebar defaults for every input a row may omit (wind comes from the location)
+SCENARIO_DEFAULTS = {"capacity_mw": 2.5, "tariff_rate": 5.2, "turbine_cost": 700, "om_cost": 30, "years": 15,
+                     **finance.FINANCE_DEFAULTS}
+WIND_INPUTS = ("wind_speed", "turbulence")
+INPUT_COLUMNS = WIND_INPUTS + tuple(SCENARIO_DEFAULTS)
+# Sidebar (min, max) of every input; rows outside them are rejected rather than extrapolated
+INPUT_RANGES = {**wind_model.INPUT_RANGES,
+                **{name: (low, high) for name, (low, high, _) in finance.FINANCE_RANGES.items()}}
+KPI_COLUMNS = wind_model.KPI_NAMES + finance.KPI_NAMES
+OUTPUT_COLUMNS = ("row", "id", "location", "distance_km") + INPUT_COLUMNS + KPI_COLUMNS + ("error",)
+CHUNK_SIZE = 1000
+_encode = json.JSONEncoder(check_circular=False, separators=(",", ":")).encode
+
+
+def read_records(lines, fmt="jsonl"):
+    """Scenario dicts from text lines: CSV with a header row, or one JSON object per line"""
+    if fmt == "csv":
+        yield from csv.DictReader(lines)
+        return
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            record = {"_error": f"invalid JSON: {e}"}
+        yield record if isinstance(record, dict) else {"_error": "expected a JSON object"}
+
+
+def _float_column(records, name, errors):
+    """One input as a float array, NaN where missing; unparseable values become row errors"""
+    values = np.full(len(records), np.nan)
+    for i, record in enumerate(records):
+        value = record.get(name)
+        if value is None or value == "":
+            continue
+        try:
+            values[i] = float(value)
+        except (TypeError, ValueError):
+            errors[i] = errors[i] or f"{name} is not a number: {value!r}"
+    return values
+
+
+def resolve_inputs(records):
+    """Model inputs of a chunk of records, with locations resolved against the site store.
+
+    Returns ``(inputs, location, distance_km, errors)``: a dict of float
+    arrays, the matched district/site name per row, the distance to it for
+    lat/lon rows, and an error message per row (None when it can be scored).
+    """
+    n = len(records)
+    errors = [record.get("_error") for record in records]
+    inputs = {name: _float_column(records, name, errors) for name in INPUT_COLUMNS}
+    lat = _float_column(records, "lat", errors)
+    lon = _float_column(records, "lon", errors)
+    names = [str(record.get("district") or "") for record in records]
+    location = np.array(names, dtype=object)
+    distance_km = np.full(n, np.nan)
+
+    has_name = np.array([bool(name) for name in names], dtype=bool)
+    has_coords = ~has_name & ~np.isnan(lat) & ~np.isnan(lon)
+    if has_name.any() or has_coords.any():
+        store = site_store.load_sites()
+        index = np.full(n, -1, dtype=np.int64)
+        named = np.flatnonzero(has_name)
+        index[named] = store.lookup(location[named])
+        located = np.flatnonzero(has_coords)
+        if located.size:
+            index[located], distance_km[located] = store.nearest(lat[located], lon[located])
+        found = index >= 0
+        for name in WIND_INPUTS:
+            fill = found & np.isnan(inputs[name])
+            inputs[name][fill] = store.frame[name].to_numpy()[index[fill]]
+        location[found] = store.frame["name"].to_numpy()[index[found]]
+        for i in np.flatnonzero(has_name & ~found):
+            errors[i] = errors[i] or f"unknown district: {names[i]}"
+
+    for name, default in SCENARIO_DEFAULTS.items():
+        inputs[name] = np.where(np.isnan(inputs[name]), default, inputs[name])
+    for i in np.flatnonzero(np.isnan(inputs["wind_speed"]) | np.isnan(inputs["turbulence"])):
+        errors[i] = errors[i] or "needs a district, lat/lon, or wind_speed and turbulence"
+    for name, (low, high) in INPUT_RANGES.items():
+        values = inputs[name]
+        for i in np.flatnonzero(~np.isnan(values) & ~np.isfinite(values)):
+            errors[i] = errors[i] or f"{name} is not finite"
+        for i in np.flatnonzero(np.isfinite(values) & ((values < low) | (values > high))):
+            errors[i] = errors[i] or f"{name} must be between {low:g} and {high:g}, got {values[i]:g}"
+    return inputs, location, distance_km, errors
+
+
+def _to_list(values):
+    """Array as a list of floats with None for NaN and inf (JSON and CSV have no literal for them)"""
+    cells = values.astype(object)
+    cells[~np.isfinite(values)] = None
+    return cells.tolist()
+
+
+def _format(columns, n, first_row, records, fmt):
+    """Output text of ``n`` rows from per-column lists"""
+    columns.update(row=range(first_row, first_row + n), id=[record.get("id") for record in records])
+    rows = zip(*(columns[name] for name in OUTPUT_COLUMNS))
+    if fmt == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue()
+    return "".join(_encode(dict(zip(OUTPUT_COLUMNS, row))) + "\n" for row in rows)
+
+
+def score_chunk(task):
+    """Score one chunk ``(first_row, records, fmt)`` and return its output text.
+
+    An unexpected failure is reported as the ``error`` of the chunk's rows, so
+    it never ends the stream (HTTP headers have already been sent by then).
+    """
+    first_row, records, fmt = task
+    try:
+        inputs, location, distance_km, errors = resolve_inputs(records)
+        ok = np.array([error is None for error in errors], dtype=bool)
+        kpis = {name: np.full(len(records), np.nan) for name in KPI_COLUMNS}
+        if ok.any():
+            try:
+                results = finance.evaluate_scenarios(**{name: values[ok] for name, values in inputs.items()})
+                for name in KPI_COLUMNS:
+                    kpis[name][ok] = results[name]
+            except Exception as e:
+                errors = [error if error is not None else f"scoring failed: {e!r}" for error in errors]
+    except Exception as e:
+        nan = np.full(len(records), np.nan)
+        inputs = {name: nan for name in INPUT_COLUMNS}
+        kpis = {name: nan for name in KPI_COLUMNS}
+        location, distance_km = np.full(len(records), None, dtype=object), nan
+        errors = [f"scoring failed: {e!r}"] * len(records)
+
+    columns = {**inputs, **kpis, "distance_km": distance_km}
+    columns = {name: _to_list(values) for name, values in columns.items()}
+    columns.update(location=location.tolist(), error=errors)
+    return _format(columns, len(records), first_row, records, fmt)
+
+
+def _chunks(records, chunk_size):
+    chunk = []
+    first_row = 0
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == chunk_size:
+            yield first_row, chunk
+            first_row += chunk_size
+            chunk = []
+    if chunk:
+        yield first_row, chunk
+
+
+def _ordered(pool, tasks, window):
+    """Results of ``score_chunk`` in task order, with at most ``window`` chunks in flight"""
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.submit(score_chunk, task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def new_pool(workers):
+    """Process pool for ``score_stream``, or None to score in-process"""
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def score_stream(records, fmt="jsonl", chunk_size=CHUNK_SIZE, pool=None, window=8):
+    """Output text for ``records``, chunk by chunk in input order (CSV starts with its header).
+
+    With a ``pool``, up to ``window`` chunks are scored concurrently.
+    """
+    if fmt == "csv":
+        yield ",".join(OUTPUT_COLUMNS) + "\n"
+    tasks = ((first_row, chunk, fmt) for first_row, chunk in _chunks(records, chunk_size))
+    if pool is None:
+        yield from map(score_chunk, tasks)
+    else:
+        yield from _ordered(pool, tasks, window)
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    """``POST /score`` streams results back with chunked transfer encoding; ``GET /health`` for probes"""
+
+    protocol_version = "HTTP/1.1"
+    pool = None
+    window = 8
+    chunk_size = CHUNK_SIZE
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body_lines(self, length):
+        """Request body as text lines, read lazily and never past Content-Length"""
+        remaining = length
+        while remaining > 0:
+            line = self.rfile.readline(remaining)
+            if not line:
+                break
+            remaining -= len(line)
+            yield line.decode("utf-8")
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            self._send_json(200, {"status": "ok", "columns": OUTPUT_COLUMNS})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/score":
+            self._send_json(404, {"error": "not found"})
+            return
+        if "Content-Length" not in self.headers:
+            self._send_json(411, {"error": "Content-Length required"})
+            return
+        query = parse_qs(url.query)
+        default_input = "csv" if "csv" in self.headers.get("Content-Type", "") else "jsonl"
+        input_format = query.get("input", [default_input])[0]
+        output_format = query.get("output", ["jsonl"])[0]
+        if input_format not in FORMATS or output_format not in FORMATS:
+            self._send_json(400, {"error": f"formats must be one of {', '.join(FORMATS)}"})
+            return
+
+        records = read_records(self._body_lines(int(self.headers["Content-Length"])), input_format)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv" if output_format == "csv" else "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for text in score_stream(records, output_format, self.chunk_size, self.pool, self.window):
+            data = text.encode()
+            if data:
+                self.wfile.write(b"%X\r\n%s\r\n" % (len(data), data))
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def serve(host="127.0.0.1", port=8765, workers=1, chunk_size=CHUNK_SIZE):
+    """Run the HTTP endpoint until interrupted; one worker pool is shared by all requests"""
+    pool = new_pool(workers)
+    handler = type("Handler", (ScoringHandler,), {"pool": pool, "window": 2 * workers, "chunk_size": chunk_size})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"Scoring endpoint on http://{host}:{port}/score ({workers} worker(s))", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if pool is not None:
+            pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    score = commands.add_parser("score", help="score a CSV/JSONL file (or - for stdin)")
+    score.add_argument("input", nargs="?", default="-")
+    score.add_argument("--out", default="-", help="output path (default: stdout)")
+    score.add_argument("--input-format", choices=FORMATS, help="default: from the file extension, else jsonl")
+    score.add_argument("--output-format", choices=FORMATS, help="default: from the --out extension, else jsonl")
+    serve_parser = commands.add_parser("serve", help="run the local HTTP endpoint")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    for command in (score, serve_parser):
+        command.add_argument("--workers", type=int, default=1)
+        command.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                             help="rows per scoring task; 1 streams every row as soon as it is read")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.host, args.port, args.workers, args.chunk_size)
+        return
+    input_format = args.input_format or ("csv" if args.input.endswith(".csv") else "jsonl")
+    output_format = args.output_format or ("csv" if args.out.endswith(".csv") else "jsonl")
+    source = sys.stdin if args.input == "-" else open(args.input, newline="")
+    sink = sys.stdout if args.out == "-" else open(args.out, "w", newline="")
+    pool = new_pool(args.workers)
+    try:
+        records = read_records(source, input_format)
+        for text in score_stream(records, output_format, args.chunk_size, pool, 2 * args.workers):
+            sink.write(text)
+            sink.flush()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        for stream in (source, sink):
+            if stream not in (sys.stdin, sys.stdout):
+                stream.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Batched parameter sweeps and tornado sensitivity for the scenario engine.
+
+Sweeps are built as broadcast arrays and scored with a single call to
+``wind_model.evaluate_scenarios``, so a 200×200 grid is one NumPy pass
+rather than 40,000 dashboard reruns. Discounted cash flow KPIs are scored
+through ``finance.evaluate_scenarios`` with the given financing inputs.
+"""
+import numpy as np
+
+import finance
+import wind_model
+
+PARAMETER_LABELS = {
+    "years": "Project Lifetime (Years)",
+    "capacity_mw": "Turbine Capacity (MW)",
+    "wind_speed": "Average Wind Speed (m/s)",
+    "turbulence": "Turbulence Intensity (%)",
+    "turbine_cost": "Turbine Cost (₹ lakhs/MW)",
+    "om_cost": "O&M Cost (₹ lakhs/MW/year)",
+    "tariff_rate": "Electricity Tariff (₹/kWh)",
+}
+
+KPI_LABELS = {
+    "roi": "ROI (%)",
+    "payback_period": "Payback Period (years)",
+    "net_profit": "Net Profit (₹)",
+    "annual_generation": "Annual Energy Generation (MWh)",
+    "annual_cash_flow": "Annual Cash Flow (₹)",
+    "npv": "Equity NPV (₹)",
+    "equity_irr": "Equity IRR (%)",
+    "lcoe": "LCOE (₹/kWh)",
+    "discounted_payback": "Discounted Payback (years)",
+}
+
+
+def parameter_values(name, steps):
+    """Evenly spaced values across a parameter's slider range"""
+    low, high = wind_model.INPUT_RANGES[name]
+    values = np.linspace(low, high, steps)
+    if name == "years":
+        values = np.round(values)
+    return values
+
+
+def _evaluate(params, kpi, finance_params):
+    """Score a batch, running the DCF engine only for DCF KPIs"""
+    if kpi in finance.KPI_NAMES:
+        return finance.evaluate_scenarios(**params, **(finance_params or {}))
+    return wind_model.evaluate_scenarios(**params)
+
+
+def _kpi(results, kpi):
+    values = results[kpi]
+    if kpi in ("payback_period", "discounted_payback", "lcoe"):
+        # Projects that never pay back have no finite value to plot
+        values = np.where(np.isfinite(values), values, np.nan)
+    return values
+
+
+def sweep_parameters(base_params, kpi="roi", steps=50, parameters=None, finance_params=None):
+    """Sweep each parameter over its range with the others held at base.
+
+    Returns ``{parameter: (values, kpi_values)}``. All parameters are scored
+    together as one ``(n_parameters, steps)`` batch.
+    """
+    parameters = list(parameters or PARAMETER_LABELS)
+    batch = {name: np.full((len(parameters), steps), float(base_params[name])) for name in PARAMETER_LABELS}
+    sweeps = {}
+    for row, name in enumerate(parameters):
+        sweeps[name] = parameter_values(name, steps)
+        batch[name][row] = sweeps[name]
+    kpi_values = _kpi(_evaluate(batch, kpi, finance_params), kpi)
+    return {name: (sweeps[name], kpi_values[row]) for row, name in enumerate(parameters)}
+
+
+def tornado(base_params, kpi="roi", steps=50, parameters=None, finance_params=None):
+    """Low/high KPI swing of every parameter, largest swing first.
+
+    Each entry carries the parameter name, the KPI at the base scenario and
+    the minimum and maximum KPI reached across the parameter's slider range.
+    """
+    base_value = float(_kpi(_evaluate(base_params, kpi, finance_params), kpi))
+    bars = []
+    for name, (_, values) in sweep_parameters(base_params, kpi, steps, parameters, finance_params).items():
+        finite = values[np.isfinite(values)]
+        low, high = (finite.min(), finite.max()) if finite.size else (np.nan, np.nan)
+        bars.append({"parameter": name, "base": base_value, "low": float(low), "high": float(high)})
+    bars.sort(key=lambda bar: np.nan_to_num(bar["high"] - bar["low"]), reverse=True)
+    return bars
+
+
+def grid_sweep(base_params, x_param, y_param, kpi="payback_period", steps=200, finance_params=None):
+    """KPI over a 2-D grid of two parameters, others held at base.
+
+    Returns ``(x_values, y_values, grid)`` where ``grid[i, j]`` is the KPI at
+    ``y_values[i]`` and ``x_values[j]``.
+    """
+    if x_param == y_param:
+        raise ValueError("Heatmap axes must be two different parameters")
+    x_values = parameter_values(x_param, steps)
+    y_values = parameter_values(y_param, steps)
+    params = {name: float(base_params[name]) for name in PARAMETER_LABELS}
+    params[x_param] = x_values[np.newaxis, :]
+    params[y_param] = y_values[:, np.newaxis]
+    return x_values, y_values, _kpi(_evaluate(params, kpi, finance_params), kpi)
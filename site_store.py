@@ -0,0 +1,143 @@
+"""Columnar store of districts and candidate wind sites.
+
+Districts and sites share one schema and live in a pandas frame backed by
+NumPy columns. The store is loaded lazily once per process from
+``data/districts.csv`` plus an optional site file (``.npz``, ``.parquet``
+or ``.csv``) named by the ``WIND_SITES_PATH`` environment variable, and is
+spatially indexed with a KD-tree so nearest-site and bounding-box queries
+stay sublinear for tens of thousands of sites. pandas and SciPy are only
+imported when the store is built, so pages that just need the district
+baselines (``district_baselines``) start without them.
+"""
+import csv
+import os
+from functools import lru_cache
+
+import numpy as np
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DISTRICTS_PATH = os.path.join(DATA_DIR, "districts.csv")
+EARTH_RADIUS_KM = 6371.0
+
+# Column name -> dtype
+SCHEMA = {
+    "name": str,
+    "kind": str,  # "district" or "site"
+    "wind_speed": float,  # m/s
+    "potential": str,  # qualitative class, e.g. "Medium"
+    "turbulence": float,  # %
+    "elevation": float,  # m
+    "lat": float,
+    "lon": float,
+    "wind_potential": float,  # MW per sq.km
+    "area_km": float,  # sq.km available for development; NaN when unknown
+    "source": str,
+    "source_url": str,
+}
+OPTIONAL_COLUMNS = {"kind": "site", "potential": "", "source": "", "source_url": "", "area_km": np.nan}
+
+
+def read_table(path):
+    """Read a site table from .npz, .parquet or .csv and coerce it to the schema"""
+    import pandas as pd
+
+    if path.endswith(".npz"):
+        with np.load(path, allow_pickle=False) as columns:
+            frame = pd.DataFrame({name: columns[name] for name in columns.files})
+    elif path.endswith(".parquet"):
+        frame = pd.read_parquet(path)
+    else:
+        frame = pd.read_csv(path)
+    for column, default in OPTIONAL_COLUMNS.items():
+        if column not in frame:
+            frame[column] = default
+    missing = set(SCHEMA) - set(frame.columns)
+    if missing:
+        raise ValueError(f"{path} is missing required columns: {', '.join(sorted(missing))}")
+    frame = frame[list(SCHEMA)]
+    return frame.fillna(OPTIONAL_COLUMNS).astype(SCHEMA)
+
+
+def write_npz(frame, path):
+    """Save a site table as a compressed columnar .npz file"""
+    np.savez_compressed(path, **{column: frame[column].to_numpy(dtype=dtype if dtype is float else str)
+                                 for column, dtype in SCHEMA.items()})
+
+
+def _unit_vectors(lat, lon):
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+class SiteStore:
+    """Districts and candidate sites with a KD-tree over their coordinates"""
+
+    def __init__(self, frame):
+        from scipy.spatial import cKDTree
+
+        self.frame = frame.reset_index(drop=True)
+        self.lat = self.frame["lat"].to_numpy()
+        self.lon = self.frame["lon"].to_numpy()
+        # Chord distance between unit vectors is monotonic in great-circle distance
+        self._tree = cKDTree(_unit_vectors(self.lat, self.lon))
+        self._lat_order = np.argsort(self.lat, kind="stable")
+        self._sorted_lat = self.lat[self._lat_order]
+        self._name_index = {name: i for i, name in enumerate(self.frame["name"])}
+        self._district_records = None
+
+    def __len__(self):
+        return len(self.frame)
+
+    def districts(self):
+        """Names of all districts, in file order"""
+        return self.frame.loc[self.frame["kind"] == "district", "name"].tolist()
+
+    def record(self, name):
+        """All schema fields of one district or site as a plain dict"""
+        return self.frame.iloc[self._name_index[name]].to_dict()
+
+    def lookup(self, names):
+        """Row indices of the given names, -1 where a name is unknown"""
+        return np.array([self._name_index.get(name, -1) for name in names], dtype=np.int64)
+
+    def district_records(self):
+        """``{name: record}`` for every district, built once per store"""
+        if self._district_records is None:
+            districts = self.frame[self.frame["kind"] == "district"]
+            self._district_records = {row["name"]: row for row in districts.to_dict(orient="records")}
+        return self._district_records
+
+    def nearest(self, lat, lon, k=1):
+        """Indices and great-circle distances (km) of the k nearest entries to each point"""
+        chord, index = self._tree.query(_unit_vectors(lat, lon), k=k)
+        return index, 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+
+    def within_bbox(self, lat_min, lat_max, lon_min, lon_max):
+        """Indices of entries inside a latitude/longitude bounding box"""
+        start = np.searchsorted(self._sorted_lat, lat_min, side="left")
+        stop = np.searchsorted(self._sorted_lat, lat_max, side="right")
+        candidates = self._lat_order[start:stop]
+        inside = (self.lon[candidates] >= lon_min) & (self.lon[candidates] <= lon_max)
+        return np.sort(candidates[inside])
+
+
+@lru_cache(maxsize=None)
+def load_sites(sites_path=None):
+    """Load the store once per process; ``sites_path`` defaults to $WIND_SITES_PATH"""
+    import pandas as pd
+
+    frames = [read_table(DISTRICTS_PATH)]
+    sites_path = sites_path or os.environ.get("WIND_SITES_PATH")
+    if sites_path:
+        frames.append(read_table(sites_path))
+    return SiteStore(pd.concat(frames, ignore_index=True))
+
+
+@lru_cache(maxsize=None)
+def district_baselines(path=DISTRICTS_PATH):
+    """``{name: record}`` for the districts file, read with the csv module (no pandas or KD-tree)"""
+    with open(path, newline="") as f:
+        return {row["name"]: {column: dtype(row.get(column) or OPTIONAL_COLUMNS.get(column, ""))
+                              for column, dtype in SCHEMA.items()}
+                for row in csv.DictReader(f)}
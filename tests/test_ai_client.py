@@ -0,0 +1,83 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import ai_client
+
+
+class StubModel(BaseHTTPRequestHandler):
+    """Stand-in for the Inference API: echoes the prompt after ``fail_first`` 503 "model loading" replies"""
+
+    protocol_version = "HTTP/1.1"
+    fail_first = 0
+    requests = []
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        StubModel.requests.append((self.client_address, self.headers["Authorization"]))
+        if len(StubModel.requests) <= StubModel.fail_first:
+            self._reply(503, {"error": "Model is loading", "estimated_time": 0.01})
+        elif payload.get("stream"):
+            body = "".join(f'data: {json.dumps({"token": {"text": word, "special": False}})}\n\n'
+                           for word in ("Hello", " world"))
+            self._reply(200, body, "text/event-stream")
+        else:
+            self._reply(200, [{"generated_text": payload["inputs"] + " answer"}])
+
+    def _reply(self, status, body, content_type="application/json"):
+        data = (body if isinstance(body, str) else json.dumps(body)).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(StubModel, "fail_first", 0)
+    monkeypatch.setattr(StubModel, "requests", [])
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubModel)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/model"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_retries_model_loading_then_caches(server):
+    StubModel.fail_first = 1
+    client = ai_client.InferenceClient("token", api_url=server, backoff=0.01)
+    assert client.generate("Question?") == "answer"
+    assert client.generate("Question?") == "answer"
+    assert len(StubModel.requests) == 2  # one 503, one answer, then a cache hit
+    assert len({address for address, _ in StubModel.requests}) == 1  # over one reused connection
+    assert StubModel.requests[0][1] == "Bearer token"
+
+
+def test_stream_yields_tokens(server):
+    client = ai_client.InferenceClient("token", api_url=server)
+    assert "".join(client.stream("Hi")) == "Hello world"
+    assert list(client.stream("Hi")) == ["Hello world"]
+
+
+def test_each_thread_gets_its_own_session(server):
+    client = ai_client.InferenceClient("token", api_url=server)
+    barrier = threading.Barrier(4)
+
+    def ask(i):
+        barrier.wait()  # all four threads are busy at once
+        return client.generate(f"Question {i}?"), client.session
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(ask, range(4)))
+    assert [answer for answer, _ in results] == ["answer"] * 4
+    sessions = {id(session) for _, session in results}
+    assert len(sessions) == 4 and id(client.session) not in sessions
+    assert client.session is client.session
@@ -0,0 +1,101 @@
+import sqlite3
+import time
+
+import pytest
+
+import outbox
+
+CONFIG = {"smtp_server": "localhost", "smtp_port": 25, "sender_email": "dashboard@example.com",
+          "sender_password": "", "receiver_email": "team@example.com", "starttls": False}
+
+
+class FakeSMTP:
+    """Stand-in for smtplib.SMTP that records sent messages; ``down`` refuses connections"""
+
+    down = False
+    sent = []
+    connections = 0
+
+    def __init__(self, host, port, timeout=None):
+        if FakeSMTP.down:
+            raise ConnectionRefusedError("server down")
+        FakeSMTP.connections += 1
+
+    def noop(self):
+        return (250, b"OK")
+
+    def send_message(self, message):
+        FakeSMTP.sent.append(message)
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    monkeypatch.setattr(FakeSMTP, "down", False)
+    monkeypatch.setattr(FakeSMTP, "sent", [])
+    monkeypatch.setattr(FakeSMTP, "connections", 0)
+    monkeypatch.setattr(outbox.smtplib, "SMTP", FakeSMTP)
+    return FakeSMTP
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_messages_queued_while_down_arrive_as_one_digest(tmp_path, smtp):
+    box = outbox.Outbox(str(tmp_path / "outbox.db"), CONFIG, backoff=0.05)
+    smtp.down = True
+    for i in range(3):
+        box.enqueue(f"Feedback {i}", f"Message {i}")
+    box.deliver_due()
+    assert box.pending_count() == 3 and not smtp.sent
+
+    smtp.down = False
+    with sqlite3.connect(box.db_path) as db:
+        db.execute("UPDATE outbox SET next_attempt_at = 0")
+    assert box.deliver_due() == 3
+    assert len(smtp.sent) == 1 and "3 submissions" in smtp.sent[0]["Subject"]
+
+    box.enqueue("Feedback 3", "Message 3")
+    assert box.deliver_due() == 1
+    assert smtp.connections == 1  # the open connection was reused
+
+
+def test_worker_survives_errors_outside_delivery(tmp_path, smtp, monkeypatch):
+    box = outbox.Outbox(str(tmp_path / "outbox.db"), CONFIG, backoff=0.01, poll_interval=0.05)
+    calls = []
+    seconds_until_due = box._seconds_until_due
+
+    def flaky():
+        calls.append(None)
+        if len(calls) <= 2:
+            raise sqlite3.OperationalError("database is locked")
+        return seconds_until_due()
+
+    monkeypatch.setattr(box, "_seconds_until_due", flaky)
+    box.start()
+    try:
+        wait_for(lambda: len(calls) > 2)
+        assert box.running
+        box.enqueue("Feedback", "Still delivered")
+        wait_for(lambda: smtp.sent)
+    finally:
+        box.stop()
+
+
+def test_start_restarts_a_dead_worker(tmp_path, smtp):
+    box = outbox.Outbox(str(tmp_path / "outbox.db"), CONFIG, poll_interval=0.05).start()
+    box.stop()
+    assert not box.running
+    box.start()
+    try:
+        assert box.running
+        box.enqueue("Feedback", "After restart")
+        wait_for(lambda: smtp.sent)
+    finally:
+        box.stop()
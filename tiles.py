@@ -0,0 +1,222 @@
+"""Pre-rendered XYZ raster tiles of interpolated wind speed and wind potential.
+
+Site values are interpolated once onto a regular latitude/longitude grid
+over Madhya Pradesh by inverse distance weighting (IDW) of the nearest sites,
+found with the ``SiteStore`` KD-tree. Web Mercator PNG tiles are then
+sampled from that grid for a few zoom levels and written to
+``static/tiles/<version>/<layer>/{z}/{x}/{y}.png``, where ``version`` hashes
+the site data and rendering settings. Streamlit serves ``static/`` as plain
+files (``server.enableStaticServing``), so maps reference the tiles by URL
+instead of embedding per-site data, and a tile set is rendered only once
+per dataset: later processes find it on disk.
+
+Usage:
+    python tiles.py                 # render the tile set for the current site data
+    python tiles.py --max-zoom 9
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from caching import make_key
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+TILE_ROOT = os.path.join(STATIC_DIR, "tiles")
+STATIC_URL = "app/static"  # where Streamlit serves STATIC_DIR, relative to the app URL
+TILE_SIZE = 256
+BOUNDS = (21.0, 27.0, 74.0, 83.0)  # lat_min, lat_max, lon_min, lon_max of Madhya Pradesh
+MIN_ZOOM = 5
+MAX_ZOOM = 8  # maps upscale these tiles when zoomed further in
+GRID_STEP = 0.02  # degrees between interpolation grid points (~2 km)
+IDW_NEIGHBOURS = 8
+IDW_POWER = 2.0
+FADE_KM = (150.0, 250.0)  # distance to the nearest site over which the layer fades out
+# Layer -> (legend label, matplotlib colormap)
+LAYERS = {
+    "wind_potential": ("Wind Potential (MW/sq.km)", "YlOrRd"),
+    "wind_speed": ("Wind Speed (m/s)", "YlGnBu"),
+}
+RENDER_VERSION = 1  # bump when the rendering changes so old tile sets are not reused
+
+_lock = threading.Lock()
+
+
+def tile_bounds(z, x, y):
+    """(lat_min, lat_max, lon_min, lon_max) of an XYZ tile"""
+    n = 2 ** z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return lat(y + 1), lat(y), x / n * 360 - 180, (x + 1) / n * 360 - 180
+
+
+def tile_range(z, bounds=BOUNDS):
+    """Column and row ranges of the tiles covering ``bounds`` at zoom ``z``"""
+    lat_min, lat_max, lon_min, lon_max = bounds
+    n = 2 ** z
+
+    def column(lon):
+        return int((lon + 180) / 360 * n)
+
+    def row(lat):
+        lat = math.radians(lat)
+        return int((1 - math.asinh(math.tan(lat)) / math.pi) / 2 * n)
+
+    return range(column(lon_min), column(lon_max) + 1), range(row(lat_max), row(lat_min) + 1)
+
+
+def _pixel_centres(z, x, y):
+    """Latitudes of a tile's pixel rows and longitudes of its pixel columns (pixel centres)"""
+    n = 2 ** z
+    offsets = (np.arange(TILE_SIZE) + 0.5) / TILE_SIZE
+    return np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + offsets) / n)))), (x + offsets) / n * 360 - 180
+
+
+def interpolate(store, columns, bounds=BOUNDS, step=GRID_STEP, neighbours=IDW_NEIGHBOURS, power=IDW_POWER):
+    """IDW grids of ``columns`` over ``bounds`` plus the distance (km) to the nearest site.
+
+    Returns ``(lat_axis, lon_axis, {column: grid}, nearest_km)``; grids
+    are indexed ``[lat, lon]``. Weights are computed once and shared by
+    every column.
+    """
+    lat_min, lat_max, lon_min, lon_max = bounds
+    lat_axis = np.arange(lat_min, lat_max + step / 2, step)
+    lon_axis = np.arange(lon_min, lon_max + step / 2, step)
+    lat, lon = np.meshgrid(lat_axis, lon_axis, indexing="ij")
+    index, distance_km = store.nearest(lat.ravel(), lon.ravel(), k=min(neighbours, len(store)))
+    index, distance_km = index.reshape(lat.size, -1), distance_km.reshape(lat.size, -1)
+    weights = 1.0 / np.maximum(distance_km, 1e-3) ** power
+    weights /= weights.sum(axis=1, keepdims=True)
+    grids = {column: (weights * store.frame[column].to_numpy(dtype=float)[index]).sum(axis=1).reshape(lat.shape)
+             for column in columns}
+    return lat_axis, lon_axis, grids, distance_km[:, 0].reshape(lat.shape)
+
+
+def _axis_weights(axis, values):
+    """Lower grid index and interpolation weight of each value along a regular axis"""
+    position = np.clip((values - axis[0]) / (axis[1] - axis[0]), 0, axis.size - 1)
+    lower = np.minimum(position.astype(np.intp), axis.size - 2)
+    return lower, position - lower
+
+
+def _sample(grid, lat_axis, lon_axis, lat, lon):
+    """Bilinear samples of a grid at every (row latitude, column longitude) pair of a tile"""
+    row, row_weight = _axis_weights(lat_axis, lat)
+    col, col_weight = _axis_weights(lon_axis, lon)
+    row, row_weight = row[:, np.newaxis], row_weight[:, np.newaxis]
+    top = grid[row, col] * (1 - col_weight) + grid[row, col + 1] * col_weight
+    bottom = grid[row + 1, col] * (1 - col_weight) + grid[row + 1, col + 1] * col_weight
+    return top * (1 - row_weight) + bottom * row_weight
+
+
+def _tile_alpha(nearest_km):
+    near, far = FADE_KM
+    return np.clip((far - nearest_km) / (far - near), 0.0, 1.0)
+
+
+def render(store, out_dir, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM, bounds=BOUNDS):
+    """Write every layer's tiles for zooms ``min_zoom``..``max_zoom`` into ``out_dir``; returns the metadata.
+
+    Tiles lying entirely beyond the fade distance are not written (maps
+    simply show nothing there).
+    """
+    from matplotlib import colormaps
+    from matplotlib.image import imsave
+
+    lat_axis, lon_axis, grids, nearest_km = interpolate(store, list(LAYERS), bounds)
+    ranges = {column: (float(store.frame[column].min()), float(store.frame[column].max())) for column in LAYERS}
+    written = 0
+    for z in range(min_zoom, max_zoom + 1):
+        columns, rows = tile_range(z, bounds)
+        for x in columns:
+            for y in rows:
+                lat, lon = _pixel_centres(z, x, y)
+                inside = (((lat >= bounds[0]) & (lat <= bounds[1]))[:, np.newaxis]
+                          & ((lon >= bounds[2]) & (lon <= bounds[3])))
+                alpha = _tile_alpha(_sample(nearest_km, lat_axis, lon_axis, lat, lon)) * inside
+                if not alpha.any():
+                    continue
+                for column, (_, cmap) in LAYERS.items():
+                    low, high = ranges[column]
+                    values = _sample(grids[column], lat_axis, lon_axis, lat, lon)
+                    rgba = colormaps[cmap]((values - low) / ((high - low) or 1.0))
+                    rgba[..., 3] = alpha
+                    path = os.path.join(out_dir, column, str(z), str(x), f"{y}.png")
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    imsave(path, rgba, format="png")
+                    written += 1
+    meta = {
+        "bounds": bounds,
+        "min_zoom": min_zoom,
+        "max_zoom": max_zoom,
+        "tiles": written,
+        "layers": {column: {"label": label, "colormap": cmap, "range": ranges[column]}
+                   for column, (label, cmap) in LAYERS.items()},
+    }
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def tileset_version(store, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM):
+    """Short hash of the site data and rendering settings a tile set depends on"""
+    columns = [store.frame[column].to_numpy(dtype=float) for column in ("lat", "lon", *LAYERS)]
+    settings = (RENDER_VERSION, BOUNDS, GRID_STEP, IDW_NEIGHBOURS, IDW_POWER, FADE_KM, LAYERS, min_zoom, max_zoom)
+    return make_key(*columns, settings)[:12]
+
+
+def ensure_tiles(store, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM, tile_root=TILE_ROOT):
+    """Metadata of the tile set for ``store``, rendering it first if it is not on disk yet.
+
+    The set is rendered into a scratch directory and renamed into place, so
+    a concurrent process never serves a half-written set. The returned
+    ``url`` maps each layer to its ``{z}/{x}/{y}`` template relative to
+    the app URL.
+    """
+    version = tileset_version(store, min_zoom, max_zoom)
+    out_dir = os.path.join(tile_root, version)
+    meta_path = os.path.join(out_dir, "meta.json")
+    with _lock:
+        if not os.path.exists(meta_path):
+            os.makedirs(tile_root, exist_ok=True)
+            scratch = tempfile.mkdtemp(dir=tile_root, prefix=".render-")
+            try:
+                render(store, scratch, min_zoom, max_zoom)
+                try:
+                    os.rename(scratch, out_dir)
+                except OSError:
+                    pass  # another process finished the same set first
+            finally:
+                shutil.rmtree(scratch, ignore_errors=True)
+        with open(meta_path) as f:
+            meta = json.load(f)
+    prefix = f"{STATIC_URL}/{os.path.relpath(out_dir, STATIC_DIR).replace(os.sep, '/')}"
+    meta["version"] = version
+    meta["url"] = {column: f"{prefix}/{column}/{{z}}/{{x}}/{{y}}.png" for column in meta["layers"]}
+    return meta
+
+
+def main():
+    import site_store
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-zoom", type=int, default=MIN_ZOOM)
+    parser.add_argument("--max-zoom", type=int, default=MAX_ZOOM)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    meta = ensure_tiles(site_store.load_sites(), args.min_zoom, args.max_zoom)
+    print(f"Tile set {meta['version']}: {meta['tiles']} tiles (zoom {meta['min_zoom']}–{meta['max_zoom']}) "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
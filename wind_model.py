@@ -0,0 +1,109 @@
+"""Vectorized scenario engine for the Wind Energy Analytics Dashboard.
+
+Every input may be a scalar or a NumPy array; inputs are broadcast against
+each other, so the same call scores the single scenario shown on the
+dashboard or millions of scenarios in one batch.
+"""
+import numpy as np
+
+HOURS_PER_YEAR = 8760
+RUPEES_PER_LAKH = 100000
+KWH_PER_MWH = 1000
+
+# Sidebar slider ranges (min, max) for every input the engine consumes
+INPUT_RANGES = {
+    "years": (1, 25),
+    "capacity_mw": (0.5, 10.0),
+    "wind_speed": (3.0, 12.0),
+    "turbulence": (5.0, 25.0),
+    "turbine_cost": (500, 1000),
+    "om_cost": (10, 50),
+    "tariff_rate": (3.0, 8.0),
+}
+
+# Order of the KPI arrays returned by evaluate_scenarios
+KPI_NAMES = (
+    "capacity_factor",
+    "annual_generation",
+    "annual_revenue",
+    "total_investment",
+    "annual_om_cost",
+    "annual_cash_flow",
+    "total_revenue",
+    "total_om_cost",
+    "net_profit",
+    "roi",
+    "payback_period",
+)
+
+
+def capacity_factor(wind_speed, turbulence):
+    """Empirical NIWE capacity factor: 0.087 × V_avg - (Turbulence × 0.005), floored at zero"""
+    wind_speed = np.asarray(wind_speed, dtype=float)
+    turbulence = np.asarray(turbulence, dtype=float)
+    return np.maximum(0.087 * wind_speed - turbulence * 0.005, 0.0)
+
+
+def evaluate_scenarios(wind_speed, turbulence, capacity_mw, tariff_rate, turbine_cost, om_cost, years,
+                       capacity_factor_override=None):
+    """Score a batch of scenarios and return a dict of KPI arrays.
+
+    Units follow the sidebar: capacity in MW, tariff in ₹/kWh, turbine cost in
+    ₹ lakhs/MW, O&M cost in ₹ lakhs/MW/year and lifetime in years. Energy is
+    returned in MWh and money in ₹. ``capacity_factor_override`` replaces the
+    empirical capacity factor when another energy model supplies it.
+    """
+    if capacity_factor_override is None:
+        cf = capacity_factor(wind_speed, turbulence)
+    else:
+        cf = np.asarray(capacity_factor_override, dtype=float)
+    capacity_mw = np.asarray(capacity_mw, dtype=float)
+    tariff_rate = np.asarray(tariff_rate, dtype=float)
+    turbine_cost = np.asarray(turbine_cost, dtype=float)
+    om_cost = np.asarray(om_cost, dtype=float)
+    years = np.asarray(years, dtype=float)
+
+    annual_generation = capacity_mw * HOURS_PER_YEAR * cf
+    annual_revenue = annual_generation * tariff_rate * KWH_PER_MWH
+    total_investment = capacity_mw * turbine_cost * RUPEES_PER_LAKH
+    annual_om_cost = capacity_mw * om_cost * RUPEES_PER_LAKH
+    annual_cash_flow = annual_revenue - annual_om_cost
+    total_revenue = annual_revenue * years
+    total_om_cost = annual_om_cost * years
+    net_profit = total_revenue - total_investment - total_om_cost
+
+    # ROI is 0 without investment; payback is infinite when the project never earns back
+    roi = np.divide(net_profit * 100, total_investment,
+                    out=np.zeros(np.broadcast(net_profit, total_investment).shape),
+                    where=total_investment > 0)
+    payback_period = np.divide(total_investment, annual_cash_flow,
+                               out=np.full(np.broadcast(total_investment, annual_cash_flow).shape, np.inf),
+                               where=annual_cash_flow > 0)
+
+    values = (cf, annual_generation, annual_revenue, total_investment, annual_om_cost, annual_cash_flow,
+              total_revenue, total_om_cost, net_profit, roi, payback_period)
+    return dict(zip(KPI_NAMES, np.broadcast_arrays(*values)))
+
+
+def evaluate_scenario(**params):
+    """Score a single scenario and return its KPIs as plain floats"""
+    return {name: float(value) for name, value in evaluate_scenarios(**params).items()}
+
+
+def cumulative_series(results, years):
+    """Year-by-year cumulative generation, revenue and net cash flow.
+
+    ``years`` is the horizon of the series; each returned array has a
+    trailing axis of that length appended to the batch shape of ``results``.
+    """
+    years_range = np.arange(1, int(years) + 1)
+    annual_generation = np.asarray(results["annual_generation"])[..., np.newaxis]
+    annual_revenue = np.asarray(results["annual_revenue"])[..., np.newaxis]
+    annual_cash_flow = np.asarray(results["annual_cash_flow"])[..., np.newaxis]
+    total_investment = np.asarray(results["total_investment"])[..., np.newaxis]
+    return {
+        "years_range": years_range,
+        "cumulative_generation": annual_generation * years_range,
+        "cumulative_revenue": annual_revenue * years_range,
+        "cumulative_cash_flow": annual_cash_flow * years_range - total_investment,
+    }
@@ -0,0 +1,104 @@
+"""Wind rose and direction-sector breakdown from binned speed/direction readings.
+
+Readings are binned once into a fine 2-D histogram (1.25° × 0.5 m/s). Each
+chunk is binned with a single ``np.bincount`` over combined bin indices, and
+``ingest`` stores the result in the dataset summary. Any sector count
+(centred on north) and speed class width is then a roll, reshape and sum of
+that small array, so changing either never revisits the readings.
+"""
+import numpy as np
+
+DIRECTION_BIN_WIDTH = 1.25  # degrees; sector edges for 8, 12, 16, 24, 36 and 72 sectors fall on bin edges
+SPEED_BIN_WIDTH = 0.5  # m/s
+MAX_SPEED = 40.0  # m/s; faster readings go into the last bin
+DIRECTION_BINS = int(360 / DIRECTION_BIN_WIDTH)
+SPEED_BINS = int(MAX_SPEED / SPEED_BIN_WIDTH)
+SECTOR_CHOICES = (8, 12, 16, 36)
+COMPASS_POINTS = ["N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE", "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"]
+
+
+def histogram(speed, direction):
+    """Counts of readings per (direction bin, speed bin); direction in degrees clockwise from north"""
+    speed = np.asarray(speed, dtype=float)
+    direction = np.asarray(direction, dtype=float)
+    valid = np.isfinite(speed) & np.isfinite(direction) & (speed >= 0)
+    direction_bin = (np.mod(direction[valid], 360.0) / DIRECTION_BIN_WIDTH).astype(np.intp) % DIRECTION_BINS
+    speed_bin = np.minimum((speed[valid] / SPEED_BIN_WIDTH).astype(np.intp), SPEED_BINS - 1)
+    counts = np.bincount(direction_bin * SPEED_BINS + speed_bin, minlength=DIRECTION_BINS * SPEED_BINS)
+    return counts.reshape(DIRECTION_BINS, SPEED_BINS)
+
+
+def to_sparse(counts):
+    """JSON-friendly form of a histogram: only the non-empty bins as [direction bin, speed bin, count]"""
+    direction_bin, speed_bin = np.nonzero(counts)
+    return {
+        "direction_bin_width": DIRECTION_BIN_WIDTH,
+        "speed_bin_width": SPEED_BIN_WIDTH,
+        "bins": np.stack([direction_bin, speed_bin, counts[direction_bin, speed_bin]], axis=1).tolist(),
+    }
+
+
+def from_sparse(data):
+    """Dense histogram from ``to_sparse`` output"""
+    if data["direction_bin_width"] != DIRECTION_BIN_WIDTH or data["speed_bin_width"] != SPEED_BIN_WIDTH:
+        raise ValueError("Histogram was binned at a different resolution; re-run ingest.py on the dataset")
+    counts = np.zeros((DIRECTION_BINS, SPEED_BINS), dtype=np.int64)
+    if data["bins"]:
+        direction_bin, speed_bin, count = np.asarray(data["bins"], dtype=np.int64).T
+        counts[direction_bin, speed_bin] = count
+    return counts
+
+
+def sector_counts(counts, sectors=16):
+    """Histogram folded into ``sectors`` direction sectors, the first one centred on north"""
+    if DIRECTION_BINS % (2 * sectors):
+        raise ValueError(f"{sectors} sectors do not align with {DIRECTION_BIN_WIDTH}° bins")
+    width = DIRECTION_BINS // sectors
+    # Shift by half a sector so the bins either side of north land in sector 0
+    return np.roll(counts, width // 2, axis=0).reshape(sectors, width, -1).sum(axis=1)
+
+
+def speed_class_edges(class_width=2.0, top=12.0):
+    """Lower edges of the speed classes: every ``class_width`` m/s, with an open class from ``top``"""
+    return np.arange(0.0, top + class_width / 2, class_width)
+
+
+def sector_labels(sectors):
+    """Compass names for 8 and 16 sectors, centre bearings otherwise"""
+    if len(COMPASS_POINTS) % sectors == 0:
+        return COMPASS_POINTS[::len(COMPASS_POINTS) // sectors]
+    return [f"{bearing:g}°" for bearing in np.arange(sectors) * 360 / sectors]
+
+
+def rose(counts, sectors=16, class_width=2.0, top=12.0, turbine=None, elevation=0.0):
+    """Frequency by sector and speed class plus each sector's share of energy.
+
+    ``frequency`` (%) has one row per speed class and one column per sector.
+    ``energy_share`` (%) weights every reading by the normalized output of
+    ``turbine`` at its speed bin centre, so sectors with rarer but stronger
+    winds count for more than their frequency.
+    """
+    import energy
+
+    by_sector = sector_counts(counts, sectors)
+    total = by_sector.sum()
+    edges = speed_class_edges(class_width, top)
+    by_class = np.add.reduceat(by_sector, np.round(edges / SPEED_BIN_WIDTH).astype(np.intp), axis=1).T
+    centres = (np.arange(SPEED_BINS) + 0.5) * SPEED_BIN_WIDTH
+    output = by_sector @ energy.normalized_output(centres, turbine or energy.DEFAULT_TURBINE, elevation)
+    readings = by_sector.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frequency = 100 * by_class / total
+        energy_share = 100 * output / output.sum()
+        mean_speed = np.where(readings > 0, by_sector @ centres / readings, np.nan)
+    class_labels = [f"{low:g}–{high:g} m/s" for low, high in zip(edges[:-1], edges[1:])] + [f"≥ {edges[-1]:g} m/s"]
+    return {
+        "directions": np.arange(sectors) * 360 / sectors,
+        "labels": sector_labels(sectors),
+        "class_labels": class_labels,
+        "frequency": frequency,
+        "sector_frequency": frequency.sum(axis=0),
+        "energy_share": energy_share,
+        "mean_speed": mean_speed,
+        "readings": int(total),
+    }